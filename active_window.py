@@ -0,0 +1,82 @@
+from datetime import date, datetime, time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+import models
+from cache import cache
+
+# ===================================================================
+# INDEKS "AKTIF HARI INI" (AKTIVITAS DAN TIM)
+# ===================================================================
+# Satu definisi bersama untuk aktivitas dan tim yang sedang berjalan pada
+# suatu hari. Hasilnya dihitung sekali per hari lalu disimpan di cache dengan
+# tag "aktivitas" dan "team", sehingga setiap perubahan aktivitas/tim
+# membuangnya dan permintaan berikutnya menghitung ulang.
+ACTIVE_WINDOW_MAX_TTL = 3600
+
+
+def aktivitas_aktif_filter(hari: date):
+    """Aktivitas berjalan pada `hari`: rentang tanggal yang mencakupnya, atau aktivitas satu hari tanpa jam."""
+    return or_(
+        and_(
+            models.Aktivitas.tanggal_selesai.isnot(None),
+            models.Aktivitas.tanggal_mulai <= hari,
+            models.Aktivitas.tanggal_selesai >= hari,
+        ),
+        and_(
+            models.Aktivitas.tanggal_selesai.is_(None),
+            models.Aktivitas.jam_mulai.is_(None),
+            models.Aktivitas.jam_selesai.is_(None),
+            models.Aktivitas.tanggal_mulai == hari,
+        ),
+    )
+
+
+def team_aktif_filter(hari: date):
+    return and_(models.Team.valid_from <= hari, models.Team.valid_until >= hari)
+
+
+def _build(db: Session, hari: date) -> dict:
+    aktivitas_per_proyek: Dict[Optional[int], Tuple[int, ...]] = {}
+    rows = db.query(models.Aktivitas.id, models.Aktivitas.project_id).filter(
+        aktivitas_aktif_filter(hari)
+    ).order_by(models.Aktivitas.id)
+    for aktivitas_id, project_id in rows:
+        aktivitas_per_proyek[project_id] = aktivitas_per_proyek.get(project_id, ()) + (aktivitas_id,)
+
+    teams = []
+    ketua: Dict[int, Tuple[dict, ...]] = {}
+    rows = db.query(
+        models.Team.id, models.Team.nama_tim, models.Team.valid_from, models.Team.valid_until, models.Team.ketua_tim_id
+    ).filter(team_aktif_filter(hari)).order_by(models.Team.nama_tim.asc(), models.Team.id)
+    for team_id, nama_tim, valid_from, valid_until, ketua_tim_id in rows:
+        teams.append(team_id)
+        if ketua_tim_id is not None:
+            ringkasan = {"id": team_id, "nama_tim": nama_tim, "valid_from": valid_from, "valid_until": valid_until}
+            ketua[ketua_tim_id] = ketua.get(ketua_tim_id, ()) + (ringkasan,)
+
+    return {
+        "tanggal": hari,
+        "aktivitas_per_proyek": aktivitas_per_proyek,
+        "teams": tuple(teams),
+        "ketua": ketua,
+    }
+
+
+def get(db: Session, hari: Optional[date] = None) -> dict:
+    """
+    Indeks aktif untuk `hari` (default hari ini):
+    - aktivitas_per_proyek: project_id -> tuple ID aktivitas aktif
+    - teams: tuple ID tim aktif, urut nama
+    - ketua: user_id -> tuple ringkasan tim aktif yang diketuai
+    Nilai dari cache dipakai bersama, jangan diubah.
+    """
+    hari = hari or date.today()
+    # Entri tidak perlu hidup melewati tengah malam karena kuncinya sudah berganti
+    sisa = int((datetime.combine(hari, time.max) - datetime.now()).total_seconds()) + 1
+    ttl = max(1, min(ACTIVE_WINDOW_MAX_TTL, sisa))
+    return cache.get_or_set(
+        f"aktif:{hari.isoformat()}", lambda: _build(db, hari), ttl=ttl, tags=["aktivitas", "team"]
+    )
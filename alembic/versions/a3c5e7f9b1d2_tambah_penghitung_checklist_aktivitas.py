@@ -0,0 +1,43 @@
+"""tambah penghitung checklist pada aktivitas
+
+Revision ID: a3c5e7f9b1d2
+Revises: 47eed3ad4a53
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d2'
+down_revision: Union[str, Sequence[str], None] = '47eed3ad4a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('aktivitas', sa.Column('jumlah_dokumen_wajib', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('aktivitas', sa.Column('jumlah_dokumen_terunggah', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('aktivitas', sa.Column('jumlah_dokumen_terverifikasi', sa.Integer(), nullable=False, server_default='0'))
+    # Isi nilai awal dari data daftar_dokumen yang sudah ada
+    op.execute("""
+        UPDATE aktivitas SET
+            jumlah_dokumen_wajib = (
+                SELECT COUNT(*) FROM daftar_dokumen dd WHERE dd.aktivitas_id = aktivitas.id),
+            jumlah_dokumen_terunggah = (
+                SELECT COUNT(dd.dokumen_id) FROM daftar_dokumen dd WHERE dd.aktivitas_id = aktivitas.id),
+            jumlah_dokumen_terverifikasi = (
+                SELECT COUNT(*) FROM daftar_dokumen dd
+                WHERE dd.aktivitas_id = aktivitas.id AND dd.status_pengecekan)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('aktivitas', 'jumlah_dokumen_terverifikasi')
+    op.drop_column('aktivitas', 'jumlah_dokumen_terunggah')
+    op.drop_column('aktivitas', 'jumlah_dokumen_wajib')
@@ -0,0 +1,43 @@
+"""tambah seri aktivitas untuk aktivitas berulang
+
+Revision ID: b7d9f1a3c5e8
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d9f1a3c5e8'
+down_revision: Union[str, Sequence[str], None] = 'a3c5e7f9b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('seri_aktivitas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('aturan', sa.JSON(), nullable=False),
+    sa.Column('creator_user_id', sa.Integer(), nullable=False),
+    sa.Column('dibuat_pada', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['creator_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_seri_aktivitas_id'), 'seri_aktivitas', ['id'], unique=False)
+    op.add_column('aktivitas', sa.Column('seri_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_aktivitas_seri_id'), 'aktivitas', ['seri_id'], unique=False)
+    op.create_foreign_key('aktivitas_seri_id_fkey', 'aktivitas', 'seri_aktivitas', ['seri_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('aktivitas_seri_id_fkey', 'aktivitas', type_='foreignkey')
+    op.drop_index(op.f('ix_aktivitas_seri_id'), table_name='aktivitas')
+    op.drop_column('aktivitas', 'seri_id')
+    op.drop_index(op.f('ix_seri_aktivitas_id'), table_name='seri_aktivitas')
+    op.drop_table('seri_aktivitas')
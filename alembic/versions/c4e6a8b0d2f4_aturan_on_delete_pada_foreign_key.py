@@ -0,0 +1,49 @@
+"""aturan ON DELETE pada foreign key
+
+Revision ID: c4e6a8b0d2f4
+Revises: b7d9f1a3c5e8
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e6a8b0d2f4'
+down_revision: Union[str, Sequence[str], None] = 'b7d9f1a3c5e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabel, kolom, tabel referensi, aturan ON DELETE)
+# Relasi lain (aktivitas.project_id, dokumen.aktivitas_id, aktivitas.creator_user_id,
+# projects.project_leader_id, ...) sengaja tetap RESTRICT dan ditangani API sebagai 409.
+FOREIGN_KEYS = [
+    ('anggota_aktivitas', 'aktivitas_id', 'aktivitas', 'CASCADE'),
+    ('anggota_aktivitas', 'user_id', 'users', 'CASCADE'),
+    ('user_team_link', 'user_id', 'users', 'CASCADE'),
+    ('user_team_link', 'team_id', 'teams', 'CASCADE'),
+    ('daftar_dokumen', 'aktivitas_id', 'aktivitas', 'CASCADE'),
+    ('daftar_dokumen', 'dokumen_id', 'dokumen', 'SET NULL'),
+    ('teams', 'ketua_tim_id', 'users', 'SET NULL'),
+    ('projects', 'team_id', 'teams', 'SET NULL'),
+    ('aktivitas', 'seri_id', 'seri_aktivitas', 'SET NULL'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, referent, ondelete in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, [column], ['id'], ondelete=ondelete)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, referent, _ in reversed(FOREIGN_KEYS):
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, [column], ['id'])
@@ -0,0 +1,35 @@
+"""indeks untuk deteksi bentrok jadwal aktivitas
+
+Revision ID: d5f7a9b1c3e6
+Revises: c4e6a8b0d2f4
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f7a9b1c3e6'
+down_revision: Union[str, Sequence[str], None] = 'c4e6a8b0d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_anggota_aktivitas_user_id'), 'anggota_aktivitas', ['user_id'], unique=False)
+    # Ekspresi harus sama dengan schedule_conflict.rentang_tanggal agar indeks terpakai;
+    # greatest() mencegah error batas rentang pada data lama yang tanggalnya terbalik
+    op.execute(
+        "CREATE INDEX ix_aktivitas_rentang_tanggal ON aktivitas USING gist "
+        "(daterange(tanggal_mulai, greatest(tanggal_mulai, coalesce(tanggal_selesai, tanggal_mulai)), '[]'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_aktivitas_rentang_tanggal")
+    op.drop_index(op.f('ix_anggota_aktivitas_user_id'), table_name='anggota_aktivitas')
@@ -0,0 +1,32 @@
+"""indeks parsial untuk agenda kepala kantor
+
+Revision ID: e6a8c0d2f4b7
+Revises: d5f7a9b1c3e6
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a8c0d2f4b7'
+down_revision: Union[str, Sequence[str], None] = 'd5f7a9b1c3e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_aktivitas_kepala_tanggal', 'aktivitas', ['tanggal_mulai', 'id'], unique=False,
+        postgresql_where=sa.text('melibatkan_kepala IS true'),
+        sqlite_where=sa.text('melibatkan_kepala = 1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_aktivitas_kepala_tanggal', table_name='aktivitas')
@@ -0,0 +1,42 @@
+"""
+Generator dataset sintetis untuk benchmark (memakai seed.py).
+
+Contoh (SQLite sebagai pengganti Postgres lokal):
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.dataset --reset --aktivitas 5000
+"""
+import argparse
+import json
+import os
+
+import database, models, seed
+
+BENCH_PASSWORD = "benchmark123"
+BENCH_DOKUMEN_DIR = os.path.join("dokumen", "benchmark")
+
+
+def generate(config: seed.SeedConfig, engine=None) -> dict:
+    """Mengisi database dengan data sintetis dan mengembalikan ringkasannya."""
+    return seed.seed_bulk(config, engine=engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengisi database dengan data sintetis untuk benchmark.")
+    seed.add_config_arguments(parser)
+    parser.set_defaults(password=BENCH_PASSWORD, dokumen_dir=BENCH_DOKUMEN_DIR)
+    parser.add_argument("--reset", action="store_true", help="Hapus dan buat ulang semua tabel terlebih dahulu.")
+    parser.add_argument("--output", default="bench_dataset.json", help="File ringkasan dataset untuk benchmarks.run.")
+    args = parser.parse_args()
+
+    if args.reset:
+        models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+
+    summary = generate(seed.config_from_args(args))
+    with open(args.output, "w") as handle:
+        json.dump(summary, handle, indent=2, default=str)
+    print(json.dumps(summary["counts"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Load test HTTP untuk rute-rute utama dengan konkurensi tetap.
+
+Hasilnya berupa JSON (p50/p95/p99, throughput, error, jumlah query) yang bisa
+dibandingkan antar commit:
+
+    # terhadap server yang sudah berjalan (jalankan server dengan SINERGI_DEBUG=1
+    # agar jumlah query ikut terbaca dari header X-DB-Queries)
+    python -m benchmarks.run --url http://localhost:8000 --output bench_before.json
+
+    # di dalam proses, memakai DATABASE_URL yang sama dengan dataset
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.run --in-process
+
+    python -m benchmarks.run --compare bench_before.json bench_after.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+import httpx
+
+DEFAULT_SCENARIOS = ["token", "users_me", "aktivitas", "timeline", "upload", "download_all"]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _credentials(dataset: dict) -> List[Dict[str, str]]:
+    """Pasangan username/password dari ringkasan dataset (ringkasan lama hanya punya satu password)."""
+    if dataset.get("credentials"):
+        return dataset["credentials"]
+    return [{"username": username, "password": dataset["password"]} for username in dataset["usernames"]]
+
+
+class Context:
+    def __init__(self, dataset: dict, token: str, rng: random.Random):
+        self.dataset = dataset
+        self.credentials = _credentials(dataset)
+        self.token = token
+        self.rng = rng
+
+    @property
+    def auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def _token(client: httpx.AsyncClient, ctx: Context):
+    return await client.post("/token", data=ctx.rng.choice(ctx.credentials))
+
+
+async def _users_me(client, ctx):
+    return await client.get("/users/me", headers=ctx.auth)
+
+
+async def _aktivitas(client, ctx):
+    return await client.get("/api/aktivitas", headers=ctx.auth)
+
+
+async def _timeline(client, ctx):
+    start = date.fromisoformat(ctx.dataset["config"]["start_date"]) + timedelta(days=ctx.rng.randrange(0, 300))
+    team_ids = ",".join(str(t) for t in ctx.rng.sample(ctx.dataset["team_ids"], min(3, len(ctx.dataset["team_ids"]))))
+    return await client.get("/api/kalender/timeline", headers=ctx.auth, params={
+        "team_ids": team_ids, "start_date": str(start), "end_date": str(start + timedelta(days=30)),
+    })
+
+
+async def _upload(client, ctx):
+    aktivitas_id = ctx.rng.choice(ctx.dataset["aktivitas_ids"])
+    files = {"file": ("bench.pdf", io.BytesIO(os.urandom(32 * 1024)), "application/pdf")}
+    return await client.post(f"/api/aktivitas/{aktivitas_id}/dokumen", headers=ctx.auth,
+                             data={"keterangan": "benchmark"}, files=files)
+
+
+async def _download_all(client, ctx):
+    aktivitas_id = ctx.rng.choice(ctx.dataset["aktivitas_with_files"] or ctx.dataset["aktivitas_ids"])
+    return await client.get(f"/api/aktivitas/{aktivitas_id}/download-all", headers=ctx.auth)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "token": _token,
+    "users_me": _users_me,
+    "aktivitas": _aktivitas,
+    "timeline": _timeline,
+    "upload": _upload,
+    "download_all": _download_all,
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, name: str, requests: int, concurrency: int) -> dict:
+    """Menjalankan `requests` permintaan dengan `concurrency` worker tetap."""
+    scenario = SCENARIOS[name]
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    db_times: List[float] = []
+    status_counts: Dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                status = str(response.status_code)
+                await response.aread()
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+                response = None
+            latencies.append(time.perf_counter() - started)
+            status_counts[status] = status_counts.get(status, 0) + 1
+            if response is not None and "x-db-queries" in response.headers:
+                query_counts.append(int(response.headers["x-db-queries"]))
+                db_times.append(float(response.headers["x-db-time"].rstrip("ms")))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(n for s, n in status_counts.items() if not s.startswith(("2", "3")))
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "errors": errors,
+        "status": status_counts,
+        "db_queries_mean": round(statistics.fmean(query_counts), 2) if query_counts else None,
+        "db_queries_max": max(query_counts) if query_counts else None,
+        "db_time_ms_mean": round(statistics.fmean(db_times), 2) if db_times else None,
+    }
+
+
+async def run(args) -> dict:
+    with open(args.dataset) as handle:
+        dataset = json.load(handle)
+
+    if args.in_process:
+        # Header X-DB-Queries hanya dikirim pada mode debug
+        os.environ.setdefault("SINERGI_DEBUG", "1")
+        import main
+        transport = httpx.ASGITransport(app=main.app)
+        base_url = "http://benchmark"
+    else:
+        transport = None
+        base_url = args.url
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=60) as client:
+        login = await client.post("/token", data=_credentials(dataset)[0])
+        login.raise_for_status()
+        ctx = Context(dataset, login.json()["accessToken"], random.Random(args.seed))
+
+        results = {}
+        for name in args.scenarios:
+            if args.warmup:
+                await run_scenario(client, ctx, name, args.warmup, args.concurrency)
+            results[name] = await run_scenario(client, ctx, name, args.requests, args.concurrency)
+            print(f"{name:>14}: p50={results[name]['p50_ms']}ms p95={results[name]['p95_ms']}ms "
+                  f"p99={results[name]['p99_ms']}ms rps={results[name]['throughput_rps']} "
+                  f"errors={results[name]['errors']}")
+    return {"target": base_url, "counts": dataset["counts"], "scenarios": results}
+
+
+def compare(before_path: str, after_path: str):
+    """Mencetak perbedaan p95 dan throughput antar dua hasil benchmark."""
+    with open(before_path) as handle:
+        before = json.load(handle)["scenarios"]
+    with open(after_path) as handle:
+        after = json.load(handle)["scenarios"]
+    for name in sorted(set(before) & set(after)):
+        b, a = before[name], after[name]
+        delta = (a["p95_ms"] - b["p95_ms"]) / b["p95_ms"] * 100 if b["p95_ms"] else 0.0
+        print(f"{name:>14}: p95 {b['p95_ms']} -> {a['p95_ms']} ms ({delta:+.1f}%), "
+              f"rps {b['throughput_rps']} -> {a['throughput_rps']}, "
+              f"queries {b['db_queries_mean']} -> {a['db_queries_mean']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP untuk API Sinergi.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="Jalankan aplikasi di proses yang sama (ASGI).")
+    parser.add_argument("--dataset", default="bench_dataset.json", help="Ringkasan dari benchmarks.dataset.")
+    parser.add_argument("--scenarios", nargs="+", default=DEFAULT_SCENARIOS, choices=sorted(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Jumlah permintaan per skenario.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Tulis hasil JSON ke file ini (default: stdout).")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import redis
+except ImportError:  # redis bersifat opsional, hanya dibutuhkan untuk backend "redis"
+    redis = None
+
+# ===================================================================
+# KONFIGURASI CACHE
+# ===================================================================
+# Pilihan backend: "memory" (LRU per worker), "redis" (dibagi antar worker), "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+CACHE_KEY_PREFIX = "sinergi:"
+
+
+class CacheStats:
+    """Penghitung hit/miss sederhana yang aman dipakai dari banyak thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class CacheBackend:
+    """
+    Antarmuka dasar cache. Setiap entri boleh memiliki TTL (detik) dan
+    sekumpulan tag (mis. "team:3", "aktivitas:10") untuk invalidasi massal.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[int] = None,
+                   tags: Iterable[str] = ()) -> Any:
+        """Ambil nilai dari cache, atau hitung lewat `factory` lalu simpan."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = factory()
+        if value is not None:
+            self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.stats.snapshot()}
+
+
+class MemoryCache(CacheBackend):
+    """Cache LRU di memori proses. Cepat, tetapi tidak dibagi antar worker."""
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: int = CACHE_DEFAULT_TTL):
+        super().__init__()
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expire_at, value, tags)
+        self._tags: Dict[str, set] = {}
+        self._lock = threading.RLock()
+
+    def _drop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            if entry[0] is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                self.stats.incr("misses")
+                return None
+            self._data.move_to_end(key)
+            self.stats.incr("hits")
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        ttl = self.default_ttl if ttl is None else ttl
+        expire_at = time.monotonic() + ttl if ttl > 0 else None
+        tags = frozenset(tags)
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (expire_at, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_entries:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.stats.incr("evictions")
+        self.stats.incr("sets")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in set(tags):
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    removed += 1
+        self.stats.incr("invalidations", removed)
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        return {**super().info(), "entries": size, "max_entries": self.max_entries}
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache yang dibagi antar worker melalui protokol Redis. `client` boleh diisi
+    dengan klien apa pun yang kompatibel (mis. fakeredis untuk pengembangan lokal).
+    Setiap tag disimpan sebagai SET berisi key yang memakai tag tersebut.
+    """
+    name = "redis"
+
+    def __init__(self, url: str = CACHE_URL, client=None, default_ttl: int = CACHE_DEFAULT_TTL,
+                 prefix: str = CACHE_KEY_PREFIX):
+        super().__init__()
+        if client is None:
+            if redis is None:
+                raise RuntimeError("Paket 'redis' belum terpasang; tidak bisa memakai CACHE_BACKEND=redis.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        ttl = self.default_ttl if ttl is None else ttl
+        full_key = self._key(key)
+        pipe = self.client.pipeline()
+        if ttl > 0:
+            pipe.set(full_key, pickle.dumps(value), ex=ttl)
+        else:
+            pipe.set(full_key, pickle.dumps(value))
+        for tag in set(tags):
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, full_key)
+            # Set tag ikut kedaluwarsa agar tidak menumpuk selamanya
+            if ttl > 0:
+                pipe.expire(tag_key, ttl * 2)
+        pipe.execute()
+        self.stats.incr("sets")
+
+    def delete(self, key: str):
+        self.client.delete(self._key(key))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in set(tags):
+            tag_key = self._tag_key(tag)
+            keys: List[bytes] = list(self.client.smembers(tag_key))
+            if keys:
+                removed += self.client.delete(*keys)
+            self.client.delete(tag_key)
+        self.stats.incr("invalidations", removed)
+        return removed
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class NullCache(CacheBackend):
+    """Backend tanpa penyimpanan; berguna untuk mematikan cache tanpa mengubah kode."""
+    name = "none"
+
+    def get(self, key: str) -> Any:
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        return 0
+
+    def clear(self):
+        pass
+
+
+def create_cache(backend: str = CACHE_BACKEND) -> CacheBackend:
+    """Membuat backend cache sesuai konfigurasi."""
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "redis":
+        return RedisCache()
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"CACHE_BACKEND tidak dikenal: {backend}")
+
+
+# Instance bersama untuk seluruh aplikasi (principal, data referensi, kalender, dst.)
+cache = create_cache()
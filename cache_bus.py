@@ -0,0 +1,216 @@
+import logging
+import os
+import select
+import threading
+from typing import Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+import database, models
+from cache import cache
+
+# ===================================================================
+# BUS INVALIDASI CACHE ANTAR WORKER (POSTGRES LISTEN/NOTIFY)
+# ===================================================================
+# Setiap commit yang mengubah entitas akan mengirim tag cache yang terdampak
+# melalui NOTIFY. Setiap worker menjalankan thread listener yang menghapus tag
+# tersebut dari cache lokalnya, sehingga data basi tidak menunggu TTL habis.
+CACHE_BUS_ENABLED = os.getenv("CACHE_BUS_ENABLED", "1") == "1"
+CACHE_BUS_CHANNEL = "sinergi_cache"
+# Batas payload NOTIFY di Postgres adalah 8000 byte
+_MAX_PAYLOAD = 7900
+_SESSION_KEY = "cache_bus_tags"
+
+logger = logging.getLogger("sinergi.cache_bus")
+
+# Callback yang ikut dipanggil setiap kali tag diinvalidasi (lihat subscribe)
+_subscribers: List[Callable[[Optional[Set[str]]], None]] = []
+
+
+def entity_tags(obj) -> Set[str]:
+    """Menentukan tag cache yang terdampak ketika sebuah entitas berubah."""
+    tags = set()
+    if isinstance(obj, models.Team):
+        tags.update({"team", f"team:{obj.id}"})
+    elif isinstance(obj, models.Aktivitas):
+        tags.update({"aktivitas", f"aktivitas:{obj.id}", "kalender"})
+        # Sertakan tim/proyek lama jika aktivitas dipindahkan
+        state = inspect(obj)
+        for attr, prefix in (("team_id", "team"), ("project_id", "project")):
+            history = state.attrs[attr].history
+            for value in list(history.added) + list(history.deleted) + list(history.unchanged):
+                if value is not None:
+                    tags.add(f"{prefix}:{value}")
+    elif isinstance(obj, models.Project):
+        tags.update({"project", f"project:{obj.id}"})
+        if obj.team_id is not None:
+            tags.add(f"team:{obj.team_id}")
+    elif isinstance(obj, models.DaftarDokumen):
+        tags.update({"daftar_dokumen", f"aktivitas:{obj.aktivitas_id}"})
+    elif isinstance(obj, models.Dokumen):
+        tags.add("dokumen")
+        if obj.aktivitas_id is not None:
+            tags.add(f"aktivitas:{obj.aktivitas_id}")
+        if obj.project_id is not None:
+            tags.add(f"project:{obj.project_id}")
+    elif isinstance(obj, models.User):
+        tags.update({"user", f"user:{obj.id}"})
+    elif isinstance(obj, (models.SistemRole, models.Jabatan)):
+        tags.add("referensi")
+    return tags
+
+
+def _publish(session: Session, tags: Iterable[str]):
+    """
+    Mengirim NOTIFY di dalam transaksi yang sedang berjalan. Postgres baru
+    meneruskan notifikasi saat commit dan membuangnya saat rollback.
+    """
+    if not CACHE_BUS_ENABLED:
+        return
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    chunk = []
+    size = 0
+    for tag in sorted(set(tags)):
+        if chunk and size + len(tag) + 1 > _MAX_PAYLOAD:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                               {"channel": CACHE_BUS_CHANNEL, "payload": ",".join(chunk)})
+            chunk, size = [], 0
+        chunk.append(tag)
+        size += len(tag) + 1
+    if chunk:
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                           {"channel": CACHE_BUS_CHANNEL, "payload": ",".join(chunk)})
+
+
+def mark_dirty(session: Session, *tags: str):
+    """
+    Menandai tag secara manual. Dipakai untuk perubahan yang tidak melewati
+    unit-of-work ORM, misalnya `query.delete()` atau statement UPDATE/INSERT massal.
+    """
+    tags = {tag for tag in tags if tag}
+    if not tags:
+        return
+    session.info.setdefault(_SESSION_KEY, set()).update(tags)
+    _publish(session, tags)
+
+
+def subscribe(callback: Callable[[Optional[Set[str]]], None]):
+    """
+    Mendaftarkan callback untuk setiap invalidasi, baik dari commit di worker
+    ini maupun dari NOTIFY worker lain. Argumennya adalah himpunan tag, atau
+    None jika seluruh cache dikosongkan. Callback dipanggil dari thread
+    listener, jadi harus cepat dan tidak boleh mengakses database.
+    """
+    _subscribers.append(callback)
+    return callback
+
+
+def _notify_subscribers(tags: Optional[Set[str]]):
+    for callback in list(_subscribers):
+        try:
+            callback(tags)
+        except Exception:
+            logger.exception("Subscriber bus cache gagal")
+
+
+def _evict(tags: Iterable[str]):
+    tags = set(tags)
+    if tags:
+        cache.invalidate_tags(tags)
+        _notify_subscribers(tags)
+
+
+@event.listens_for(database.SessionLocal, "after_flush")
+def _collect_flushed_tags(session, flush_context):
+    tags = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tags.update(entity_tags(obj))
+    if tags:
+        session.info.setdefault(_SESSION_KEY, set()).update(tags)
+        _publish(session, tags)
+
+
+@event.listens_for(database.SessionLocal, "after_commit")
+def _evict_committed_tags(session):
+    tags = session.info.pop(_SESSION_KEY, None)
+    if tags:
+        _evict(tags)
+
+
+@event.listens_for(database.SessionLocal, "after_rollback")
+def _discard_tags(session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+class InvalidationListener(threading.Thread):
+    """Thread yang mendengarkan kanal NOTIFY dan menghapus tag dari cache lokal."""
+
+    def __init__(self, engine=None, poll_interval: float = 5.0, reconnect_delay: float = 3.0):
+        super().__init__(name="cache-bus-listener", daemon=True)
+        self.engine = engine or database.engine
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _handle(self, payload: str):
+        _evict(tag for tag in payload.split(",") if tag)
+
+    def _listen(self):
+        pooled = self.engine.raw_connection()
+        # Lepaskan koneksi dari pool karena dipakai permanen oleh listener
+        pooled.detach()
+        conn = pooled.driver_connection
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {CACHE_BUS_CHANNEL}")
+            # Notifikasi mungkin terlewat selama terputus, jadi mulai dari cache kosong
+            cache.clear()
+            _notify_subscribers(None)
+            while not self._stop_event.is_set():
+                if hasattr(conn, "poll"):  # psycopg2
+                    ready, _, _ = select.select([conn], [], [], self.poll_interval)
+                    if not ready:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._handle(conn.notifies.pop(0).payload)
+                else:  # psycopg 3
+                    for notify in conn.notifies(timeout=self.poll_interval):
+                        self._handle(notify.payload)
+        finally:
+            conn.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Listener bus cache terputus, mencoba menyambung ulang")
+                self._stop_event.wait(self.reconnect_delay)
+
+
+_listener = None
+
+
+def start_listener():
+    """Menjalankan listener (sekali per worker) jika database mendukung LISTEN/NOTIFY."""
+    global _listener
+    if not CACHE_BUS_ENABLED or database.engine.dialect.name != "postgresql":
+        return
+    if _listener is None or not _listener.is_alive():
+        _listener = InvalidationListener()
+        _listener.start()
+
+
+def stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
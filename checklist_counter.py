@@ -0,0 +1,93 @@
+import argparse
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, or_, select, update
+
+import database, models
+
+# ===================================================================
+# PENGHITUNG PROGRES CHECKLIST PADA AKTIVITAS
+# ===================================================================
+# Kolom jumlah_dokumen_* di tabel aktivitas adalah salinan denormalisasi dari
+# daftar_dokumen. Setiap endpoint yang mengubah checklist memanggil
+# refresh_counters() sebelum commit sehingga nilainya ikut satu transaksi.
+
+
+def _actual_counts():
+    """Subquery berkorelasi yang menghitung ulang nilai sebenarnya per aktivitas."""
+    dd = models.DaftarDokumen
+    wajib = select(func.count(dd.id)).where(dd.aktivitas_id == models.Aktivitas.id).scalar_subquery()
+    terunggah = select(func.count(dd.dokumen_id)).where(dd.aktivitas_id == models.Aktivitas.id).scalar_subquery()
+    terverifikasi = select(func.count(dd.id)).where(
+        dd.aktivitas_id == models.Aktivitas.id,
+        dd.status_pengecekan.is_(True),
+    ).scalar_subquery()
+    return {
+        "jumlah_dokumen_wajib": wajib,
+        "jumlah_dokumen_terunggah": terunggah,
+        "jumlah_dokumen_terverifikasi": terverifikasi,
+    }
+
+
+def refresh_counters(db, aktivitas_ids: Optional[Iterable[Optional[int]]] = None):
+    """
+    Menghitung ulang penghitung untuk aktivitas tertentu (atau semua jika None)
+    dengan satu UPDATE. `db` boleh berupa Session maupun Connection.
+    """
+    statement = update(models.Aktivitas).values(**_actual_counts())
+    if aktivitas_ids is not None:
+        ids = {aktivitas_id for aktivitas_id in aktivitas_ids if aktivitas_id is not None}
+        if not ids:
+            return
+        statement = statement.where(models.Aktivitas.id.in_(ids))
+    if hasattr(db, "flush"):
+        # Pastikan perubahan checklist yang masih tertunda ikut terhitung
+        db.flush()
+        db.execute(statement, execution_options={"synchronize_session": False})
+    else:
+        db.execute(statement)
+
+
+def find_inconsistent(db, limit: Optional[int] = None) -> List[dict]:
+    """Mengembalikan aktivitas yang penghitungnya tidak sama dengan isi daftar_dokumen."""
+    actual = _actual_counts()
+    columns = [getattr(models.Aktivitas, name) for name in actual]
+    query = select(models.Aktivitas.id, *columns, *actual.values()).where(
+        or_(*(column != actual[column.key] for column in columns))
+    ).order_by(models.Aktivitas.id)
+    if limit is not None:
+        query = query.limit(limit)
+    result = []
+    for row in db.execute(query):
+        stored = row[1:4]
+        expected = row[4:7]
+        result.append({
+            "aktivitas_id": row[0],
+            "tersimpan": dict(zip(actual, stored)),
+            "seharusnya": dict(zip(actual, expected)),
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memeriksa konsistensi penghitung checklist aktivitas.")
+    parser.add_argument("--fix", action="store_true", help="Perbaiki aktivitas yang tidak konsisten.")
+    parser.add_argument("--limit", type=int, default=50, help="Jumlah maksimum baris yang ditampilkan.")
+    args = parser.parse_args()
+
+    db = database.SessionLocal()
+    try:
+        inconsistent = find_inconsistent(db)
+        for item in inconsistent[:args.limit]:
+            print(f"Aktivitas {item['aktivitas_id']}: tersimpan={item['tersimpan']} seharusnya={item['seharusnya']}")
+        print(f"{len(inconsistent)} aktivitas tidak konsisten.")
+        if args.fix and inconsistent:
+            refresh_counters(db, [item["aktivitas_id"] for item in inconsistent])
+            db.commit()
+            print("✅ Penghitung sudah diperbaiki.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import List, Optional
+
+from sqlalchemy import event
+
+import database
+
+# ===================================================================
+# PENCATATAN QUERY DATABASE PER PERMINTAAN
+# ===================================================================
+# Setiap permintaan HTTP mendapat objek RequestDBStats di ContextVar.
+# Handler sinkron FastAPI berjalan di threadpool dengan salinan context,
+# sehingga query dari thread tersebut tetap tercatat ke objek yang sama.
+
+# Mode debug menambahkan header X-DB-Queries / X-DB-Time ke setiap respons
+DB_DEBUG = os.getenv("SINERGI_DEBUG", "0") == "1"
+# Fingerprint yang sama muncul sebanyak ini dalam satu permintaan dianggap N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+logger = logging.getLogger("sinergi.db")
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST_RE = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Menormalkan statement SQL sehingga query yang hanya berbeda parameter
+    (termasuk panjang daftar IN) menghasilkan fingerprint yang sama.
+    """
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?)", sql)
+    sql = _VALUES_LIST_RE.sub(r"\1", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class RequestDBStats:
+    """Jumlah statement, total waktu dan fingerprint query untuk satu permintaan."""
+    __slots__ = ("count", "duration", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        """Fingerprint yang dieksekusi berulang kali (indikasi pola N+1)."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_stats() -> Optional[RequestDBStats]:
+    return _current_stats.get()
+
+
+@event.listens_for(database.engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(database.engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+        stats.fingerprints[fingerprint(statement)] += 1
+
+
+class DBTrackingMiddleware:
+    """
+    Middleware ASGI yang membuka pencatatan query untuk setiap permintaan.
+    Hasilnya juga disimpan di scope["db_stats"] agar bisa dibaca middleware luar.
+    Pola N+1 dicatat ke log; pada mode debug statistik dikirim sebagai header.
+    """
+
+    def __init__(self, app, debug: bool = DB_DEBUG):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestDBStats()
+        scope["db_stats"] = stats
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if self.debug and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time", f"{stats.duration * 1000:.2f}ms".encode()))
+                repeated = stats.repeated()
+                if repeated:
+                    headers.append((b"x-db-repeated-queries", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            for statement, count in stats.repeated():
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.warning("Kemungkinan N+1 di %s %s: %d kali -> %s",
+                               scope["method"], route, count, statement)
+
+
+# ===================================================================
+# HELPER UNTUK PENGUJIAN
+# ===================================================================
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Mencatat semua statement yang dieksekusi engine selama blok berjalan,
+    dari thread mana pun (termasuk thread TestClient).
+    """
+    engine = engine or database.engine
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", _record)
+
+
+@contextmanager
+def assert_query_budget(budget: int, engine=None):
+    """
+    Memastikan sebuah blok (mis. satu panggilan rute lewat TestClient) tidak
+    melebihi jumlah query yang ditentukan.
+
+        with db_tracking.assert_query_budget(4):
+            client.get("/api/teams/1/details")
+    """
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > budget:
+        repeated = Counter(fingerprint(st) for st in statements).most_common(3)
+        detail = "\n".join(f"  {n}x {fp}" for fp, n in repeated)
+        raise QueryBudgetExceeded(
+            f"Jumlah query {len(statements)} melebihi anggaran {budget}. Query terbanyak:\n{detail}"
+        )
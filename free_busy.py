@@ -0,0 +1,148 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+try:
+    import numpy as np
+except ImportError:  # numpy bersifat opsional, hanya dibutuhkan untuk free/busy
+    np = None
+
+import models
+
+# ===================================================================
+# FREE/BUSY DAN PENCARIAN SLOT KOSONG BERSAMA
+# ===================================================================
+# Jam kerja setiap hari dipecah menjadi slot selebar `granularitas` menit.
+# Setiap baris anggota_aktivitas × aktivitas menandai persegi (rentang hari ×
+# rentang slot) pada matriks pengguna × hari × slot lewat difference array,
+# lalu dua kali cumsum menghasilkan jumlah aktivitas per slot sekaligus.
+# Seperti schedule_conflict, jam aktivitas berlaku pada setiap hari di dalam
+# rentang tanggalnya; aktivitas tanpa jam menutup seluruh hari kerja.
+MAX_RENTANG_HARI = 62
+
+
+def _menit(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _runs(mask):
+    """(baris, awal, akhir) dari setiap deret True berurutan pada tiap baris matriks 2D."""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def _load_rows(db: Session, user_ids: List[int], start_date: date, end_date: date):
+    aktivitas = models.Aktivitas
+    anggota = models.anggota_aktivitas_link
+    selesai = func.coalesce(aktivitas.tanggal_selesai, aktivitas.tanggal_mulai)
+    return db.execute(
+        select(anggota.c.user_id, aktivitas.tanggal_mulai, selesai, aktivitas.jam_mulai, aktivitas.jam_selesai)
+        .join(aktivitas, aktivitas.id == anggota.c.aktivitas_id)
+        .where(
+            anggota.c.user_id.in_(user_ids),
+            aktivitas.tanggal_mulai.isnot(None),
+            aktivitas.tanggal_mulai <= end_date,
+            selesai >= start_date,
+        )
+    ).all()
+
+
+def compute(
+    db: Session,
+    user_ids: Iterable[int],
+    start_date: date,
+    end_date: date,
+    granularitas: int = 30,
+    jam_kerja_mulai: time = time(8, 0),
+    jam_kerja_selesai: time = time(16, 0),
+    durasi_minimal: Optional[int] = None,
+    hari_kerja_saja: bool = True,
+) -> dict:
+    """
+    Menghitung interval sibuk per pegawai dan slot kosong bersama. ValueError
+    dilempar untuk parameter yang tidak valid, RuntimeError jika numpy tidak ada.
+    """
+    if np is None:
+        raise RuntimeError("Paket 'numpy' belum terpasang; fitur free/busy tidak tersedia.")
+    if end_date < start_date:
+        raise ValueError("Tanggal selesai tidak boleh sebelum tanggal mulai.")
+    if (end_date - start_date).days + 1 > MAX_RENTANG_HARI:
+        raise ValueError(f"Rentang tanggal maksimal {MAX_RENTANG_HARI} hari.")
+    kerja_mulai, kerja_selesai = _menit(jam_kerja_mulai), _menit(jam_kerja_selesai)
+    if kerja_selesai <= kerja_mulai:
+        raise ValueError("Jam kerja selesai harus setelah jam kerja mulai.")
+
+    users = db.query(models.User.id, models.User.nama_lengkap).filter(
+        models.User.id.in_(set(user_ids))
+    ).order_by(models.User.id).all()
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    if hari_kerja_saja:
+        days = [day for day in days if day.weekday() < 5]
+    n_users, n_days = len(users), len(days)
+    n_slots = -(-(kerja_selesai - kerja_mulai) // granularitas)
+
+    # Indeks hari di dalam `days`; hari libur dipetakan ke hari kerja berikutnya
+    ordinal_awal = start_date.toordinal()
+    day_index = np.searchsorted(
+        np.array([day.toordinal() for day in days], dtype=np.int64),
+        np.arange(ordinal_awal, end_date.toordinal() + 2),
+    )
+
+    diff = np.zeros((n_users, n_days + 1, n_slots + 1), dtype=np.int32)
+    rows = _load_rows(db, [user_id for user_id, _ in users], start_date, end_date) if users and days else []
+    if rows:
+        user_index = {user_id: i for i, (user_id, _) in enumerate(users)}
+        u = np.fromiter((user_index[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        d0 = np.fromiter((max(row[1], start_date).toordinal() for row in rows), dtype=np.int64, count=len(rows))
+        d1 = np.fromiter((min(row[2], end_date).toordinal() for row in rows), dtype=np.int64, count=len(rows))
+        m0 = np.fromiter((_menit(row[3]) if row[3] else 0 for row in rows), dtype=np.int64, count=len(rows))
+        m1 = np.fromiter(
+            (_menit(row[4]) if row[3] and row[4] else 24 * 60 for row in rows), dtype=np.int64, count=len(rows)
+        )
+
+        d0 = day_index[d0 - ordinal_awal]
+        d1 = day_index[d1 - ordinal_awal + 1]
+        s0 = np.clip((m0 - kerja_mulai) // granularitas, 0, n_slots)
+        s1 = np.clip(-(-(m1 - kerja_mulai) // granularitas), 0, n_slots)
+        valid = (d0 < d1) & (s0 < s1)
+        u, d0, d1, s0, s1 = u[valid], d0[valid], d1[valid], s0[valid], s1[valid]
+
+        np.add.at(diff, (u, d0, s0), 1)
+        np.add.at(diff, (u, d0, s1), -1)
+        np.add.at(diff, (u, d1, s0), -1)
+        np.add.at(diff, (u, d1, s1), 1)
+    busy = diff.cumsum(axis=1).cumsum(axis=2)[:, :n_days, :n_slots] > 0
+
+    def waktu(day_i: int, slot: int) -> datetime:
+        menit = min(kerja_mulai + int(slot) * granularitas, kerja_selesai)
+        return datetime.combine(days[day_i], time(menit // 60, menit % 60))
+
+    sibuk: Dict[int, list] = {i: [] for i in range(n_users)}
+    rows_i, starts, ends = _runs(busy.reshape(n_users * n_days, n_slots))
+    for row, start, end in zip(rows_i.tolist(), starts.tolist(), ends.tolist()):
+        user_i, day_i = divmod(row, n_days)
+        sibuk[user_i].append({"mulai": waktu(day_i, start), "selesai": waktu(day_i, end)})
+
+    minimal_slot = max(1, -(-(durasi_minimal or granularitas) // granularitas))
+    slot_kosong = []
+    days_i, starts, ends = _runs(~busy.any(axis=0))
+    for day_i, start, end in zip(days_i.tolist(), starts.tolist(), ends.tolist()):
+        if end - start >= minimal_slot:
+            slot_kosong.append({"mulai": waktu(day_i, start), "selesai": waktu(day_i, end)})
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "granularitas": granularitas,
+        "pegawai": [
+            {"id": user_id, "nama_lengkap": nama, "sibuk": sibuk[i]}
+            for i, (user_id, nama) in enumerate(users)
+        ],
+        "slot_kosong": slot_kosong,
+    }
@@ -0,0 +1,154 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# ===================================================================
+# LOGGING TERSTRUKTUR (JSON) TANPA MEMBLOKIR PERMINTAAN
+# ===================================================================
+# Semua logger aplikasi berada di bawah namespace "sinergi". Handler yang
+# dipasang hanya memasukkan record ke antrean; penulisan ke stdout dilakukan
+# oleh thread QueueListener di latar belakang.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Proporsi record DEBUG yang benar-benar ditulis (0..1)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOGGER_NAMESPACE = "sinergi"
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atribut bawaan LogRecord; sisanya dianggap field tambahan dari `extra=`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sample_rate"}
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Menempelkan request id dari ContextVar (dibaca di thread pemanggil)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Hanya meneruskan sebagian record DEBUG. Laju per record bisa diatur
+    dengan `extra={"sample_rate": 0.01}`.
+    """
+
+    def __init__(self, rate: float = LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, "sample_rate", self.rate)
+        return rate >= 1 or random.random() < rate
+
+
+class _StructuredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Jangan format ke string di sini agar field tambahan tetap terstruktur;
+        # cukup bekukan pesan dan traceback supaya aman dikirim ke thread lain.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """Memasang handler antrean untuk namespace "sinergi" (aman dipanggil berulang)."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = _StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter())
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger(LOGGER_NAMESPACE)
+    root.setLevel(level)
+    root.handlers = [queue_handler]
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Menunggu antrean log kosong lalu menghentikan thread penulis."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """Memakai header X-Request-ID dari klien (atau membuat baru) dan mengembalikannya di respons."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
@@ -1,27 +1,61 @@
 from fastapi import (FastAPI, Depends, HTTPException, status, Response, File,
                      UploadFile, Form, Query)
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import or_, desc, and_
-from sqlalchemy.orm import Session, joinedload  
+from sqlalchemy import (or_, desc, and_, func, case, update, values, column, bindparam, Integer, Boolean,
+                        select, insert, delete, exists, literal, true)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List,  Optional
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from datetime import timedelta, date, datetime
+from datetime import timedelta, date, datetime, time
 
 import models, database, schemas, security
-import os, shutil, uuid, io, zipfile
+from cache import cache
+import cache_bus
+import checklist_counter
+import recurrence
+import schedule_conflict
+import free_busy
+import workload
+import active_window
+import user_import
+from singleflight import SingleFlightMiddleware
+from db_tracking import DBTrackingMiddleware
+import metrics
+import slow_query
+import profiling
+import logging_config
+import os, shutil, uuid, io, zipfile, logging, csv, json, base64, binascii
 
 # ===================================================================
 # INISIALISASI & KONFIGURASI
 # ===================================================================
+logging_config.setup_logging()
+logger = logging.getLogger("sinergi.api")
+
 models.Base.metadata.create_all(bind=database.engine)
 app = FastAPI()
+# Semua rute memakai ProfilingRoute agar bisa diprofil per permintaan oleh Superadmin
+app.router.route_class = profiling.ProfilingRoute
 
 origins = [
     "*"
     ]
 
+# Middleware yang didaftarkan belakangan membungkus yang lebih dulu:
+# CORS -> RequestId -> Profiling -> Metrics -> SingleFlight -> DBTracking -> aplikasi
+app.add_middleware(DBTrackingMiddleware)
+# Gabungkan GET identik yang datang bersamaan (mis. timeline kalender pukul 08.00).
+# Didaftarkan sebelum CORS agar header CORS tetap dihitung per permintaan.
+app.add_middleware(SingleFlightMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(logging_config.RequestIdMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -41,6 +75,18 @@ if not os.path.exists(UPLOAD_PROFILE_PIC_DIR):
     os.makedirs(UPLOAD_PROFILE_PIC_DIR)
 app.mount("/profile-picture", StaticFiles(directory="profile-picture"), name="profile-picture")
 
+@app.on_event("startup")
+def start_background_workers():
+    # Dengarkan invalidasi cache dari worker lain
+    cache_bus.start_listener()
+    profiling.start_global_sampler()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    cache_bus.stop_listener()
+    profiling.stop_global_sampler()
+    security.shutdown_hash_pool()
+
 def get_document_path(db: Session, project_id: Optional[int] = None, aktivitas_id: Optional[int] = None):
     """
     Fungsi pembantu untuk membangun jalur penyimpanan file berdasarkan
@@ -102,6 +148,91 @@ def get_document_path(db: Session, project_id: Optional[int] = None, aktivitas_i
         
     return base_path
 
+def insert_ignore(db: Session, table):
+    """
+    Membuat statement INSERT yang melewati baris duplikat
+    (ON CONFLICT DO NOTHING) sesuai dialek database yang dipakai.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+def execute_delete(db: Session, statement, conflict_detail: str, conflict_status: int = status.HTTP_409_CONFLICT):
+    """
+    Menjalankan satu statement DELETE. Data turunan dibersihkan oleh aturan
+    ON DELETE di database; pelanggaran RESTRICT diubah menjadi HTTPException.
+    """
+    try:
+        return db.execute(statement).all()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=conflict_status, detail=conflict_detail)
+
+def cek_konflik_jadwal(db: Session, aktivitas, user_ids, strict: bool, kecuali_aktivitas_id: Optional[int] = None) -> List[dict]:
+    """
+    Mencari bentrok jadwal anggota untuk aktivitas yang diusulkan. Dalam mode
+    strict, bentrok membuat permintaan ditolak dengan 409.
+    """
+    konflik = schedule_conflict.find_conflicts(
+        db, user_ids,
+        aktivitas.tanggal_mulai, aktivitas.tanggal_selesai,
+        aktivitas.jam_mulai, aktivitas.jam_selesai,
+        kecuali_aktivitas_ids=[kecuali_aktivitas_id],
+    )
+    if konflik and strict:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={
+            "pesan": "Jadwal bentrok dengan aktivitas lain dari anggota yang dipilih.",
+            "konflik": [schemas.KonflikJadwal(**item).model_dump(by_alias=True, mode="json") for item in konflik],
+        })
+    return konflik
+
+def sync_anggota_aktivitas(db: Session, aktivitas_ids: List[int], user_ids: set):
+    """Menyamakan anggota beberapa aktivitas sekaligus dengan daftar user_ids."""
+    if not aktivitas_ids:
+        return
+    anggota = models.anggota_aktivitas_link
+    # Hapus anggota yang tidak dipilih lagi
+    db.execute(anggota.delete().where(
+        anggota.c.aktivitas_id.in_(aktivitas_ids),
+        anggota.c.user_id.notin_(user_ids),
+    ))
+    # Tambahkan anggota baru; yang sudah ada diabaikan oleh ON CONFLICT DO NOTHING
+    if user_ids:
+        db.execute(insert_ignore(db, anggota).from_select(
+            ["aktivitas_id", "user_id"],
+            select(models.Aktivitas.id, models.User.id)
+            .select_from(models.Aktivitas)
+            .join(models.User, true())
+            .where(models.Aktivitas.id.in_(aktivitas_ids), models.User.id.in_(user_ids)),
+        ))
+
+def sync_daftar_dokumen(db: Session, aktivitas_ids: List[int], nama_dokumen: set):
+    """Menyamakan daftar dokumen wajib beberapa aktivitas sekaligus dengan nama_dokumen."""
+    if not aktivitas_ids:
+        return
+    existing = set(db.execute(
+        select(models.DaftarDokumen.aktivitas_id, models.DaftarDokumen.nama_dokumen)
+        .where(models.DaftarDokumen.aktivitas_id.in_(aktivitas_ids))
+    ).all())
+
+    if any(nama not in nama_dokumen for _, nama in existing):
+        db.execute(models.DaftarDokumen.__table__.delete().where(
+            models.DaftarDokumen.aktivitas_id.in_(aktivitas_ids),
+            models.DaftarDokumen.nama_dokumen.notin_(nama_dokumen),
+        ))
+
+    docs_to_add = [
+        {"nama_dokumen": nama, "aktivitas_id": aktivitas_id, "status_pengecekan": False}
+        for aktivitas_id in aktivitas_ids
+        for nama in sorted(nama_dokumen)
+        if (aktivitas_id, nama) not in existing
+    ]
+    if docs_to_add:
+        db.execute(insert(models.DaftarDokumen.__table__), docs_to_add)
+
 # ===================================================================
 # ENDPOINT OTENTIKASI & PENGGUNA
 # ===================================================================
@@ -213,6 +344,39 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     db.refresh(new_user)
     return new_user
 
+@app.post("/api/users/import", response_model=schemas.UserImportHasil, response_model_by_alias=True, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
+def import_users(
+    file: UploadFile = File(...),
+    update_existing: bool = Form(False),
+    dry_run: bool = Form(False),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Mengimpor banyak pengguna dari file CSV atau XLSX dengan kolom username,
+    password, nama_lengkap, sistem_role (nama atau sistem_role_id), dan jabatan
+    (nama atau jabatan_id). Mengembalikan laporan kesalahan per baris.
+    """
+    if not file.filename or not file.filename.lower().endswith((".csv", ".xlsx")):
+        raise HTTPException(status_code=400, detail="Format file harus .csv atau .xlsx")
+    try:
+        report = user_import.import_users(
+            db, file.file, file.filename, update_existing=update_existing, dry_run=dry_run
+        )
+    except (ValueError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"File tidak dapat diproses: {e}")
+    finally:
+        file.file.close()
+
+    if dry_run:
+        db.rollback()
+    else:
+        if report["dibuat"] or report["diperbarui"]:
+            cache_bus.mark_dirty(db, "user")
+        db.commit()
+    logger.info("Impor pengguna selesai", extra={k: v for k, v in report.items() if k != "errors"})
+    return report
+
 @app.get("/api/users", response_model=schemas.UserPage, response_model_by_alias=True)
 def get_all_users(
     db: Session = Depends(database.get_db),
@@ -262,16 +426,17 @@ def update_user(user_id: int, user_update: schemas.UserUpdate, db: Session = Dep
 @app.delete("/api/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(security.require_role(["Superadmin"]))])
 def delete_user(user_id: int, db: Session = Depends(database.get_db)):
     """Menghapus pengguna berdasarkan ID (hanya Superadmin)."""
-    
-    # Cari pengguna di database
-    user_query = db.query(models.User).filter(models.User.id == user_id)
-    db_user = user_query.first()
-    
-    if db_user is None:
+    # Keanggotaan tim/aktivitas ikut terhapus (CASCADE), jabatan ketua tim dikosongkan (SET NULL)
+    deleted = execute_delete(
+        db,
+        delete(models.User.__table__).where(models.User.id == user_id).returning(models.User.id),
+        "Pengguna tidak dapat dihapus karena masih menjadi pembuat aktivitas atau pemimpin proyek.",
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="User tidak ditemukan")
-        
-    # Hapus pengguna
-    user_query.delete(synchronize_session=False)
+
+    # Bulk delete tidak melewati event ORM, jadi tandai tag cache secara manual
+    cache_bus.mark_dirty(db, "user", f"user:{user_id}", "team", "aktivitas", "kalender")
     db.commit()
     
     # Kembalikan respons tanpa konten
@@ -306,6 +471,78 @@ def create_team(team: schemas.TeamCreate, db: Session = Depends(database.get_db)
     db.refresh(db_team)
     return db_team
 
+@app.post("/api/teams/rollover", response_model=schemas.TeamRolloverHasil, response_model_by_alias=True, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
+def rollover_teams(payload: schemas.TeamRollover, db: Session = Depends(database.get_db)):
+    """
+    Menyalin sekumpulan tim ke periode baru beserta ketua, warna, anggota,
+    dan (opsional) proyeknya. Semua salinan dibuat dengan beberapa statement
+    INSERT ... SELECT dalam satu transaksi. Gunakan dryRun untuk pratinjau.
+    """
+    team_ids = sorted(set(payload.team_ids))
+    source_teams = db.query(models.Team).filter(models.Team.id.in_(team_ids)).order_by(models.Team.id).all()
+    missing_ids = sorted(set(team_ids) - {team.id for team in source_teams})
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Tim tidak ditemukan: {missing_ids}")
+
+    link = models.user_team_link
+    jumlah_anggota = dict(db.query(link.c.team_id, func.count()).filter(
+        link.c.team_id.in_(team_ids)).group_by(link.c.team_id).all())
+    jumlah_proyek = {}
+    if payload.sertakan_proyek:
+        jumlah_proyek = dict(db.query(models.Project.team_id, func.count(models.Project.id)).filter(
+            models.Project.team_id.in_(team_ids)).group_by(models.Project.team_id).all())
+
+    new_ids = [None] * len(source_teams)
+    if not payload.dry_run:
+        # 1. Tim baru, id dikembalikan sesuai urutan baris yang dikirim
+        table = models.Team.__table__
+        new_ids = list(db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            [{
+                "nama_tim": team.nama_tim,
+                "valid_from": payload.valid_from,
+                "valid_until": payload.valid_until,
+                "ketua_tim_id": team.ketua_tim_id,
+                "warna": team.warna,
+            } for team in source_teams],
+        ).scalars())
+        team_baru = case(dict(zip((team.id for team in source_teams), new_ids)), value=link.c.team_id)
+
+        # 2. Anggota: satu INSERT ... SELECT dari tautan tim lama
+        db.execute(insert(link).from_select(
+            ["user_id", "team_id"],
+            select(link.c.user_id, team_baru).where(link.c.team_id.in_(team_ids)),
+        ))
+
+        # 3. Proyek (opsional): satu INSERT ... SELECT dari proyek tim lama
+        if payload.sertakan_proyek:
+            project_table = models.Project.__table__
+            db.execute(insert(project_table).from_select(
+                ["nama_project", "team_id", "project_leader_id"],
+                select(
+                    project_table.c.nama_project,
+                    case(dict(zip((team.id for team in source_teams), new_ids)), value=project_table.c.team_id),
+                    project_table.c.project_leader_id,
+                ).where(project_table.c.team_id.in_(team_ids)).order_by(project_table.c.id),
+            ))
+
+        cache_bus.mark_dirty(db, "team", "project", "user")
+        db.commit()
+        logger.info("Rollover tim selesai", extra={"team_lama": team_ids, "team_baru": new_ids})
+
+    return {
+        "dry_run": payload.dry_run,
+        "valid_from": payload.valid_from,
+        "valid_until": payload.valid_until,
+        "teams": [{
+            "team_lama_id": team.id,
+            "team_baru_id": new_id,
+            "nama_tim": team.nama_tim,
+            "jumlah_anggota": jumlah_anggota.get(team.id, 0),
+            "jumlah_proyek": jumlah_proyek.get(team.id, 0),
+        } for team, new_id in zip(source_teams, new_ids)],
+    }
+
 @app.get("/api/teams", response_model=schemas.TeamPage, response_model_by_alias=True)
 def get_all_teams(
     db: Session = Depends(database.get_db),
@@ -324,19 +561,12 @@ def get_all_teams(
 def get_active_teams(
     db: Session = Depends(database.get_db)
 ):
-    today = date.today()
-    teams = (
-        db.query(models.Team)
-        .filter(
-            and_(
-                models.Team.valid_from <= today,
-                models.Team.valid_until >= today
-            )
-        )
-        .order_by(models.Team.nama_tim.asc())
-        .all()
-    )
-    return teams
+    team_ids = active_window.get(db)["teams"]
+    if not team_ids:
+        return []
+    teams = {team.id: team for team in db.query(models.Team).filter(models.Team.id.in_(team_ids))}
+    # Pertahankan urutan nama dari indeks aktif
+    return [teams[team_id] for team_id in team_ids if team_id in teams]
 
 @app.put("/api/teams/{team_id}", response_model=schemas.Team, response_model_by_alias=True,
           dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
@@ -373,23 +603,18 @@ def update_team(team_id: int, team_update: schemas.TeamUpdate, db: Session = Dep
 @app.delete("/api/teams/{team_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(security.require_role(["Superadmin"]))])
 def delete_team(team_id: int, db: Session = Depends(database.get_db)):
     """Menghapus tim (hanya Superadmin), tetapi hanya jika tidak memiliki aktivitas terkait."""
-    
-    # 1. Cari tim yang akan dihapus
-    db_team = db.query(models.Team).filter(models.Team.id == team_id).first()
-
-    if db_team is None:
+    # Anggota tim ikut terhapus (CASCADE) dan proyek dilepas dari tim (SET NULL);
+    # aktivitas yang masih merujuk tim membuat penghapusan ditolak (RESTRICT)
+    deleted = execute_delete(
+        db,
+        delete(models.Team.__table__).where(models.Team.id == team_id).returning(models.Team.id),
+        "Gagal menghapus tim. Tim ini masih memiliki aktivitas terkait.",
+        conflict_status=400,
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Tim tidak ditemukan")
 
-    # 2. Cek apakah tim memiliki aktivitas terkait
-    if db_team.aktivitas:
-        raise HTTPException(
-            status_code=400,
-            detail="Gagal menghapus tim. Tim ini masih memiliki aktivitas terkait."
-        )
-
-    # 3. Jika tidak ada aktivitas terkait, hapus tim
-    # Anda harus menghapus data di tabel perantara secara manual (jika ada) sebelum menghapus tim utama
-    db.delete(db_team)
+    cache_bus.mark_dirty(db, "team", f"team:{team_id}", "project", "user")
     db.commit()
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -452,30 +677,132 @@ def remove_team_member(team_id: int, user_id: int, db: Session = Depends(databas
 
     return db_team
 
+@app.put("/api/teams/{team_id}/members", response_model=schemas.Team, response_model_by_alias=True, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
+def set_team_members(team_id: int, members: schemas.TeamMembersUpdate, db: Session = Depends(database.get_db)):
+    """
+    Menyamakan anggota tim dengan daftar yang dikirim. Selisihnya dihitung di
+    database: anggota yang tidak ada di daftar dihapus dan anggota baru
+    ditambahkan dalam satu transaksi. Ketua tim selalu tetap menjadi anggota.
+    """
+    ketua_tim_id = db.query(models.Team.ketua_tim_id).filter(models.Team.id == team_id).first()
+    if ketua_tim_id is None:
+        raise HTTPException(status_code=404, detail="Tim tidak ditemukan")
+    ketua_tim_id = ketua_tim_id[0]
+
+    target_ids = set(members.user_ids)
+    if ketua_tim_id is not None:
+        target_ids.add(ketua_tim_id)
+
+    found_ids = {row[0] for row in db.query(models.User.id).filter(models.User.id.in_(target_ids))}
+    missing_ids = sorted(target_ids - found_ids)
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"User tidak ditemukan: {missing_ids}")
+
+    link = models.user_team_link
+    # 1. Hapus anggota yang tidak ada di daftar target
+    removed = db.execute(
+        link.delete().where(link.c.team_id == team_id, link.c.user_id.notin_(target_ids))
+    ).rowcount
+    # 2. Tambahkan anggota target yang belum tercatat
+    added = 0
+    if target_ids:
+        added = db.execute(
+            insert(link).from_select(
+                ["user_id", "team_id"],
+                select(models.User.id, literal(team_id)).where(
+                    models.User.id.in_(target_ids),
+                    ~exists().where(link.c.team_id == team_id, link.c.user_id == models.User.id),
+                ),
+            )
+        ).rowcount
+
+    if removed or added:
+        cache_bus.mark_dirty(db, "team", f"team:{team_id}", "user")
+    db.commit()
+    logger.info("Anggota tim disinkronkan", extra={"team_id": team_id, "ditambah": added, "dihapus": removed})
+
+    return db.query(models.Team).options(
+        joinedload(models.Team.ketua_tim),
+        joinedload(models.Team.users).joinedload(models.User.jabatan),
+        joinedload(models.Team.users).joinedload(models.User.sistem_role)
+    ).filter(models.Team.id == team_id).first()
+
+# Jumlah aktivitas per proyek yang ikut dikirim di detail tim; sisanya
+# diambil lewat /api/projects/{id}/aktivitas?after=<cursor>
+TEAM_DETAIL_AKTIVITAS_LIMIT = int(os.getenv("TEAM_DETAIL_AKTIVITAS_LIMIT", "20"))
+
+def _aktivitas_urutan():
+    """Urutan aktivitas di dalam proyek: tanggal mulai (kosong lebih dulu), lalu id."""
+    return (models.Aktivitas.tanggal_mulai.asc().nulls_first(), models.Aktivitas.id.asc())
+
+def _encode_aktivitas_cursor(aktivitas: models.Aktivitas) -> str:
+    tanggal = aktivitas.tanggal_mulai.isoformat() if aktivitas.tanggal_mulai else None
+    return base64.urlsafe_b64encode(json.dumps([tanggal, aktivitas.id]).encode()).decode()
+
+def _aktivitas_setelah_cursor(cursor: str):
+    """Kondisi keyset untuk aktivitas yang berada setelah cursor pada _aktivitas_urutan()."""
+    try:
+        tanggal, aktivitas_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        tanggal = date.fromisoformat(tanggal) if tanggal else None
+        aktivitas_id = int(aktivitas_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    if tanggal is None:
+        return or_(
+            models.Aktivitas.tanggal_mulai.isnot(None),
+            and_(models.Aktivitas.tanggal_mulai.is_(None), models.Aktivitas.id > aktivitas_id),
+        )
+    return or_(
+        models.Aktivitas.tanggal_mulai > tanggal,
+        and_(models.Aktivitas.tanggal_mulai == tanggal, models.Aktivitas.id > aktivitas_id),
+    )
+
 @app.get("/api/teams/{team_id}/details", response_model=schemas.TeamDetail, response_model_by_alias=True)
 def get_team_details_with_activities(team_id: int, db: Session = Depends(database.get_db)):
     """
     Mengambil detail satu tim, termasuk proyek (dengan aktivitas di dalamnya), anggota, dan ketua.
+    Setiap proyek hanya memuat TEAM_DETAIL_AKTIVITAS_LIMIT aktivitas pertama; jika masih ada
+    lanjutannya, `aktivitasCursor` berisi cursor untuk /api/projects/{id}/aktivitas.
     """
+    # selectinload: setiap relasi diambil dengan query terpisah (IN ...) sehingga
+    # tidak terbentuk produk kartesius anggota × proyek × aktivitas
     db_team = db.query(models.Team).options(
-        joinedload(models.Team.ketua_tim).joinedload(models.User.jabatan),
-        joinedload(models.Team.users).joinedload(models.User.jabatan),
-        
-        # Eager load projects dan nested activities di dalamnya
-        joinedload(models.Team.projects).joinedload(models.Project.aktivitas).joinedload(models.Aktivitas.users)
-        
+        selectinload(models.Team.ketua_tim).selectinload(models.User.jabatan),
+        selectinload(models.Team.users).selectinload(models.User.jabatan),
+        selectinload(models.Team.projects).selectinload(models.Project.project_leader),
     ).filter(models.Team.id == team_id).first()
     
     if not db_team:
         raise HTTPException(status_code=404, detail="Tim tidak ditemukan")
 
-    # Opsional: Urutkan aktivitas di dalam setiap proyek
+    project_ids = [project.id for project in db_team.projects]
+    per_project = {project_id: [] for project_id in project_ids}
+    if project_ids:
+        # Batasi aktivitas per proyek di SQL; satu baris ekstra menandakan masih ada lanjutan
+        nomor = func.row_number().over(
+            partition_by=models.Aktivitas.project_id,
+            order_by=_aktivitas_urutan(),
+        ).label("nomor")
+        ranked = select(models.Aktivitas.id, nomor).where(models.Aktivitas.project_id.in_(project_ids)).subquery()
+        aktivitas = db.query(models.Aktivitas).join(ranked, ranked.c.id == models.Aktivitas.id).options(
+            selectinload(models.Aktivitas.users)
+        ).filter(ranked.c.nomor <= TEAM_DETAIL_AKTIVITAS_LIMIT + 1).order_by(
+            models.Aktivitas.project_id, ranked.c.nomor
+        ).all()
+        for item in aktivitas:
+            per_project[item.project_id].append(item)
+
     for project in db_team.projects:
-        project.aktivitas = sorted(project.aktivitas, key=lambda a: a.tanggal_mulai if a.tanggal_mulai else date.min)
+        items = per_project[project.id]
+        # set_committed_value: isi koleksi tanpa menandai objek sebagai berubah
+        set_committed_value(project, "aktivitas", items[:TEAM_DETAIL_AKTIVITAS_LIMIT])
+        project.aktivitas_cursor = (
+            _encode_aktivitas_cursor(items[TEAM_DETAIL_AKTIVITAS_LIMIT - 1])
+            if len(items) > TEAM_DETAIL_AKTIVITAS_LIMIT else None
+        )
     
-    # Hapus properti aktivitas yang ada di level tim
-    # Karena kita akan menampilkan aktivitas per proyek
-    db_team.aktivitas = []
+    # Aktivitas ditampilkan per proyek, bukan di level tim
+    set_committed_value(db_team, "aktivitas", [])
     
     return db_team
 
@@ -548,33 +875,42 @@ def get_project_by_id(project_id: int, db: Session = Depends(database.get_db)):
     if not db_project:
         raise HTTPException(status_code=404, detail="Proyek tidak ditemukan")
 
-    # Filter dan muat hanya aktivitas yang sedang aktif
-    today = date.today()
+    # Muat hanya aktivitas yang sedang aktif; ID-nya diambil dari indeks harian yang di-cache
+    active_ids = active_window.get(db)["aktivitas_per_proyek"].get(project_id, ())
     active_aktivitas = db.query(models.Aktivitas).options(
         joinedload(models.Aktivitas.daftar_dokumen_wajib)
-    ).with_parent(db_project).filter(
-        or_( # Gunakan OR untuk dua kondisi
-            # Kondisi 1: Aktivitas dengan rentang tanggal
-            and_(
-                models.Aktivitas.tanggal_selesai.isnot(None),
-                models.Aktivitas.tanggal_mulai <= today,
-                models.Aktivitas.tanggal_selesai >= today
-            ),
-            # Kondisi 2: Aktivitas satu hari tanpa jam
-            and_(
-                models.Aktivitas.tanggal_selesai.is_(None),
-                models.Aktivitas.jam_mulai.is_(None),
-                models.Aktivitas.jam_selesai.is_(None),
-                models.Aktivitas.tanggal_mulai == today
-            )
-        )
-    ).all()
+    ).filter(models.Aktivitas.id.in_(active_ids)).order_by(models.Aktivitas.id).all() if active_ids else []
 
-    # Tambahkan daftar aktivitas yang sudah difilter ke objek proyek
-    db_project.aktivitas = active_aktivitas
+    # Tambahkan daftar aktivitas yang sudah difilter ke objek proyek (tanpa menandai relasi berubah)
+    set_committed_value(db_project, "aktivitas", active_aktivitas)
 
     return db_project
 
+
+@app.get("/api/projects/{project_id}/aktivitas", response_model=schemas.ProjectAktivitasPage, response_model_by_alias=True)
+def get_project_aktivitas(
+    project_id: int,
+    after: Optional[str] = None,
+    limit: int = Query(TEAM_DETAIL_AKTIVITAS_LIMIT, ge=1, le=200),
+    db: Session = Depends(database.get_db),
+):
+    """
+    Lanjutan daftar aktivitas proyek (urutan sama dengan detail tim) memakai
+    paginasi keyset: `after` adalah cursor dari respons sebelumnya.
+    """
+    if not db.query(exists().where(models.Project.id == project_id)).scalar():
+        raise HTTPException(status_code=404, detail="Proyek tidak ditemukan")
+
+    query = db.query(models.Aktivitas).options(selectinload(models.Aktivitas.users)).filter(
+        models.Aktivitas.project_id == project_id
+    )
+    if after:
+        query = query.filter(_aktivitas_setelah_cursor(after))
+    items = query.order_by(*_aktivitas_urutan()).limit(limit + 1).all()
+
+    cursor = _encode_aktivitas_cursor(items[limit - 1]) if len(items) > limit else None
+    return {"items": items[:limit], "cursor": cursor}
+
 @app.put("/api/projects/{project_id}", response_model=schemas.Project, response_model_by_alias=True)
 def update_project(project_id: int, project_update: schemas.ProjectUpdate, db: Session = Depends(database.get_db)):
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -591,30 +927,71 @@ def update_project(project_id: int, project_update: schemas.ProjectUpdate, db: S
 @app.delete("/api/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
 def delete_project(project_id: int, db: Session = Depends(database.get_db)):
     """Menghapus proyek (hanya Superadmin atau Admin)."""
-    project_query = db.query(models.Project).filter(models.Project.id == project_id)
-    db_project = project_query.first()
-
-    if db_project is None:
+    deleted = execute_delete(
+        db,
+        delete(models.Project.__table__).where(models.Project.id == project_id).returning(models.Project.team_id),
+        "Proyek tidak dapat dihapus karena masih memiliki aktivitas atau dokumen terkait.",
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Proyek tidak ditemukan")
-    
-    project_query.delete(synchronize_session=False)
+
+    team_id = deleted[0][0]
+    cache_bus.mark_dirty(db, "project", f"project:{project_id}", f"team:{team_id}" if team_id else None)
     db.commit()
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@app.post("/api/projects/bulk-delete", response_model=schemas.BulkDeleteHasil, response_model_by_alias=True, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
+def bulk_delete_projects(payload: schemas.BulkDeleteRequest, db: Session = Depends(database.get_db)):
+    """
+    Menghapus banyak proyek dengan satu statement. Proyek yang masih memiliki
+    aktivitas atau dokumen dilewati dan dilaporkan.
+    """
+    ids = set(payload.ids)
+    project = models.Project.__table__
+    deleted = db.execute(
+        delete(project).where(
+            project.c.id.in_(ids),
+            ~exists().where(models.Aktivitas.project_id == project.c.id),
+            ~exists().where(models.Dokumen.project_id == project.c.id),
+        ).returning(project.c.id, project.c.team_id)
+    ).all()
+    deleted_ids = {row[0] for row in deleted}
+
+    remaining = ids - deleted_ids
+    existing = {row[0] for row in db.query(models.Project.id).filter(models.Project.id.in_(remaining))} if remaining else set()
+    cache_bus.mark_dirty(
+        db, "project",
+        *(f"project:{project_id}" for project_id in deleted_ids),
+        *(f"team:{team_id}" for _, team_id in deleted if team_id),
+    )
+    db.commit()
+    return {
+        "dihapus": sorted(deleted_ids),
+        "gagal": [
+            {"id": project_id, "alasan": "masih_memiliki_aktivitas_atau_dokumen" if project_id in existing else "tidak_ditemukan"}
+            for project_id in sorted(remaining)
+        ],
+    }
+
 @app.get("/api/sistem-roles", response_model=List[schemas.SistemRole])
 def get_all_sistem_roles(db: Session = Depends(database.get_db)):
     """Mengembalikan semua peran sistem yang tersedia."""
-    roles_db = db.query(models.SistemRole).all()
-    # Konversi manual
-    return [schemas.SistemRole.from_orm(role) for role in roles_db]
+    def load():
+        roles_db = db.query(models.SistemRole).all()
+        # Konversi manual
+        return [schemas.SistemRole.from_orm(role).model_dump() for role in roles_db]
+    # Data referensi jarang berubah, jadi disimpan di cache bersama
+    return cache.get_or_set("referensi:sistem-roles", load, ttl=3600, tags=["referensi"])
 
 @app.get("/api/jabatan", response_model=List[schemas.Jabatan])
 def get_all_jabatan(db: Session = Depends(database.get_db)):
     """Mengembalikan semua jabatan yang tersedia."""
-    jabatan_db = db.query(models.Jabatan).all()
-    # Konversi manual
-    return [schemas.Jabatan.from_orm(j) for j in jabatan_db]
+    def load():
+        jabatan_db = db.query(models.Jabatan).all()
+        # Konversi manual
+        return [schemas.Jabatan.from_orm(j).model_dump() for j in jabatan_db]
+    return cache.get_or_set("referensi:jabatan", load, ttl=3600, tags=["referensi"])
 
 @app.get("/api/aktivitas", response_model=List[schemas.Aktivitas])
 def get_all_aktivitas(
@@ -662,14 +1039,94 @@ def get_aktivitas_kepala(
     )
     return query.all()
     
+# Dashboard kepala melakukan polling; cache singkat cukup untuk meredam beban
+# karena setiap perubahan aktivitas/tim/proyek juga langsung membuangnya
+AGENDA_KEPALA_TTL = int(os.getenv("AGENDA_KEPALA_TTL", "30"))
+AGENDA_KEPALA_MAX_HARI = 92
+
+def _agenda_kepala(db: Session, start_date: date, end_date: date, skip: int, limit: int) -> dict:
+    selesai = func.coalesce(models.Aktivitas.tanggal_selesai, models.Aktivitas.tanggal_mulai)
+    filters = (
+        # Harus sama dengan predikat indeks parsial ix_aktivitas_kepala_tanggal
+        models.Aktivitas.melibatkan_kepala.is_(True),
+        models.Aktivitas.tanggal_mulai <= end_date,
+        selesai >= start_date,
+    )
+    total = db.query(func.count(models.Aktivitas.id)).filter(*filters).scalar()
+    rows = db.query(
+        models.Aktivitas.id, models.Aktivitas.nama_aktivitas,
+        models.Aktivitas.tanggal_mulai, models.Aktivitas.tanggal_selesai,
+        models.Aktivitas.jam_mulai, models.Aktivitas.jam_selesai,
+        models.Aktivitas.team_id, models.Team.nama_tim, models.Team.warna,
+        models.Aktivitas.project_id, models.Project.nama_project,
+        selesai.label("sampai"),
+    ).outerjoin(models.Team, models.Team.id == models.Aktivitas.team_id).outerjoin(
+        models.Project, models.Project.id == models.Aktivitas.project_id
+    ).filter(*filters).order_by(
+        models.Aktivitas.tanggal_mulai, models.Aktivitas.id
+    ).offset(skip).limit(limit).all()
+
+    # Kelompokkan per hari; aktivitas beberapa hari muncul di setiap harinya
+    per_hari = {}
+    for row in rows:
+        item = dict(row._mapping)
+        sampai = item.pop("sampai")
+        hari = max(item["tanggal_mulai"], start_date)
+        while hari <= min(sampai, end_date):
+            per_hari.setdefault(hari, []).append(item)
+            hari += timedelta(days=1)
+    for items in per_hari.values():
+        # Aktivitas sepanjang hari (tanpa jam) lebih dulu, lalu urut jam mulai
+        items.sort(key=lambda item: (item["jam_mulai"] is not None, item["jam_mulai"] or time.min, item["id"]))
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "hari": [{"tanggal": hari, "aktivitas": per_hari[hari]} for hari in sorted(per_hari)],
+    }
+
+@app.get("/api/aktivitas/kepala/agenda", response_model=schemas.AgendaKepala, response_model_by_alias=True)
+def get_agenda_kepala(
+    db: Session = Depends(database.get_db),
+    start_date: Optional[date] = Query(None, description="Awal jendela agenda (default hari ini)."),
+    end_date: Optional[date] = Query(None, description="Akhir jendela agenda (default 13 hari setelah awal)."),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+):
+    """
+    Agenda aktivitas yang melibatkan kepala kantor dalam satu jendela tanggal,
+    dipaginasi dan sudah dikelompokkan per hari.
+    """
+    start_date = start_date or date.today()
+    end_date = end_date or start_date + timedelta(days=13)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="Tanggal selesai tidak boleh sebelum tanggal mulai.")
+    if (end_date - start_date).days + 1 > AGENDA_KEPALA_MAX_HARI:
+        raise HTTPException(status_code=400, detail=f"Rentang agenda maksimal {AGENDA_KEPALA_MAX_HARI} hari.")
+
+    return cache.get_or_set(
+        f"agenda-kepala:{start_date.isoformat()}:{end_date.isoformat()}:{skip}:{limit}",
+        lambda: _agenda_kepala(db, start_date, end_date, skip, limit),
+        ttl=AGENDA_KEPALA_TTL,
+        tags=["aktivitas", "kalender", "team", "project"],
+    )
+
 @app.post("/api/aktivitas", response_model=schemas.Aktivitas)
 def create_aktivitas(
     aktivitas: schemas.AktivitasCreate, 
+    strict: bool = False,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_user)
 ):
-    print("--- Memulai proses pembuatan aktivitas ---")
-    print(f"Data payload yang diterima: {aktivitas.dict()}")
+    """
+    Membuat aktivitas baru. Bentrok jadwal anggota dikembalikan di `konflikJadwal`;
+    dengan `strict=true` aktivitas yang bentrok ditolak (409).
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload pembuatan aktivitas", extra={"payload": aktivitas.model_dump()})
 
     # Ekstrak data yang akan digunakan untuk membuat instance model Aktivitas
     aktivitas_data = {
@@ -692,16 +1149,13 @@ def create_aktivitas(
 
     # Tambahkan anggota tim ke objek aktivitas
     anggota_aktivitas_ids = list(set(aktivitas.anggota_aktivitas_ids)) # Gunakan set untuk menghapus duplikat
-    
-    print(f"Daftar final ID anggota yang akan ditambahkan: {anggota_aktivitas_ids}")
+
+    konflik = cek_konflik_jadwal(db, aktivitas, anggota_aktivitas_ids, strict)
 
     if anggota_aktivitas_ids:
         anggota_tim = db.query(models.User).filter(models.User.id.in_(anggota_aktivitas_ids)).all()
         for user in anggota_tim:
             db_aktivitas.users.append(user)
-        print(f"Berhasil melampirkan {len(anggota_tim)} anggota ke aktivitas.")
-    else:
-        print("Tidak ada anggota yang ditambahkan ke aktivitas ini.")
 
 
     # Tambahkan daftar dokumen wajib
@@ -710,15 +1164,22 @@ def create_aktivitas(
             db_aktivitas.daftar_dokumen_wajib.append(
                 models.DaftarDokumen(nama_dokumen=nama_dok, status_pengecekan=False)
             )
+    # Aktivitas baru: semua item checklist belum diunggah maupun diverifikasi
+    db_aktivitas.jumlah_dokumen_wajib = len(db_aktivitas.daftar_dokumen_wajib)
+    db_aktivitas.jumlah_dokumen_terunggah = 0
+    db_aktivitas.jumlah_dokumen_terverifikasi = 0
 
     # Simpan ke database
     db.add(db_aktivitas)
     db.commit()
     db.refresh(db_aktivitas)
-    
-    print(f"Aktivitas berhasil disimpan dengan ID: {db_aktivitas.id}")
-    print(f"Total anggota yang tersimpan di database: {len(db_aktivitas.users)}")
-    print("--- Proses selesai ---")
+
+    logger.info("Aktivitas dibuat", extra={
+        "aktivitas_id": db_aktivitas.id,
+        "jumlah_anggota": len(anggota_aktivitas_ids),
+        "user_id": current_user.id,
+    })
+    db_aktivitas.konflik_jadwal = konflik
     return db_aktivitas
 
 # --- ENDPOINT MENGAMBIL DETAIL AKTIVITAS ---
@@ -742,26 +1203,20 @@ def get_aktivitas_by_id(aktivitas_id: int, db: Session = Depends(database.get_db
 def update_aktivitas(
     aktivitas_id: int, 
     aktivitas: schemas.AktivitasCreate, 
+    strict: bool = False,
     db: Session = Depends(database.get_db), 
     current_user: models.User = Depends(security.get_current_user)
 ):
-    """Memperbarui aktivitas yang ada beserta anggota tim dan dokumen wajibnya."""
-    db_aktivitas = db.query(models.Aktivitas).options(
-        joinedload(models.Aktivitas.daftar_dokumen_wajib),
-        joinedload(models.Aktivitas.users)
-    ).filter(models.Aktivitas.id == aktivitas_id).first()
+    """
+    Memperbarui aktivitas yang ada beserta anggota tim dan dokumen wajibnya.
+    Selisih anggota dan checklist diterapkan langsung dengan statement SQL,
+    sehingga jumlah round trip tetap berapa pun besar timnya. Bentrok jadwal
+    ditangani seperti pada create_aktivitas.
+    """
+    db_aktivitas = db.query(models.Aktivitas).filter(models.Aktivitas.id == aktivitas_id).first()
     if db_aktivitas is None:
         raise HTTPException(status_code=404, detail="Aktivitas tidak ditemukan")
 
-    # Logika untuk mengambil ID user Kepala Kantor
-    kepala_kantor_id = None
-    JABATAN_KEPALA_KANTOR_ID = 1 # Ganti dengan ID jabatan Kepala Kantor yang sesuai
-    kepala_kantor = db.query(models.User).filter(
-        models.User.jabatan_id == JABATAN_KEPALA_KANTOR_ID
-    ).first()
-    if kepala_kantor:
-        kepala_kantor_id = kepala_kantor.id
-
     # 1. Update data utama aktivitas
     update_data = aktivitas.dict(exclude_unset=True)
     anggota_aktivitas_ids = update_data.pop('anggota_aktivitas_ids', [])
@@ -776,70 +1231,269 @@ def update_aktivitas(
     
     # 2. Update anggota tim yang terlibat (Hubungan Many-to-Many)
     final_anggota_ids = set(anggota_aktivitas_ids)
-    if melibatkan_kepala_kantor and kepala_kantor_id:
-        final_anggota_ids.add(kepala_kantor_id)
-
-    existing_members = {user.id for user in db_aktivitas.users}
-    
-    members_to_add = final_anggota_ids - existing_members
-    members_to_remove = existing_members - final_anggota_ids
-
-    # Hapus anggota yang tidak dipilih lagi
-    if members_to_remove:
-        members_to_remove_obj = db.query(models.User).filter(models.User.id.in_(members_to_remove)).all()
-        for user in members_to_remove_obj:
-            if user in db_aktivitas.users:
-                db_aktivitas.users.remove(user)
-
-    # Tambahkan anggota baru
-    if members_to_add:
-        members_to_add_obj = db.query(models.User).filter(models.User.id.in_(members_to_add)).all()
-        for user in members_to_add_obj:
-            db_aktivitas.users.append(user)
+    if melibatkan_kepala_kantor:
+        # ID user Kepala Kantor hanya dicari jika memang dibutuhkan
+        JABATAN_KEPALA_KANTOR_ID = 1 # Ganti dengan ID jabatan Kepala Kantor yang sesuai
+        kepala_kantor_id = db.query(models.User.id).filter(
+            models.User.jabatan_id == JABATAN_KEPALA_KANTOR_ID
+        ).limit(1).scalar()
+        if kepala_kantor_id:
+            final_anggota_ids.add(kepala_kantor_id)
+
+    # Dicek terhadap nilai akhir (field yang tidak dikirim tetap memakai nilai lama)
+    konflik = cek_konflik_jadwal(db, db_aktivitas, final_anggota_ids, strict, kecuali_aktivitas_id=aktivitas_id)
+
+    sync_anggota_aktivitas(db, [aktivitas_id], final_anggota_ids)
     
     # 3. Update daftar dokumen wajib
-    existing_doc_names = {doc.nama_dokumen for doc in db_aktivitas.daftar_dokumen_wajib}
-    incoming_doc_names = set(daftar_dokumen_wajib)
-    
-    docs_to_delete = [doc for doc in db_aktivitas.daftar_dokumen_wajib if doc.nama_dokumen not in incoming_doc_names]
-    for doc in docs_to_delete:
-        db.delete(doc)
-
-    docs_to_add = incoming_doc_names - existing_doc_names
-    for doc_name in docs_to_add:
-        new_doc = models.DaftarDokumen(nama_dokumen=doc_name, aktivitas_id=aktivitas_id)
-        db.add(new_doc)
-            
+    sync_daftar_dokumen(db, [aktivitas_id], set(daftar_dokumen_wajib))
+
+    # Statement di atas tidak melewati unit-of-work ORM, jadi tandai cache-nya manual
+    cache_bus.mark_dirty(db, "aktivitas", f"aktivitas:{aktivitas_id}", "kalender", "daftar_dokumen")
+    checklist_counter.refresh_counters(db, [aktivitas_id])
     db.commit()
     db.refresh(db_aktivitas)
+    db_aktivitas.konflik_jadwal = konflik
     return db_aktivitas
 
-# --- ENDPOINT MENGHAPUS AKTIVITAS ---
-@app.delete("/api/aktivitas/{aktivitas_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_aktivitas(aktivitas_id: int, db: Session = Depends(database.get_db)):
-    aktivitas_to_delete = db.query(models.Aktivitas).filter(models.Aktivitas.id == aktivitas_id).first()
+# --- ENDPOINT AKTIVITAS BERULANG (SERI) ---
+def _insert_kejadian_seri(
+    db: Session,
+    seri_id: int,
+    template: dict,
+    tanggal_list: List[date],
+    durasi: Optional[timedelta],
+    user_ids: set,
+    nama_dokumen: set,
+) -> List[int]:
+    """Membuat semua kejadian seri dengan satu INSERT batch beserta anggota dan checklist-nya."""
+    if not tanggal_list:
+        return []
+    table = models.Aktivitas.__table__
+    rows = [{
+        **template,
+        "tanggal_mulai": tanggal,
+        "tanggal_selesai": tanggal + durasi if durasi is not None else None,
+        "seri_id": seri_id,
+        "jumlah_dokumen_wajib": len(nama_dokumen),
+        "jumlah_dokumen_terunggah": 0,
+        "jumlah_dokumen_terverifikasi": 0,
+    } for tanggal in tanggal_list]
+    aktivitas_ids = list(db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    ).scalars())
+    sync_anggota_aktivitas(db, aktivitas_ids, user_ids)
+    sync_daftar_dokumen(db, aktivitas_ids, nama_dokumen)
+    return aktivitas_ids
+
+def _expand_aturan(mulai: date, aturan: schemas.AturanPerulangan) -> List[date]:
+    try:
+        return recurrence.expand(mulai, **aturan.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _seri_response(db: Session, seri: models.SeriAktivitas) -> dict:
+    aktivitas = db.query(models.Aktivitas).filter(
+        models.Aktivitas.seri_id == seri.id
+    ).order_by(models.Aktivitas.tanggal_mulai, models.Aktivitas.id).all()
+    return {"id": seri.id, "aturan": seri.aturan, "aktivitas": aktivitas}
+
+def _mark_seri_dirty(db: Session, aktivitas_ids):
+    cache_bus.mark_dirty(db, "aktivitas", "kalender", "daftar_dokumen",
+                         *(f"aktivitas:{aktivitas_id}" for aktivitas_id in aktivitas_ids))
+
+@app.post("/api/aktivitas/seri", response_model=schemas.SeriAktivitas, response_model_by_alias=True)
+def create_aktivitas_seri(
+    payload: schemas.AktivitasSeriCreate,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    Membuat aktivitas berulang. Semua kejadian, anggota, dan checklist-nya
+    disimpan dengan INSERT batch dalam satu transaksi.
+    """
+    tanggal_list = _expand_aturan(payload.tanggal_mulai, payload.aturan)
+    if not tanggal_list:
+        raise HTTPException(status_code=400, detail="Aturan perulangan tidak menghasilkan satu pun kejadian.")
+
+    durasi = None
+    if payload.tanggal_selesai:
+        durasi = payload.tanggal_selesai - payload.tanggal_mulai
+        if durasi.days < 0:
+            raise HTTPException(status_code=400, detail="Tanggal selesai tidak boleh sebelum tanggal mulai.")
+
+    seri = models.SeriAktivitas(aturan=payload.aturan.model_dump(mode="json"), creator_user_id=current_user.id)
+    db.add(seri)
+    db.flush()
+
+    template = {
+        "nama_aktivitas": payload.nama_aktivitas,
+        "deskripsi": payload.deskripsi,
+        "jam_mulai": payload.jam_mulai,
+        "jam_selesai": payload.jam_selesai,
+        "team_id": payload.team_id,
+        "project_id": payload.project_id,
+        "melibatkan_kepala": bool(payload.melibatkan_kepala),
+        "creator_user_id": current_user.id,
+    }
+    nama_dokumen = {nama for nama in payload.daftar_dokumen_wajib if nama}
+    aktivitas_ids = _insert_kejadian_seri(
+        db, seri.id, template, tanggal_list, durasi, set(payload.anggota_aktivitas_ids), nama_dokumen
+    )
+    _mark_seri_dirty(db, aktivitas_ids)
+    db.commit()
 
-    if aktivitas_to_delete is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aktivitas tidak ditemukan.")
+    logger.info("Seri aktivitas dibuat", extra={
+        "seri_id": seri.id, "jumlah_kejadian": len(aktivitas_ids), "user_id": current_user.id,
+    })
+    return _seri_response(db, seri)
 
-    if aktivitas_to_delete.dokumen:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Tidak dapat menghapus aktivitas karena masih terdapat dokumen terkait. Harap hapus semua dokumen terkait terlebih dahulu."
+@app.put("/api/aktivitas/seri/{seri_id}", response_model=schemas.SeriAktivitas, response_model_by_alias=True)
+def update_aktivitas_seri(
+    seri_id: int,
+    perubahan: schemas.AktivitasSeriUpdate,
+    mulai_dari: Optional[date] = Query(None, description="Hanya ubah kejadian mulai tanggal ini (default: seluruh seri)."),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    Mengubah seluruh seri atau kejadian mulai tanggal tertentu. Jika aturan
+    baru dikirim, kejadian yang belum memiliki dokumen dibangkitkan ulang;
+    kejadian yang sudah memiliki dokumen dipertahankan.
+    """
+    seri = db.query(models.SeriAktivitas).filter(models.SeriAktivitas.id == seri_id).first()
+    if seri is None:
+        raise HTTPException(status_code=404, detail="Seri aktivitas tidak ditemukan")
+
+    data = perubahan.dict(exclude_unset=True)
+    aturan = data.pop("aturan", None)
+    tanggal_mulai = data.pop("tanggal_mulai", None)
+    user_ids = data.pop("anggota_aktivitas_ids", None)
+    nama_dokumen = data.pop("daftar_dokumen_wajib", None)
+    # Kolom wajib tidak boleh dikosongkan
+    for key in ("nama_aktivitas", "melibatkan_kepala"):
+        if key in data and data[key] is None:
+            data.pop(key)
+
+    target_query = db.query(models.Aktivitas).filter(models.Aktivitas.seri_id == seri_id)
+    if mulai_dari is not None:
+        target_query = target_query.filter(models.Aktivitas.tanggal_mulai >= mulai_dari)
+    targets = target_query.order_by(models.Aktivitas.tanggal_mulai, models.Aktivitas.id).all()
+    affected_ids = [a.id for a in targets]
+    new_ids = []
+
+    if aturan is not None:
+        aturan = perubahan.aturan
+        # Kejadian contoh untuk menyalin field, anggota, dan checklist yang tidak diubah
+        contoh = targets[0] if targets else db.query(models.Aktivitas).filter(
+            models.Aktivitas.seri_id == seri_id
+        ).order_by(models.Aktivitas.tanggal_mulai.desc()).first()
+        mulai = tanggal_mulai or mulai_dari or (contoh.tanggal_mulai if contoh else None)
+        if contoh is None or mulai is None:
+            raise HTTPException(status_code=400, detail="Tanggal mulai seri tidak dapat ditentukan.")
+
+        tanggal_list = [t for t in _expand_aturan(mulai, aturan) if mulai_dari is None or t >= mulai_dari]
+        if user_ids is None:
+            user_ids = [row[0] for row in db.query(models.anggota_aktivitas_link.c.user_id).filter(
+                models.anggota_aktivitas_link.c.aktivitas_id == contoh.id)]
+        if nama_dokumen is None:
+            nama_dokumen = [row[0] for row in db.query(models.DaftarDokumen.nama_dokumen).filter(
+                models.DaftarDokumen.aktivitas_id == contoh.id)]
+        template = {
+            "nama_aktivitas": contoh.nama_aktivitas,
+            "deskripsi": contoh.deskripsi,
+            "jam_mulai": contoh.jam_mulai,
+            "jam_selesai": contoh.jam_selesai,
+            "team_id": contoh.team_id,
+            "project_id": contoh.project_id,
+            "melibatkan_kepala": contoh.melibatkan_kepala,
+            "creator_user_id": current_user.id,
+            **data,
+        }
+        durasi = contoh.tanggal_selesai - contoh.tanggal_mulai if contoh.tanggal_selesai and contoh.tanggal_mulai else None
+
+        # Kejadian yang sudah memiliki dokumen dipertahankan, sisanya dihapus
+        kept_ids = {row[0] for row in db.query(models.Dokumen.aktivitas_id).filter(
+            models.Dokumen.aktivitas_id.in_(affected_ids)).distinct()}
+        removed_ids = [a_id for a_id in affected_ids if a_id not in kept_ids]
+        if removed_ids:
+            # Anggota dan checklist ikut terhapus oleh ON DELETE CASCADE
+            db.execute(models.Aktivitas.__table__.delete().where(models.Aktivitas.id.in_(removed_ids)))
+
+        kept_dates = {a.tanggal_mulai for a in targets if a.id in kept_ids}
+        new_ids = _insert_kejadian_seri(
+            db, seri_id, template, [t for t in tanggal_list if t not in kept_dates], durasi,
+            set(user_ids), {nama for nama in nama_dokumen if nama},
         )
+        seri.aturan = aturan.model_dump(mode="json")
+        _mark_seri_dirty(db, removed_ids)
+        affected_ids = [a_id for a_id in affected_ids if a_id in kept_ids]
+
+    # Terapkan perubahan field, anggota, dan checklist ke kejadian yang tersisa
+    if data and affected_ids:
+        db.execute(update(models.Aktivitas.__table__).where(models.Aktivitas.id.in_(affected_ids)).values(**data))
+    if user_ids is not None:
+        sync_anggota_aktivitas(db, affected_ids, set(user_ids))
+    if nama_dokumen is not None:
+        sync_daftar_dokumen(db, affected_ids, {nama for nama in nama_dokumen if nama})
+        checklist_counter.refresh_counters(db, affected_ids)
+
+    _mark_seri_dirty(db, affected_ids + new_ids)
+    db.commit()
+    return _seri_response(db, seri)
 
-    # Hapus semua entri di tabel perantara 'anggota_aktivitas' secara manual
-    db.query(models.anggota_aktivitas_link).filter(models.anggota_aktivitas_link.c.aktivitas_id == aktivitas_id).delete(synchronize_session=False)
-
-    # Hapus semua entri di tabel 'daftar_dokumen' secara manual
-    db.query(models.DaftarDokumen).filter(models.DaftarDokumen.aktivitas_id == aktivitas_id).delete(synchronize_session=False)
+# --- ENDPOINT MENGHAPUS AKTIVITAS ---
+@app.delete("/api/aktivitas/{aktivitas_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_aktivitas(aktivitas_id: int, db: Session = Depends(database.get_db)):
+    # Anggota dan daftar dokumen wajib ikut terhapus oleh ON DELETE CASCADE;
+    # dokumen yang masih terkait membuat penghapusan ditolak (RESTRICT)
+    deleted = execute_delete(
+        db,
+        delete(models.Aktivitas.__table__).where(models.Aktivitas.id == aktivitas_id)
+        .returning(models.Aktivitas.team_id, models.Aktivitas.project_id),
+        "Tidak dapat menghapus aktivitas karena masih terdapat dokumen terkait. Harap hapus semua dokumen terkait terlebih dahulu.",
+    )
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aktivitas tidak ditemukan.")
 
-    # Hapus aktivitas itu sendiri
-    db.delete(aktivitas_to_delete)
+    team_id, project_id = deleted[0]
+    cache_bus.mark_dirty(
+        db, "aktivitas", f"aktivitas:{aktivitas_id}", "kalender", "daftar_dokumen",
+        f"team:{team_id}" if team_id else None, f"project:{project_id}" if project_id else None,
+    )
     db.commit()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@app.post("/api/aktivitas/bulk-delete", response_model=schemas.BulkDeleteHasil, response_model_by_alias=True, dependencies=[Depends(security.require_role(["Superadmin", "Admin"]))])
+def bulk_delete_aktivitas(payload: schemas.BulkDeleteRequest, db: Session = Depends(database.get_db)):
+    """
+    Menghapus banyak aktivitas dengan satu statement. Aktivitas yang masih
+    memiliki dokumen dilewati dan dilaporkan.
+    """
+    ids = set(payload.ids)
+    aktivitas = models.Aktivitas.__table__
+    deleted = db.execute(
+        delete(aktivitas).where(
+            aktivitas.c.id.in_(ids),
+            ~exists().where(models.Dokumen.aktivitas_id == aktivitas.c.id),
+        ).returning(aktivitas.c.id)
+    ).scalars().all()
+    deleted_ids = set(deleted)
+
+    remaining = ids - deleted_ids
+    existing = {row[0] for row in db.query(models.Aktivitas.id).filter(models.Aktivitas.id.in_(remaining))} if remaining else set()
+    cache_bus.mark_dirty(db, "aktivitas", "kalender", "daftar_dokumen",
+                         *(f"aktivitas:{aktivitas_id}" for aktivitas_id in deleted_ids))
+    db.commit()
+    return {
+        "dihapus": sorted(deleted_ids),
+        "gagal": [
+            {"id": aktivitas_id, "alasan": "masih_memiliki_dokumen" if aktivitas_id in existing else "tidak_ditemukan"}
+            for aktivitas_id in sorted(remaining)
+        ],
+    }
+
 # --- ENDPOINT UPLOAD DOKUMEN ---
 @app.post("/api/aktivitas/{aktivitas_id}/dokumen", response_model=schemas.Dokumen)
 def create_dokumen_untuk_aktivitas(
@@ -885,6 +1539,7 @@ def create_dokumen_untuk_aktivitas(
             if db_checklist_item:
                 db_checklist_item.status_pengecekan = False
                 db_checklist_item.dokumen_id = db_dokumen.id
+                checklist_counter.refresh_counters(db, [db_checklist_item.aktivitas_id])
                 db.commit()
         
         return db_dokumen
@@ -893,8 +1548,8 @@ def create_dokumen_untuk_aktivitas(
         # Menangkap error HTTP dan meneruskannya
         raise e
     except Exception as e:
-        # Menangkap error umum, mencetak ke konsol server, dan menghapus file jika sudah dibuat
-        print(f"Error saat mengunggah dokumen di aktivitas {aktivitas_id}: {e}")
+        # Menangkap error umum, mencatat ke log server, dan menghapus file jika sudah dibuat
+        logger.exception("Gagal mengunggah dokumen", extra={"aktivitas_id": aktivitas_id})
         if file_location and os.path.exists(file_location):
             os.remove(file_location)
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan di server: {str(e)}")
@@ -1050,8 +1705,9 @@ def replace_checklist_dokumen(
                 os.remove(old_db_dokumen.path_atau_url)
             # Hapus catatan dari database
             db.delete(old_db_dokumen)
-    
-    # 5. Commit semua perubahan
+
+    # 5. Commit semua perubahan beserta penghitung progres checklist
+    checklist_counter.refresh_counters(db, [db_checklist_item.aktivitas_id])
     db.commit()
     db.refresh(new_db_dokumen)
     
@@ -1079,6 +1735,8 @@ def delete_dokumen(dokumen_id: int, db: Session = Depends(database.get_db)):
             os.remove(file_path)
             
     db.delete(db_dokumen)
+    if db_checklist_item:
+        checklist_counter.refresh_counters(db, [db_checklist_item.aktivitas_id])
     db.commit()
     
     # 4. Kembalikan respons tanpa konten
@@ -1117,12 +1775,86 @@ def update_status_pengecekan(
 
     # 3. Jika validasi berhasil, perbarui status
     db_item.status_pengecekan = status_update.status_pengecekan
+    checklist_counter.refresh_counters(db, [db_item.aktivitas_id])
     db.commit()
     db.refresh(db_item)
     
     # 4. Kembalikan data yang sudah diperbarui
     return db_item
 
+@app.patch("/api/daftar_dokumen/cek", response_model=List[schemas.StatusPengecekanHasil], response_model_by_alias=True)
+def update_status_pengecekan_batch(
+    payload: schemas.StatusPengecekanBatch,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    Memperbarui status pengecekan banyak item checklist sekaligus. Hanya item
+    milik tim yang diketuai pengguna (atau semua item untuk Admin/Superadmin)
+    yang diperbarui; hasil per item dikembalikan sesuai urutan permintaan.
+    """
+    # Jika item yang sama dikirim berulang, status terakhir yang dipakai
+    requested = {item.item_id: item.status_pengecekan for item in payload.items}
+
+    # 1. Otorisasi semua item dalam satu query
+    rows = db.query(
+        models.DaftarDokumen.id,
+        models.DaftarDokumen.aktivitas_id,
+        models.Team.id,
+        models.Team.ketua_tim_id,
+    ).join(
+        models.Aktivitas, models.DaftarDokumen.aktivitas_id == models.Aktivitas.id
+    ).outerjoin(
+        models.Team, models.Aktivitas.team_id == models.Team.id
+    ).filter(models.DaftarDokumen.id.in_(requested)).all()
+
+    is_admin = current_user.sistem_role is not None and current_user.sistem_role.nama_role in ("Superadmin", "Admin")
+    hasil = {}
+    allowed = {}
+    for item_id, aktivitas_id, team_id, ketua_tim_id in rows:
+        if team_id is None:
+            hasil[item_id] = ("tidak_terhubung", aktivitas_id)
+        elif not is_admin and ketua_tim_id != current_user.id:
+            hasil[item_id] = ("ditolak", aktivitas_id)
+        else:
+            hasil[item_id] = ("diperbarui", aktivitas_id)
+            allowed[item_id] = requested[item_id]
+
+    # 2. Terapkan semua perubahan dalam satu UPDATE
+    if allowed:
+        table = models.DaftarDokumen.__table__
+        if db.get_bind().dialect.name == "postgresql":
+            perubahan = values(
+                column("id", Integer), column("status_pengecekan", Boolean), name="perubahan"
+            ).data(list(allowed.items()))
+            db.execute(
+                update(table)
+                .where(table.c.id == perubahan.c.id)
+                .values(status_pengecekan=perubahan.c.status_pengecekan)
+            )
+        else:
+            # Database lain tidak mendukung UPDATE ... FROM (VALUES ...) dengan alias kolom
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("item_id"))
+                .values(status_pengecekan=bindparam("status_baru")),
+                [{"item_id": item_id, "status_baru": status_baru} for item_id, status_baru in allowed.items()],
+            )
+        aktivitas_ids = {hasil[item_id][1] for item_id in allowed}
+        checklist_counter.refresh_counters(db, aktivitas_ids)
+        cache_bus.mark_dirty(db, "daftar_dokumen", *(f"aktivitas:{aktivitas_id}" for aktivitas_id in aktivitas_ids))
+        db.commit()
+
+    return [
+        schemas.StatusPengecekanHasil(
+            item_id=item_id,
+            hasil=hasil.get(item_id, ("tidak_ditemukan", None))[0],
+            aktivitas_id=hasil.get(item_id, (None, None))[1],
+            status_pengecekan=allowed.get(item_id),
+        )
+        for item_id in requested
+    ]
+
 # --- ENDPOINT BARU UNTUK UNDUH/PREVIEW DOKUMEN ---
 @app.get("/api/dokumen/{dokumen_id}/download")
 def download_dokumen(
@@ -1330,6 +2062,76 @@ def get_timeline_data(
 
     return list(pegawai_map.values())
 
+def _parse_id_list(value: Optional[str], nama: str) -> List[int]:
+    """Mengurai daftar ID yang dipisahkan koma, misalnya "1,2,3"."""
+    if not value:
+        return []
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Format {nama} tidak valid.")
+
+@app.get("/api/kalender/free-busy", response_model=schemas.FreeBusyHasil, response_model_by_alias=True)
+def get_free_busy(
+    db: Session = Depends(database.get_db),
+    user_ids: Optional[str] = Query(None, description="Daftar ID pengguna yang dipisahkan oleh koma."),
+    team_ids: Optional[str] = Query(None, description="Daftar ID tim yang dipisahkan oleh koma."),
+    start_date: date = Query(..., description="Tanggal mulai rentang (YYYY-MM-DD)."),
+    end_date: date = Query(..., description="Tanggal selesai rentang (YYYY-MM-DD)."),
+    granularitas: int = Query(30, ge=5, le=240, description="Lebar slot dalam menit."),
+    jam_kerja_mulai: time = Query(time(8, 0)),
+    jam_kerja_selesai: time = Query(time(16, 0)),
+    durasi_minimal: Optional[int] = Query(None, ge=1, description="Panjang minimal slot kosong bersama (menit)."),
+    hari_kerja_saja: bool = Query(True, description="Lewati hari Sabtu dan Minggu."),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    """
+    Mengembalikan interval sibuk per pegawai (sudah digabung per hari) dan slot
+    kosong bersama di dalam jam kerja untuk sekumpulan pengguna dan/atau tim.
+    """
+    target_ids = set(_parse_id_list(user_ids, "user_ids"))
+    team_id_list = _parse_id_list(team_ids, "team_ids")
+    if team_id_list:
+        target_ids.update(user_id for (user_id,) in db.query(models.user_team_link.c.user_id).filter(
+            models.user_team_link.c.team_id.in_(team_id_list)
+        ))
+    if not target_ids:
+        raise HTTPException(status_code=400, detail="Isi user_ids atau team_ids.")
+
+    try:
+        return free_busy.compute(
+            db, target_ids, start_date, end_date,
+            granularitas=granularitas,
+            jam_kerja_mulai=jam_kerja_mulai,
+            jam_kerja_selesai=jam_kerja_selesai,
+            durasi_minimal=durasi_minimal,
+            hari_kerja_saja=hari_kerja_saja,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+@app.get("/api/kalender/beban-kerja", response_model=schemas.BebanKerjaHasil, response_model_by_alias=True)
+def get_beban_kerja(
+    db: Session = Depends(database.get_db),
+    start_date: date = Query(..., description="Tanggal mulai rentang (YYYY-MM-DD)."),
+    end_date: date = Query(..., description="Tanggal selesai rentang (YYYY-MM-DD)."),
+    team_ids: Optional[str] = Query(None, description="Batasi ke anggota tim tertentu (ID dipisahkan koma)."),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    """
+    Heatmap jumlah aktivitas per pegawai per hari, beserta rollup per tim dan
+    per jabatan. Matriks per bulan disimpan di memori dan diperbarui secara
+    inkremental saat aktivitas berubah (lihat workload.py).
+    """
+    try:
+        return workload.heatmap(db, start_date, end_date, _parse_id_list(team_ids, "team_ids") or None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
 # Endpoint untuk mengambil semua aktivitas yang melibatkan pengguna tertentu
 @app.get("/api/users/{user_id}/aktivitas", response_model=List[schemas.Aktivitas])
 def get_user_aktivitas(user_id: int, db: Session = Depends(database.get_db)):
@@ -1375,6 +2177,97 @@ def get_team_dokumen_wajib(team_id: int, db: Session = Depends(database.get_db))
 
     return dokumen_wajib
 
+# Kolom kunci dan label untuk setiap jenis pengelompokan statistik checklist
+STATISTIK_GROUPS = {
+    "aktivitas": (models.Aktivitas.id, models.Aktivitas.nama_aktivitas),
+    "project": (models.Project.id, models.Project.nama_project),
+    "team": (models.Team.id, models.Team.nama_tim),
+    "user": (models.User.id, models.User.nama_lengkap),
+}
+
+def hitung_statistik_checklist(
+    db: Session,
+    group_by: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    team_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Menghitung jumlah dokumen wajib, yang sudah diunggah, dan yang sudah
+    diverifikasi dalam satu query GROUP BY.
+    """
+    key_column, label_column = STATISTIK_GROUPS[group_by]
+    anggota = models.anggota_aktivitas_link
+    query = db.query(
+        key_column,
+        label_column,
+        func.count(models.DaftarDokumen.id),
+        func.count(models.DaftarDokumen.dokumen_id),
+        func.coalesce(func.sum(case((models.DaftarDokumen.status_pengecekan.is_(True), 1), else_=0)), 0),
+    ).select_from(models.DaftarDokumen).join(
+        models.Aktivitas, models.DaftarDokumen.aktivitas_id == models.Aktivitas.id
+    )
+
+    if group_by == "project":
+        query = query.outerjoin(models.Project, models.Project.id == models.Aktivitas.project_id)
+    elif group_by == "team":
+        query = query.outerjoin(models.Team, models.Team.id == models.Aktivitas.team_id)
+    if group_by == "user" or user_id is not None:
+        query = query.join(anggota, anggota.c.aktivitas_id == models.Aktivitas.id)
+    if group_by == "user":
+        query = query.join(models.User, models.User.id == anggota.c.user_id)
+
+    if team_id is not None:
+        query = query.filter(models.Aktivitas.team_id == team_id)
+    if project_id is not None:
+        query = query.filter(models.Aktivitas.project_id == project_id)
+    if user_id is not None:
+        query = query.filter(anggota.c.user_id == user_id)
+    # Aktivitas dihitung jika rentang tanggalnya beririsan dengan rentang yang diminta
+    if end_date is not None:
+        query = query.filter(models.Aktivitas.tanggal_mulai <= end_date)
+    if start_date is not None:
+        query = query.filter(
+            func.coalesce(models.Aktivitas.tanggal_selesai, models.Aktivitas.tanggal_mulai) >= start_date
+        )
+
+    rows = query.group_by(key_column, label_column).order_by(label_column, key_column).all()
+    return [
+        schemas.StatistikChecklist(
+            id=row[0], nama=row[1], wajib=row[2], terunggah=row[3], terverifikasi=int(row[4])
+        ).model_dump()
+        for row in rows
+    ]
+
+@app.get("/api/statistik/checklist", response_model=List[schemas.StatistikChecklist], response_model_by_alias=True,
+         dependencies=[Depends(security.get_current_user)])
+def get_statistik_checklist(
+    group_by: str = Query("aktivitas", pattern="^(aktivitas|project|team|user)$",
+                          description="Pengelompokan: aktivitas, project, team, atau user."),
+    start_date: Optional[date] = Query(None, description="Awal rentang tanggal aktivitas (YYYY-MM-DD)."),
+    end_date: Optional[date] = Query(None, description="Akhir rentang tanggal aktivitas (YYYY-MM-DD)."),
+    team_id: Optional[int] = Query(None),
+    project_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    db: Session = Depends(database.get_db),
+):
+    """
+    Rekap kelengkapan checklist untuk progress bar, tanpa perlu mengunduh
+    seluruh baris daftar dokumen ke browser.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date tidak boleh setelah end_date.")
+    key = f"statistik:checklist:{group_by}:{start_date}:{end_date}:{team_id}:{project_id}:{user_id}"
+    tags = ["daftar_dokumen", "aktivitas", group_by]
+    return cache.get_or_set(
+        key,
+        lambda: hitung_statistik_checklist(db, group_by, start_date, end_date, team_id, project_id, user_id),
+        ttl=300,
+        tags=tags,
+    )
+
 @app.get("/api/kalender/events", response_model=List[schemas.Aktivitas])
 def get_calendar_events(
     db: Session = Depends(database.get_db),
@@ -1397,4 +2290,43 @@ def get_calendar_events(
         except ValueError:
             raise HTTPException(status_code=400, detail="Format team_ids tidak valid.")
     
-    return query.all()
\ No newline at end of file
+    return query.all()
+
+# ===================================================================
+# ENDPOINT ADMIN UNTUK CACHE
+# ===================================================================
+@app.get("/api/admin/cache", dependencies=[Depends(security.require_role(["Superadmin"]))])
+def get_cache_stats():
+    """Menampilkan statistik hit/miss dari backend cache yang sedang dipakai."""
+    return cache.info()
+
+# ===================================================================
+# ENDPOINT METRIK
+# ===================================================================
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrik dalam format teks Prometheus (latensi, ukuran respons, DB, threadpool)."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/admin/checklist-counters", dependencies=[Depends(security.require_role(["Superadmin"]))])
+def check_checklist_counters(fix: bool = False, db: Session = Depends(database.get_db)):
+    """Memeriksa (dan bila diminta memperbaiki) penghitung checklist yang tidak konsisten."""
+    inconsistent = checklist_counter.find_inconsistent(db)
+    if fix and inconsistent:
+        checklist_counter.refresh_counters(db, [item["aktivitas_id"] for item in inconsistent])
+        db.commit()
+    return {"jumlah": len(inconsistent), "diperbaiki": fix, "aktivitas": inconsistent[:100]}
+
+@app.get("/api/admin/slow-queries", dependencies=[Depends(security.require_role(["Superadmin"]))])
+def get_slow_queries():
+    """Menampilkan ring buffer query lambat beserta rencana EXPLAIN dan persentil per fingerprint."""
+    return slow_query.snapshot()
+
+@app.get("/api/admin/profiles/{profile_id}", response_class=PlainTextResponse,
+         dependencies=[Depends(security.require_role(["Superadmin"]))])
+def get_request_profile(profile_id: str):
+    """Mengembalikan profil permintaan dalam format folded stacks (flamegraph.pl / speedscope)."""
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profil tidak ditemukan")
+    return profile
@@ -0,0 +1,174 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Sequence, Tuple
+
+import anyio.to_thread
+
+# ===================================================================
+# METRIK PROMETHEUS
+# ===================================================================
+# Implementasi ringan tanpa dependensi tambahan. Setiap observasi hanya berupa
+# bisect + penambahan angka, sehingga overhead per permintaan tetap kecil.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [counts per bucket..., +Inf count, sum]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, label_values: Tuple, value: float):
+        with _lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with _lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-1]}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}"
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, label_values: Tuple = (), amount: float = 1):
+        with _lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, label_values: Tuple = (), amount: float = 1):
+        self.inc(label_values, -amount)
+
+    def set(self, label_values: Tuple, value: float):
+        with _lock:
+            self._values[label_values] = value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} gauge"
+        with _lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latensi permintaan HTTP per rute.",
+    ("method", "route", "status"), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Ukuran body respons HTTP per rute.",
+    ("method", "route", "status"), SIZE_BUCKETS)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Total waktu query database per permintaan.",
+    ("method", "route"), LATENCY_BUCKETS)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Jumlah query database per permintaan.",
+    ("method", "route"), QUERY_COUNT_BUCKETS)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Permintaan HTTP yang sedang diproses.", ("method",))
+THREADPOOL_TOKENS = Gauge(
+    "threadpool_tokens", "Kapasitas threadpool untuk handler sinkron.", ("state",))
+
+_ALL_METRICS = (REQUEST_LATENCY, RESPONSE_SIZE, REQUEST_DB_TIME, REQUEST_DB_QUERIES,
+                IN_FLIGHT, THREADPOOL_TOKENS)
+
+
+def _collect_threadpool():
+    """Membaca status threadpool anyio (harus dipanggil dari event loop)."""
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        return
+    statistics = limiter.statistics()
+    THREADPOOL_TOKENS.set(("total",), statistics.total_tokens)
+    THREADPOOL_TOKENS.set(("borrowed",), statistics.borrowed_tokens)
+    THREADPOOL_TOKENS.set(("waiting",), statistics.tasks_waiting)
+
+
+def render() -> str:
+    """Menghasilkan semua metrik dalam format teks Prometheus."""
+    _collect_threadpool()
+    lines = []
+    for metric in _ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI yang mencatat latensi, ukuran respons dan statistik DB per rute."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc((method,))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec((method,))
+            # Gunakan template rute (mis. /api/teams/{team_id}) agar label tidak meledak
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            labels = (method, route, str(status_code))
+            REQUEST_LATENCY.observe(labels, time.perf_counter() - started)
+            RESPONSE_SIZE.observe(labels, size)
+            db_stats = scope.get("db_stats")
+            if db_stats is not None:
+                REQUEST_DB_TIME.observe((method, route), db_stats.duration)
+                REQUEST_DB_QUERIES.observe((method, route), db_stats.count)
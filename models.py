@@ -1,16 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Time, ForeignKey, Table, Boolean, DATE, DateTime
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Time, ForeignKey, Table, Boolean, DATE, DateTime, JSON, Index, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 user_team_link = Table('user_team_link', Base.metadata,
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('team_id', Integer, ForeignKey('teams.id'), primary_key=True)
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    Column('team_id', Integer, ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True)
 )
 
 anggota_aktivitas_link = Table('anggota_aktivitas', Base.metadata,
-    Column('aktivitas_id', Integer, ForeignKey('aktivitas.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('aktivitas_id', Integer, ForeignKey('aktivitas.id', ondelete='CASCADE'), primary_key=True),
+    # Indeks terpisah untuk pencarian per pengguna (kunci primer diawali aktivitas_id)
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
 )
 
 class Team(Base):
@@ -19,19 +20,19 @@ class Team(Base):
     nama_tim = Column(String, unique=False, nullable=False)
     valid_from = Column(DATE, nullable=False)
     valid_until = Column(DATE, nullable=False)
-    ketua_tim_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    ketua_tim_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     ketua_tim = relationship("User", foreign_keys=[ketua_tim_id])
     
-    users = relationship("User", secondary=user_team_link, back_populates="teams")
+    users = relationship("User", secondary=user_team_link, back_populates="teams", passive_deletes=True)
     aktivitas = relationship("Aktivitas", back_populates="team")
-    projects = relationship("Project", back_populates="team")
+    projects = relationship("Project", back_populates="team", passive_deletes=True)
     warna = Column(String(7), nullable=True, default="#3b82f6")
 
 class Project(Base):
     __tablename__ = "projects"
     id = Column(Integer, primary_key=True, index=True)
     nama_project = Column(String, index=True, nullable=False)
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
     project_leader_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     project_leader = relationship("User", back_populates="created_projects")
@@ -53,13 +54,50 @@ class Aktivitas(Base):
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     melibatkan_kepala = Column(Boolean, default=False, nullable=False)
+    # Penghitung progres checklist (dijaga oleh checklist_counter.refresh_counters)
+    jumlah_dokumen_wajib = Column(Integer, default=0, server_default='0', nullable=False)
+    jumlah_dokumen_terunggah = Column(Integer, default=0, server_default='0', nullable=False)
+    jumlah_dokumen_terverifikasi = Column(Integer, default=0, server_default='0', nullable=False)
+    seri_id = Column(Integer, ForeignKey("seri_aktivitas.id", ondelete="SET NULL"), nullable=True, index=True)
 
     creator = relationship("User", back_populates="created_aktivitas")
     team = relationship("Team", back_populates="aktivitas")
     project = relationship("Project", back_populates="aktivitas")
     dokumen = relationship("Dokumen", back_populates="aktivitas", cascade="all, delete-orphan")
-    daftar_dokumen_wajib = relationship("DaftarDokumen", back_populates="aktivitas", cascade="all, delete-orphan")
-    users = relationship("User", secondary=anggota_aktivitas_link, back_populates="aktivitas", cascade="all, delete")
+    daftar_dokumen_wajib = relationship("DaftarDokumen", back_populates="aktivitas", cascade="all, delete-orphan", passive_deletes=True)
+    # Baris anggota_aktivitas dihapus oleh ON DELETE CASCADE di database
+    users = relationship("User", secondary=anggota_aktivitas_link, back_populates="aktivitas", passive_deletes=True)
+    seri = relationship("SeriAktivitas", back_populates="aktivitas")
+
+# Indeks rentang tanggal untuk deteksi bentrok jadwal (schedule_conflict.py).
+# Ekspresinya harus sama dengan schedule_conflict.rentang_tanggal; hanya PostgreSQL.
+Index(
+    "ix_aktivitas_rentang_tanggal",
+    func.daterange(
+        Aktivitas.tanggal_mulai,
+        func.greatest(Aktivitas.tanggal_mulai, func.coalesce(Aktivitas.tanggal_selesai, Aktivitas.tanggal_mulai)),
+        literal_column("'[]'"),
+    ),
+    postgresql_using="gist",
+).ddl_if(dialect="postgresql")
+
+# Indeks parsial untuk agenda kepala kantor: hanya baris yang melibatkan kepala
+Index(
+    "ix_aktivitas_kepala_tanggal",
+    Aktivitas.tanggal_mulai, Aktivitas.id,
+    postgresql_where=Aktivitas.melibatkan_kepala.is_(True),
+    sqlite_where=Aktivitas.melibatkan_kepala.is_(True),
+)
+
+class SeriAktivitas(Base):
+    __tablename__ = "seri_aktivitas"
+    id = Column(Integer, primary_key=True, index=True)
+    # Aturan perulangan (lihat recurrence.expand) dalam bentuk JSON
+    aturan = Column(JSON, nullable=False)
+    creator_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    dibuat_pada = Column(DateTime, server_default=func.now())
+
+    aktivitas = relationship("Aktivitas", back_populates="seri")
 
 class Dokumen(Base):
     __tablename__ = "dokumen"
@@ -82,8 +120,8 @@ class DaftarDokumen(Base):
     id = Column(Integer, primary_key=True, index=True)
     nama_dokumen = Column(String, nullable=False)
     status_pengecekan = Column(Boolean, default=False, nullable=False)
-    dokumen_id = Column(Integer, ForeignKey("dokumen.id"), nullable=True)
-    aktivitas_id = Column(Integer, ForeignKey("aktivitas.id"), nullable=False)
+    dokumen_id = Column(Integer, ForeignKey("dokumen.id", ondelete="SET NULL"), nullable=True)
+    aktivitas_id = Column(Integer, ForeignKey("aktivitas.id", ondelete="CASCADE"), nullable=False)
     aktivitas = relationship("Aktivitas", back_populates="daftar_dokumen_wajib")
     dokumen_terkait = relationship("Dokumen")
 
@@ -99,12 +137,12 @@ class User(Base):
     foto_profil_url = Column(Text, nullable=True) 
     sistem_role = relationship("SistemRole")
     jabatan = relationship("Jabatan")
-    teams = relationship("Team", secondary=user_team_link, back_populates="users")
+    teams = relationship("Team", secondary=user_team_link, back_populates="users", passive_deletes=True)
     created_aktivitas = relationship("Aktivitas", back_populates="creator")
     created_projects = relationship("Project", back_populates="project_leader")
     
     # Gunakan objek Table yang sudah diperbaiki
-    aktivitas = relationship("Aktivitas", secondary=anggota_aktivitas_link, back_populates="users")
+    aktivitas = relationship("Aktivitas", secondary=anggota_aktivitas_link, back_populates="users", passive_deletes=True)
 
 class SistemRole(Base):
     __tablename__ = "sistem_roles"
@@ -0,0 +1,267 @@
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+import database, security
+
+# ===================================================================
+# PROFILER SAMPLING
+# ===================================================================
+# Dua mode:
+# 1. Per permintaan: Superadmin mengirim header "X-Profile: 1" (atau query
+#    "__profile=1"). Thread yang menjalankan handler disampel setiap beberapa
+#    milidetik dan hasilnya disimpan dalam format "folded stacks" yang bisa
+#    langsung dibuka di flamegraph.pl atau speedscope.
+# 2. Global: jika PROFILE_SAMPLING_HZ > 0, semua thread disampel dengan laju
+#    rendah dan agregatnya ditulis ke PROFILE_DIR secara berkala.
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_REQUEST_INTERVAL = float(os.getenv("PROFILE_REQUEST_INTERVAL", "0.002"))
+PROFILE_SAMPLING_HZ = float(os.getenv("PROFILE_SAMPLING_HZ", "0"))
+PROFILE_FLUSH_SECONDS = int(os.getenv("PROFILE_FLUSH_SECONDS", "300"))
+MAX_STORED_PROFILES = 20
+
+logger = logging.getLogger("sinergi.profiling")
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_stored_profiles: "OrderedDict[str, str]" = OrderedDict()
+_stored_lock = threading.Lock()
+
+
+def _fold(frame) -> str:
+    """Mengubah stack frame menjadi satu baris "root;...;leaf"."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+def _render(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def _write(filename: str, content: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, filename), "w") as handle:
+        handle.write(content)
+
+
+class ProfileSession:
+    """Menyampel thread-thread yang sedang mengerjakan satu permintaan."""
+
+    def __init__(self, interval: float = PROFILE_REQUEST_INTERVAL):
+        self.id = uuid.uuid4().hex
+        self.interval = interval
+        self.samples = Counter()
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.id[:8]}", daemon=True)
+
+    def register(self, thread_id: int):
+        with self._lock:
+            self._threads.add(thread_id)
+
+    def unregister(self, thread_id: int):
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[_fold(frame)] += 1
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self) -> str:
+        self._stop_event.set()
+        self._sampler.join()
+        return _render(self.samples)
+
+
+def _track(endpoint):
+    """Membungkus endpoint agar thread pelaksananya terdaftar pada sesi profil aktif."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            session = _active_session.get()
+            if session is None:
+                return await endpoint(*args, **kwargs)
+            thread_id = threading.get_ident()
+            session.register(thread_id)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                session.unregister(thread_id)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        session = _active_session.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        thread_id = threading.get_ident()
+        session.register(thread_id)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            session.unregister(thread_id)
+    return wrapper
+
+
+class ProfilingRoute(APIRoute):
+    """Kelas rute yang memungkinkan handler diprofil per permintaan."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _track(endpoint), **kwargs)
+
+
+def _is_superadmin(token: str) -> bool:
+    db = database.SessionLocal()
+    try:
+        user = security.get_current_user(token=token, db=db)
+        security.require_role(["Superadmin"])(current_user=user)
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+def _profile_requested(scope) -> Optional[str]:
+    """Mengembalikan token bearer jika permintaan meminta profil, selain itu None."""
+    headers = dict(scope.get("headers", []))
+    requested = headers.get(b"x-profile") == b"1" or (
+        ("__profile", "1") in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+    )
+    if not requested:
+        return None
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    return authorization[7:]
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    with _stored_lock:
+        profile = _stored_profiles.get(profile_id)
+    if profile is not None:
+        return profile
+    path = os.path.join(PROFILE_DIR, f"request-{os.path.basename(profile_id)}.folded")
+    if os.path.exists(path):
+        with open(path) as handle:
+            return handle.read()
+    return None
+
+
+class ProfilingMiddleware:
+    """Menyalakan profiler untuk permintaan yang memintanya (khusus Superadmin)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _profile_requested(scope)
+        if token is None or not await run_in_threadpool(_is_superadmin, token):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", session.id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        context_token = _active_session.set(session)
+        session.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _active_session.reset(context_token)
+            profile = session.stop()
+            with _stored_lock:
+                _stored_profiles[session.id] = profile
+                while len(_stored_profiles) > MAX_STORED_PROFILES:
+                    _stored_profiles.popitem(last=False)
+            await run_in_threadpool(_write, f"request-{session.id}.folded", profile)
+            logger.info("Profil %s untuk %s %s disimpan", session.id, scope["method"], scope["path"])
+
+
+class GlobalSampler(threading.Thread):
+    """Menyampel semua thread dengan laju rendah dan menulis agregatnya ke disk."""
+
+    def __init__(self, hz: float = PROFILE_SAMPLING_HZ, flush_seconds: int = PROFILE_FLUSH_SECONDS):
+        super().__init__(name="global-profiler", daemon=True)
+        self.interval = 1.0 / hz
+        self.flush_seconds = flush_seconds
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def flush(self):
+        if not self.samples:
+            return
+        filename = f"global-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded"
+        _write(filename, _render(self.samples))
+        self.samples = Counter()
+
+    def run(self):
+        own_id = threading.get_ident()
+        last_flush = time.monotonic()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[_fold(frame)] += 1
+            if time.monotonic() - last_flush >= self.flush_seconds:
+                self.flush()
+                last_flush = time.monotonic()
+        self.flush()
+
+
+_global_sampler: Optional[GlobalSampler] = None
+
+
+def start_global_sampler():
+    global _global_sampler
+    if PROFILE_SAMPLING_HZ > 0 and _global_sampler is None:
+        _global_sampler = GlobalSampler()
+        _global_sampler.start()
+
+
+def stop_global_sampler():
+    global _global_sampler
+    if _global_sampler is not None:
+        _global_sampler.stop()
+        _global_sampler.join(timeout=5)
+        _global_sampler = None
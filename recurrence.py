@@ -0,0 +1,81 @@
+import calendar
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+# ===================================================================
+# ATURAN PERULANGAN AKTIVITAS
+# ===================================================================
+# Versi sederhana dari RRULE (RFC 5545): frekuensi harian/mingguan/bulanan
+# dengan interval, batas tanggal (sampai) atau jumlah kejadian, dan daftar
+# tanggal pengecualian. Seperti EXDATE, pengecualian dibuang setelah batas
+# jumlah diterapkan.
+FREKUENSI = ("daily", "weekly", "monthly")
+# Batas jumlah kejadian dalam satu seri agar satu permintaan tidak membuat
+# ribuan baris sekaligus
+MAX_OCCURRENCES = 400
+
+
+def _add_months(value: date, months: int, day: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    # Tanggal 29-31 digeser ke hari terakhir bulan yang lebih pendek
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _candidates(mulai: date, frekuensi: str, interval: int, hari: Optional[Iterable[int]]):
+    """Menghasilkan tanggal kejadian tanpa batas akhir, berurutan."""
+    k = 0
+    if frekuensi == "daily":
+        while True:
+            yield mulai + timedelta(days=k * interval)
+            k += 1
+    elif frekuensi == "weekly":
+        weekdays = sorted(set(hari or [])) or [mulai.weekday()]
+        week_start = mulai - timedelta(days=mulai.weekday())
+        while True:
+            base = week_start + timedelta(weeks=k * interval)
+            for weekday in weekdays:
+                current = base + timedelta(days=weekday)
+                if current >= mulai:
+                    yield current
+            k += 1
+    elif frekuensi == "monthly":
+        while True:
+            yield _add_months(mulai, k * interval, mulai.day)
+            k += 1
+    else:
+        raise ValueError(f"Frekuensi tidak dikenal: {frekuensi}")
+
+
+def expand(
+    mulai: date,
+    frekuensi: str,
+    interval: int = 1,
+    sampai: Optional[date] = None,
+    jumlah: Optional[int] = None,
+    hari: Optional[Iterable[int]] = None,
+    pengecualian: Iterable[date] = (),
+    batas: int = MAX_OCCURRENCES,
+) -> List[date]:
+    """
+    Menjabarkan aturan menjadi daftar tanggal kejadian. ValueError dilempar
+    jika aturan tidak berujung atau menghasilkan lebih dari `batas` kejadian.
+    """
+    if sampai is None and jumlah is None:
+        raise ValueError("Aturan perulangan harus memiliki 'sampai' atau 'jumlah'.")
+    if interval < 1:
+        raise ValueError("Interval perulangan minimal 1.")
+
+    result = []
+    for current in _candidates(mulai, frekuensi, interval, hari):
+        if sampai is not None and current > sampai:
+            break
+        if jumlah is not None and len(result) >= jumlah:
+            break
+        if len(result) >= batas:
+            raise ValueError(f"Aturan perulangan menghasilkan lebih dari {batas} kejadian.")
+        result.append(current)
+
+    excluded = set(pengecualian)
+    return [current for current in result if current not in excluded]
@@ -0,0 +1,113 @@
+from datetime import date, time
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+import models
+
+# ===================================================================
+# DETEKSI BENTROK JADWAL ANGGOTA AKTIVITAS
+# ===================================================================
+# Dua aktivitas bentrok jika rentang tanggalnya beririsan dan, bila keduanya
+# memiliki jam, jendela jamnya juga beririsan. Aktivitas tanpa jam dianggap
+# berlangsung sepanjang hari; jam_selesai kosong berarti sampai akhir hari.
+# Di PostgreSQL rentang tanggal dicocokkan dengan operator && sehingga bisa
+# memakai indeks GiST ix_aktivitas_rentang_tanggal.
+AKHIR_HARI = time.max
+
+
+def rentang_tanggal(mulai, selesai):
+    """
+    Ekspresi daterange inklusif yang sama persis dengan definisi indeks GiST.
+    greatest() menjaga baris lama dengan tanggal_selesai < tanggal_mulai agar
+    tidak membuat daterange gagal.
+    """
+    return func.daterange(mulai, func.greatest(mulai, func.coalesce(selesai, mulai)), literal_column("'[]'"))
+
+
+def _tanggal_beririsan(db: Session, mulai: date, selesai: date):
+    aktivitas = models.Aktivitas
+    if db.get_bind().dialect.name == "postgresql":
+        return rentang_tanggal(aktivitas.tanggal_mulai, aktivitas.tanggal_selesai).op("&&")(
+            func.daterange(mulai, selesai, literal_column("'[]'"))
+        )
+    # Setara dengan rentang_tanggal: akhir rentang minimal tanggal_mulai
+    return and_(
+        aktivitas.tanggal_mulai <= selesai,
+        or_(
+            aktivitas.tanggal_mulai >= mulai,
+            func.coalesce(aktivitas.tanggal_selesai, aktivitas.tanggal_mulai) >= mulai,
+        ),
+    )
+
+
+def _jam_beririsan(jam_mulai: Optional[time], jam_selesai: Optional[time]):
+    aktivitas = models.Aktivitas
+    if jam_mulai is None:
+        return None
+    return or_(
+        aktivitas.jam_mulai.is_(None),
+        and_(
+            aktivitas.jam_mulai < (jam_selesai or AKHIR_HARI),
+            func.coalesce(aktivitas.jam_selesai, AKHIR_HARI) > jam_mulai,
+        ),
+    )
+
+
+def find_conflicts(
+    db: Session,
+    user_ids: Iterable[int],
+    tanggal_mulai: Optional[date],
+    tanggal_selesai: Optional[date] = None,
+    jam_mulai: Optional[time] = None,
+    jam_selesai: Optional[time] = None,
+    kecuali_aktivitas_ids: Iterable[int] = (),
+) -> List[dict]:
+    """
+    Mencari aktivitas lain yang melibatkan salah satu `user_ids` pada jendela
+    waktu yang sama, dengan satu query. Hasil dikelompokkan per aktivitas.
+    """
+    user_ids = set(user_ids)
+    if not user_ids or tanggal_mulai is None:
+        return []
+    tanggal_selesai = max(tanggal_selesai or tanggal_mulai, tanggal_mulai)
+
+    aktivitas = models.Aktivitas
+    anggota = models.anggota_aktivitas_link
+    query = select(
+        aktivitas.id, aktivitas.nama_aktivitas, aktivitas.tanggal_mulai, aktivitas.tanggal_selesai,
+        aktivitas.jam_mulai, aktivitas.jam_selesai,
+        models.User.id, models.User.username, models.User.nama_lengkap,
+    ).select_from(anggota).join(
+        aktivitas, aktivitas.id == anggota.c.aktivitas_id
+    ).join(
+        models.User, models.User.id == anggota.c.user_id
+    ).where(
+        anggota.c.user_id.in_(user_ids),
+        aktivitas.tanggal_mulai.isnot(None),
+        _tanggal_beririsan(db, tanggal_mulai, tanggal_selesai),
+    ).order_by(aktivitas.tanggal_mulai, aktivitas.id, models.User.id)
+
+    jam = _jam_beririsan(jam_mulai, jam_selesai)
+    if jam is not None:
+        query = query.where(jam)
+    kecuali = {aktivitas_id for aktivitas_id in kecuali_aktivitas_ids if aktivitas_id is not None}
+    if kecuali:
+        query = query.where(aktivitas.id.notin_(kecuali))
+
+    result = {}
+    for row in db.execute(query):
+        item = result.get(row[0])
+        if item is None:
+            item = result[row[0]] = {
+                "aktivitas_id": row[0],
+                "nama_aktivitas": row[1],
+                "tanggal_mulai": row[2],
+                "tanggal_selesai": row[3],
+                "jam_mulai": row[4],
+                "jam_selesai": row[5],
+                "anggota": [],
+            }
+        item["anggota"].append({"id": row[6], "username": row[7], "nama_lengkap": row[8]})
+    return list(result.values())
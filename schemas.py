@@ -68,6 +68,15 @@ class DaftarDokumen(CamelModel):
     status_pengecekan: bool
 
 
+class StatistikChecklist(CamelModel):
+    """Rekap kelengkapan dokumen wajib untuk satu aktivitas/proyek/tim/pengguna."""
+    id: Optional[int] = None
+    nama: Optional[str] = None
+    wajib: int
+    terunggah: int
+    terverifikasi: int
+
+
 # ===================================================================
 # SKEMA UNTUK USER
 # ===================================================================
@@ -114,6 +123,9 @@ class AktivitasInUser(CamelModel):
     nama_aktivitas: str
     tanggal_mulai: Optional[date] = None
     tanggal_selesai: Optional[date] = None
+    jumlah_dokumen_wajib: int = 0
+    jumlah_dokumen_terunggah: int = 0
+    jumlah_dokumen_terverifikasi: int = 0
     jam_mulai: Optional[time] = None
     jam_selesai: Optional[time] = None
 
@@ -195,6 +207,20 @@ class UserPage(CamelModel):
     items: List[User]
 
 
+class UserImportError(CamelModel):
+    baris: int
+    username: Optional[str] = None
+    pesan: str
+
+
+class UserImportHasil(CamelModel):
+    total: int
+    dibuat: int
+    diperbarui: int
+    gagal: int
+    errors: List[UserImportError] = []
+
+
 # ===================================================================
 # SKEMA UNTUK TEAM
 # ===================================================================
@@ -210,6 +236,8 @@ class ProjectInTeam(CamelModel):
     nama_project: str
     project_leader: Optional[UserInProject] = None
     aktivitas: List[AktivitasInTeam] = []
+    # Cursor untuk /api/projects/{id}/aktivitas jika aktivitas proyek belum dimuat semua
+    aktivitas_cursor: Optional[str] = None
 
 class AktivitasInTeam(CamelModel):
     id: int
@@ -220,8 +248,15 @@ class AktivitasInTeam(CamelModel):
     jam_mulai: Optional[time] = None
     jam_selesai: Optional[time] = None
     melibatkan_kepala: bool
+    jumlah_dokumen_wajib: int = 0
+    jumlah_dokumen_terunggah: int = 0
+    jumlah_dokumen_terverifikasi: int = 0
     users: List[UserInAktivitas] = []
 
+class ProjectAktivitasPage(CamelModel):
+    items: List[AktivitasInTeam]
+    cursor: Optional[str] = None
+
 class TeamBase(CamelModel):
     id: int
     nama_tim: str
@@ -249,6 +284,40 @@ class TeamUpdate(TeamBase):
     pass
 
 
+class TeamMembersUpdate(CamelModel):
+    # Daftar lengkap anggota yang diinginkan; ketua tim selalu dipertahankan
+    user_ids: List[int] = []
+
+
+class TeamRollover(CamelModel):
+    team_ids: List[int] = Field(..., min_length=1)
+    valid_from: date
+    valid_until: date
+    sertakan_proyek: bool = False
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def check_periode(self):
+        if self.valid_from > self.valid_until:
+            raise ValueError("validFrom tidak boleh setelah validUntil")
+        return self
+
+
+class TeamRolloverItem(CamelModel):
+    team_lama_id: int
+    team_baru_id: Optional[int] = None
+    nama_tim: str
+    jumlah_anggota: int
+    jumlah_proyek: int
+
+
+class TeamRolloverHasil(CamelModel):
+    dry_run: bool
+    valid_from: date
+    valid_until: date
+    teams: List[TeamRolloverItem] = []
+
+
 # Skema utama untuk menampilkan Team secara penuh
 class Team(TeamBase):
     id: int
@@ -282,6 +351,9 @@ class ProjectUpdate(CamelModel):
 class ProjectAktivitas(CamelModel):
     id: int
     nama_aktivitas: str
+    jumlah_dokumen_wajib: int = 0
+    jumlah_dokumen_terunggah: int = 0
+    jumlah_dokumen_terverifikasi: int = 0
     daftar_dokumen_wajib: List[DaftarDokumen] = []
 
 
@@ -320,6 +392,23 @@ class StatusPengecekanUpdate(CamelModel):
     status_pengecekan: bool
 
 
+class StatusPengecekanItem(CamelModel):
+    item_id: int
+    status_pengecekan: bool
+
+
+class StatusPengecekanBatch(CamelModel):
+    items: List[StatusPengecekanItem] = Field(..., min_length=1, max_length=1000)
+
+
+class StatusPengecekanHasil(CamelModel):
+    item_id: int
+    # "diperbarui", "tidak_ditemukan", "tidak_terhubung", atau "ditolak"
+    hasil: str
+    aktivitas_id: Optional[int] = None
+    status_pengecekan: Optional[bool] = None
+
+
 class AktivitasCreate(AktivitasBase):
     daftar_dokumen_wajib: List[str] = []
     anggota_aktivitas_ids: List[int] = []
@@ -338,16 +427,175 @@ class AktivitasCreate(AktivitasBase):
                     raise ValueError('Tanggal Mulai dan Tanggal Selesai wajib diisi.')
         return data
 
+    @model_validator(mode='after')
+    def check_date_order(self):
+        if self.tanggal_mulai and self.tanggal_selesai and self.tanggal_selesai < self.tanggal_mulai:
+            raise ValueError('Tanggal Selesai tidak boleh sebelum Tanggal Mulai.')
+        return self
+
+
+class KonflikJadwal(CamelModel):
+    """Aktivitas lain yang bertabrakan jadwal dengan anggota yang diusulkan."""
+    aktivitas_id: int
+    nama_aktivitas: str
+    tanggal_mulai: Optional[date] = None
+    tanggal_selesai: Optional[date] = None
+    jam_mulai: Optional[time] = None
+    jam_selesai: Optional[time] = None
+    anggota: List[UserInProject] = []
+
 
 class Aktivitas(AktivitasBase):
     id: int
     dibuat_pada: datetime
+    seri_id: Optional[int] = None
+    jumlah_dokumen_wajib: int = 0
+    jumlah_dokumen_terunggah: int = 0
+    jumlah_dokumen_terverifikasi: int = 0
     creator: Optional[UserInTeam] = None
     team: Optional[TeamInProject] = None
     project: Optional[ProjectInUser] = None
     dokumen: List[Dokumen] = []
     daftar_dokumen_wajib: List[DaftarDokumen] = []
     users: List[UserInAktivitas] = []
+    # Hanya terisi pada respons create/update aktivitas
+    konflik_jadwal: List[KonflikJadwal] = []
+
+
+class AgendaKepalaItem(CamelModel):
+    id: int
+    nama_aktivitas: str
+    tanggal_mulai: Optional[date] = None
+    tanggal_selesai: Optional[date] = None
+    jam_mulai: Optional[time] = None
+    jam_selesai: Optional[time] = None
+    team_id: Optional[int] = None
+    nama_tim: Optional[str] = None
+    warna: Optional[str] = None
+    project_id: Optional[int] = None
+    nama_project: Optional[str] = None
+
+
+class AgendaKepalaHari(CamelModel):
+    tanggal: date
+    aktivitas: List[AgendaKepalaItem] = []
+
+
+class AgendaKepala(CamelModel):
+    start_date: date
+    end_date: date
+    # Jumlah aktivitas di dalam jendela; skip/limit berlaku pada aktivitas, bukan hari
+    total: int
+    skip: int
+    limit: int
+    hari: List[AgendaKepalaHari] = []
+
+
+class AturanPerulangan(CamelModel):
+    frekuensi: str = Field(..., pattern="^(daily|weekly|monthly)$")
+    interval: int = Field(1, ge=1, le=365)
+    sampai: Optional[date] = None
+    jumlah: Optional[int] = Field(None, ge=1)
+    # Khusus mingguan: 0 = Senin ... 6 = Minggu (default: hari tanggal mulai)
+    hari: List[int] = []
+    pengecualian: List[date] = []
+
+    @model_validator(mode='after')
+    def check_batas(self):
+        if self.sampai is None and self.jumlah is None:
+            raise ValueError("Aturan perulangan harus memiliki 'sampai' atau 'jumlah'.")
+        if any(h < 0 or h > 6 for h in self.hari):
+            raise ValueError("Hari harus bernilai 0 (Senin) sampai 6 (Minggu).")
+        return self
+
+
+class AktivitasSeriCreate(AktivitasCreate):
+    aturan: AturanPerulangan
+
+
+class AktivitasSeriUpdate(CamelModel):
+    # Hanya field yang dikirim yang diubah pada setiap aktivitas di seri
+    nama_aktivitas: Optional[str] = None
+    deskripsi: Optional[str] = None
+    jam_mulai: Optional[time] = None
+    jam_selesai: Optional[time] = None
+    team_id: Optional[int] = None
+    project_id: Optional[int] = None
+    melibatkan_kepala: Optional[bool] = None
+    daftar_dokumen_wajib: Optional[List[str]] = None
+    anggota_aktivitas_ids: Optional[List[int]] = None
+    # Jika dikirim, kejadian mulai dari `mulai_dari` dibangkitkan ulang
+    aturan: Optional[AturanPerulangan] = None
+    tanggal_mulai: Optional[date] = None
+
+
+class SeriAktivitas(CamelModel):
+    id: int
+    aturan: AturanPerulangan
+    aktivitas: List[AktivitasInUser] = []
+
+
+class BulkDeleteRequest(CamelModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkDeleteGagal(CamelModel):
+    id: int
+    alasan: str
+
+
+class BulkDeleteHasil(CamelModel):
+    dihapus: List[int] = []
+    gagal: List[BulkDeleteGagal] = []
+
+
+# ===================================================================
+# SKEMA UNTUK KALENDER
+# ===================================================================
+class IntervalWaktu(CamelModel):
+    mulai: datetime
+    selesai: datetime
+
+
+class FreeBusyPegawai(CamelModel):
+    id: int
+    nama_lengkap: Optional[str] = None
+    sibuk: List[IntervalWaktu] = []
+
+
+class FreeBusyHasil(CamelModel):
+    start_date: date
+    end_date: date
+    granularitas: int
+    pegawai: List[FreeBusyPegawai] = []
+    slot_kosong: List[IntervalWaktu] = []
+
+
+class BebanKerjaPegawai(CamelModel):
+    id: int
+    nama_lengkap: Optional[str] = None
+    jabatan_id: Optional[int] = None
+    # Jumlah aktivitas per hari, sejajar dengan BebanKerjaHasil.tanggal
+    beban: List[int] = []
+    total: int = 0
+    puncak: int = 0
+
+
+class BebanKerjaKelompok(CamelModel):
+    id: int
+    nama: Optional[str] = None
+    jumlah_pegawai: int
+    beban: List[int] = []
+    rata_rata: List[float] = []
+
+
+class BebanKerjaHasil(CamelModel):
+    start_date: date
+    end_date: date
+    tanggal: List[date] = []
+    pegawai: List[BebanKerjaPegawai] = []
+    per_tim: List[BebanKerjaKelompok] = []
+    per_jabatan: List[BebanKerjaKelompok] = []
 
 
 # ===================================================================
@@ -1,3 +1,7 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List
 from jose import JWTError, jwt
@@ -9,6 +13,7 @@ from sqlalchemy.orm import Session, joinedload
 
 # Impor dari file proyek Anda
 import models, schemas, database
+import active_window
 
 # ===================================================================
 # KONFIGURASI KEAMANAN
@@ -33,6 +38,45 @@ def get_password_hash(password):
     """Membuat hash dari password asli."""
     return pwd_context.hash(password)
 
+# Process pool untuk hashing dibuat sekali (lazy) dan dipakai ulang. Konteks
+# "spawn" dipakai karena worker web punya banyak thread (listener cache,
+# sampler profiling, logging); fork dari proses seperti itu bisa membuat
+# proses anak terkunci oleh lock yang sedang dipegang thread lain.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_workers = 0
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool(max_workers: Optional[int] = None):
+    global _hash_pool, _hash_pool_workers
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool_workers = max_workers or os.cpu_count() or 1
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=_hash_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool, _hash_pool_workers
+
+def shutdown_hash_pool():
+    """Menghentikan process pool hashing (dipanggil saat aplikasi/skrip selesai)."""
+    global _hash_pool
+    with _hash_pool_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def hash_passwords(passwords: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Membuat hash untuk banyak password sekaligus. bcrypt sangat memakan CPU,
+    jadi pekerjaan dibagi ke process pool bersama agar memakai semua core.
+    `max_workers` hanya berlaku saat pool pertama kali dibuat.
+    """
+    if len(passwords) < 8:
+        return [get_password_hash(p) for p in passwords]
+    executor, workers = _get_hash_pool(max_workers)
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Membuat JSON Web Token (JWT)."""
     to_encode = data.copy()
@@ -59,13 +103,8 @@ def get_user(db: Session, username: str):
     if not user:
         return None
 
-    # cek apakah user adalah ketua tim aktif
-    now = datetime.now()
-    ketua_tim_aktif = db.query(models.Team).filter(
-        models.Team.ketua_tim_id == user.id,
-        models.Team.valid_from <= now,
-        models.Team.valid_until >= now
-    ).all()
+    # cek apakah user adalah ketua tim aktif (dari indeks harian yang di-cache)
+    ketua_tim_aktif = list(active_window.get(db)["ketua"].get(user.id, ()))
 
     # tambahkan atribut dinamis ke user
     setattr(user, "ketua_tim_aktif", ketua_tim_aktif)
@@ -0,0 +1,407 @@
+# File: seed.py
+"""
+Alat pengisian data (pengganti inject_user.py).
+
+    # satu pengguna (perilaku lama inject_user.py)
+    python seed.py user --username ketua.tim2 --password password123 --nama "Ketua Tim Dua"
+
+    # data skala produksi: puluhan ribu aktivitas, ratusan ribu anggota_aktivitas
+    python seed.py bulk --users 800 --teams 25 --aktivitas 40000 --members-per-aktivitas 8
+
+Pada Postgres data dimuat dengan COPY per batch; database lain memakai executemany.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import uuid
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, insert, select, text
+
+import checklist_counter, database, models, security
+
+BATCH_SIZE = 10000
+
+NAMA_DEPAN = [
+    "Agus", "Budi", "Citra", "Dewi", "Eko", "Fitri", "Gilang", "Hendra", "Indah", "Joko",
+    "Kartika", "Lestari", "Muhammad", "Nur", "Putri", "Rahmat", "Sari", "Taufik", "Utami", "Wahyu",
+    "Yusuf", "Zahra", "Andi", "Bayu", "Dian", "Fajar", "Hadi", "Ika", "Rina", "Slamet",
+]
+NAMA_BELAKANG = [
+    "Pratama", "Saputra", "Wijaya", "Santoso", "Hidayat", "Nugroho", "Kurniawan", "Setiawan",
+    "Rahmawati", "Lestari", "Susanto", "Purnomo", "Siregar", "Nasution", "Harahap", "Simanjuntak",
+    "Hakim", "Maulana", "Firmansyah", "Permana",
+]
+NAMA_TIM = [
+    "IPDS", "Statistik Harga", "Statistik Sosial", "Statistik Produksi", "Statistik Distribusi",
+    "Neraca Wilayah", "Umum", "Humas", "Sakernas", "Susenas", "Pertanian", "Pembinaan Statistik Sektoral",
+]
+NAMA_PROYEK = [
+    "Manajemen Mitra", "Rekonsiliasi Harga", "Survei Harga Konsumen", "Pemutakhiran Data",
+    "Publikasi Daerah Dalam Angka", "Pengolahan Data", "Diseminasi", "Pelatihan Petugas",
+    "Evaluasi Kinerja", "Pembinaan Desa Cantik",
+]
+NAMA_AKTIVITAS = [
+    "Rapat Koordinasi", "Pencacahan Lapangan", "Pemeriksaan Dokumen", "Entri Data", "Rilis BRS",
+    "Pelatihan Mitra", "Supervisi", "Validasi Data", "Penyusunan Laporan", "Monitoring",
+]
+DOKUMEN_WAJIB = ["Undangan", "Notulen", "Daftar Hadir", "Foto Kegiatan", "Laporan", "Surat Tugas"]
+JABATAN = ["Kepala", "Kepala Subbagian Umum", "Statistisi Ahli Madya", "Statistisi Ahli Muda",
+           "Statistisi Ahli Pertama", "Pranata Komputer", "Statistisi Terampil"]
+PERAN = ["Superadmin", "Admin", "User"]
+
+# PDF minimal yang valid, dipakai sebagai isi berkas tiruan
+PLACEHOLDER_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+
+@dataclass
+class SeedConfig:
+    users: int = 200
+    teams: int = 10
+    projects_per_team: int = 5
+    aktivitas: int = 2000
+    members_per_aktivitas: int = 5
+    checklist_per_aktivitas: int = 3
+    files_per_aktivitas: float = 0.5  # rata-rata berkas per aktivitas
+    file_size_kb: int = 16
+    start_date: str = "2024-01-01"
+    days: int = 730
+    password: str = "password123"
+    unique_passwords: bool = False  # True: setiap user punya password sendiri (lebih lambat)
+    write_files: bool = True
+    dokumen_dir: str = "./dokumen"
+    seed: int = 42
+    workers: Optional[int] = None
+
+
+def _next_id(conn, table) -> int:
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _reference_ids(conn, table, column: str, names: Sequence[str]) -> List[int]:
+    """Mengambil id data referensi, membuatnya terlebih dahulu jika belum ada."""
+    existing = dict(conn.execute(select(table.c[column], table.c.id)).all())
+    missing = [{column: name} for name in names if name not in existing]
+    if missing:
+        conn.execute(insert(table), missing)
+        existing = dict(conn.execute(select(table.c[column], table.c.id)).all())
+    return [existing[name] for name in names]
+
+
+def _slug(value: str) -> str:
+    return value.replace(" ", "-")
+
+
+class _Dataset:
+    """Baris per tabel dalam urutan kolom yang siap dimuat."""
+
+    def __init__(self):
+        self.rows: Dict[str, List[tuple]] = {}
+        self.columns: Dict[str, List[str]] = {}
+
+    def add(self, table: str, row: dict):
+        if table not in self.columns:
+            self.columns[table] = list(row)
+            self.rows[table] = []
+        self.rows[table].append(tuple(row[c] for c in self.columns[table]))
+
+    def count(self, table: str) -> int:
+        return len(self.rows.get(table, []))
+
+
+def user_password(config: SeedConfig, user_id: int) -> str:
+    """Password pengguna sintetis; dengan unique_passwords ID pengguna ditambahkan di belakangnya."""
+    return f"{config.password}{user_id}" if config.unique_passwords else config.password
+
+
+def build_dataset(conn, config: SeedConfig) -> _Dataset:
+    """Membangkitkan data yang konsisten secara referensial di memori."""
+    rng = random.Random(config.seed)
+    data = _Dataset()
+    tables = models.Base.metadata.tables
+    start = date.fromisoformat(config.start_date)
+
+    role_ids = _reference_ids(conn, tables["sistem_roles"], "nama_role", PERAN)
+    jabatan_ids = _reference_ids(conn, tables["jabatan"], "nama_jabatan", JABATAN)
+
+    first_user = _next_id(conn, tables["users"])
+    user_ids = list(range(first_user, first_user + config.users))
+    if config.unique_passwords:
+        passwords = [user_password(config, uid) for uid in user_ids]
+        hashes = security.hash_passwords(passwords, max_workers=config.workers)
+    else:
+        hashes = [security.get_password_hash(config.password)] * len(user_ids)
+    for index, uid in enumerate(user_ids):
+        nama = f"{rng.choice(NAMA_DEPAN)} {rng.choice(NAMA_BELAKANG)}"
+        data.add("users", {
+            "id": uid,
+            "username": f"{nama.lower().replace(' ', '.')}.{uid}",
+            "hashed_password": hashes[index],
+            "nama_lengkap": nama,
+            "is_active": True,
+            "sistem_role_id": role_ids[0] if index == 0 else role_ids[2 if index % 20 else 1],
+            "jabatan_id": jabatan_ids[0] if index == 0 else rng.choice(jabatan_ids[1:]),
+            "foto_profil_url": None,
+        })
+
+    first_team = _next_id(conn, tables["teams"])
+    team_members: Dict[int, List[int]] = {}
+    team_names: Dict[int, str] = {}
+    per_team = max(2, config.users // max(config.teams, 1))
+    for i in range(config.teams):
+        team_id = first_team + i
+        members = rng.sample(user_ids, min(per_team, len(user_ids)))
+        team_members[team_id] = members
+        team_names[team_id] = f"Tim {NAMA_TIM[i % len(NAMA_TIM)]}" + (f" {i // len(NAMA_TIM) + 1}" if i >= len(NAMA_TIM) else "")
+        data.add("teams", {
+            "id": team_id,
+            "nama_tim": team_names[team_id],
+            "valid_from": start,
+            "valid_until": start + timedelta(days=config.days),
+            "ketua_tim_id": members[0],
+            "warna": "#%06x" % rng.randrange(0x1000000),
+        })
+        for uid in members:
+            data.add("user_team_link", {"user_id": uid, "team_id": team_id})
+
+    first_project = _next_id(conn, tables["projects"])
+    projects = []
+    for team_id, members in team_members.items():
+        for j in range(config.projects_per_team):
+            project = {
+                "id": first_project + len(projects),
+                "nama_project": NAMA_PROYEK[j % len(NAMA_PROYEK)],
+                "team_id": team_id,
+                "project_leader_id": rng.choice(members),
+            }
+            projects.append(project)
+            data.add("projects", project)
+
+    first_aktivitas = _next_id(conn, tables["aktivitas"])
+    first_dokumen = _next_id(conn, tables["dokumen"])
+    first_checklist = _next_id(conn, tables["daftar_dokumen"])
+    payload = PLACEHOLDER_PDF.ljust(config.file_size_kb * 1024, b"\n")
+    for i in range(config.aktivitas):
+        aktivitas_id = first_aktivitas + i
+        project = rng.choice(projects) if projects else None
+        team_id = project["team_id"] if project else None
+        mulai = start + timedelta(days=rng.randrange(config.days))
+        multi_day = rng.random() < 0.3
+        with_time = not multi_day and rng.random() < 0.5
+        jam = rng.randrange(7, 15)
+        nama = f"{rng.choice(NAMA_AKTIVITAS)} {mulai.strftime('%B %Y')}"
+        data.add("aktivitas", {
+            "id": aktivitas_id,
+            "nama_aktivitas": nama,
+            "deskripsi": None,
+            "tanggal_mulai": mulai,
+            "tanggal_selesai": mulai + timedelta(days=rng.randrange(1, 5)) if multi_day else None,
+            "jam_mulai": time(jam) if with_time else None,
+            "jam_selesai": time(jam + 2) if with_time else None,
+            "dibuat_pada": datetime.combine(mulai - timedelta(days=rng.randrange(1, 14)), time(8)),
+            "creator_user_id": project["project_leader_id"] if project else user_ids[0],
+            "team_id": team_id,
+            "project_id": project["id"] if project else None,
+            "melibatkan_kepala": rng.random() < 0.1,
+        })
+        pool = team_members.get(team_id, user_ids)
+        for uid in rng.sample(pool, min(len(pool), config.members_per_aktivitas)):
+            data.add("anggota_aktivitas", {"aktivitas_id": aktivitas_id, "user_id": uid})
+
+        n_files = int(config.files_per_aktivitas) + (rng.random() < config.files_per_aktivitas % 1)
+        folder = None
+        if project and n_files:
+            # Struktur folder sama dengan get_document_path di main.py
+            folder = os.path.join(
+                config.dokumen_dir, str(mulai.year), _slug(team_names[team_id]), _slug(project["nama_project"]),
+                f"{mulai.strftime('%y%m%d')}_{_slug(nama)}",
+            )
+        file_ids = []
+        for _ in range(n_files if folder else 0):
+            dokumen_id = first_dokumen + data.count("dokumen")
+            path = os.path.join(folder, f"{uuid.UUID(int=rng.getrandbits(128))}.pdf")
+            if config.write_files:
+                os.makedirs(folder, exist_ok=True)
+                with open(path, "wb") as handle:
+                    handle.write(payload)
+            data.add("dokumen", {
+                "id": dokumen_id,
+                "keterangan": f"Bukti {nama}",
+                "tipe": "FILE",
+                "path_atau_url": path,
+                "nama_file_asli": f"{_slug(nama)}_{dokumen_id}.pdf",
+                "tipe_file_mime": "application/pdf",
+                "diunggah_pada": datetime.combine(mulai, time(16)),
+                "project_id": None,
+                "aktivitas_id": aktivitas_id,
+            })
+            file_ids.append(dokumen_id)
+        for j, nama_dokumen in enumerate(rng.sample(DOKUMEN_WAJIB, min(config.checklist_per_aktivitas, len(DOKUMEN_WAJIB)))):
+            linked = file_ids[j] if j < len(file_ids) else None
+            data.add("daftar_dokumen", {
+                "id": first_checklist + data.count("daftar_dokumen"),
+                "nama_dokumen": nama_dokumen,
+                "status_pengecekan": linked is not None and rng.random() < 0.6,
+                "dokumen_id": linked,
+                "aktivitas_id": aktivitas_id,
+            })
+    return data
+
+
+def _copy_rows(conn, table: str, columns: List[str], rows: List[tuple]):
+    """Memuat baris dengan COPY ... FROM STDIN (psycopg2 maupun psycopg 3)."""
+    cursor = conn.connection.driver_connection.cursor()
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    try:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in batch:
+                    # Nilai None ditulis sebagai field kosong tanpa kutip = NULL
+                    writer.writerow(["" if value is None else value for value in row])
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+            else:  # psycopg 3
+                with cursor.copy(statement.replace(" WITH (FORMAT csv)", "")) as copy:
+                    for row in batch:
+                        copy.write_row(row)
+    finally:
+        cursor.close()
+
+
+def load(conn, data: _Dataset):
+    """Memuat dataset dalam urutan yang memenuhi foreign key."""
+    order = ["users", "teams", "user_team_link", "projects", "aktivitas", "anggota_aktivitas", "dokumen", "daftar_dokumen"]
+    use_copy = conn.dialect.name == "postgresql"
+    for table in order:
+        rows = data.rows.get(table)
+        if not rows:
+            continue
+        columns = data.columns[table]
+        if use_copy:
+            _copy_rows(conn, table, columns, rows)
+        else:
+            target = models.Base.metadata.tables[table]
+            for start in range(0, len(rows), BATCH_SIZE):
+                conn.execute(insert(target), [dict(zip(columns, row)) for row in rows[start:start + BATCH_SIZE]])
+    # Penghitung checklist hanya dihitung untuk aktivitas yang baru dimuat
+    aktivitas = data.rows.get("aktivitas")
+    if aktivitas:
+        id_index = data.columns["aktivitas"].index("id")
+        checklist_counter.refresh_counters(conn, [row[id_index] for row in aktivitas])
+    if use_copy:
+        for table in ["users", "teams", "projects", "aktivitas", "dokumen", "daftar_dokumen"]:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+
+
+def seed_bulk(config: SeedConfig, engine=None) -> dict:
+    """Membangkitkan dan memuat dataset dalam satu transaksi, lalu mengembalikan ringkasannya."""
+    engine = engine or database.engine
+    with engine.begin() as conn:
+        data = build_dataset(conn, config)
+        load(conn, data)
+    users = data.rows.get("users", [])
+    username_index = data.columns["users"].index("username") if users else 0
+    user_id_index = data.columns["users"].index("id") if users else 0
+    dokumen = data.rows.get("dokumen", [])
+    aktivitas_index = data.columns["dokumen"].index("aktivitas_id") if dokumen else 0
+    aktivitas_with_files = sorted({row[aktivitas_index] for row in dokumen})
+    return {
+        "config": asdict(config),
+        "counts": {table: len(rows) for table, rows in data.rows.items()},
+        "usernames": [row[username_index] for row in users[:50]],
+        "password": f"{config.password}<id>" if config.unique_passwords else config.password,
+        # Pasangan login siap pakai untuk benchmark, juga saat unique_passwords aktif
+        "credentials": [
+            {"username": row[username_index], "password": user_password(config, row[user_id_index])}
+            for row in users[:50]
+        ],
+        "team_ids": [row[0] for row in data.rows.get("teams", [])],
+        "aktivitas_ids": [row[0] for row in data.rows.get("aktivitas", [])[:500]],
+        "aktivitas_with_files": aktivitas_with_files[:500],
+    }
+
+
+def seed_user(username: str, password: str, nama_lengkap: str):
+    """Membuat satu pengguna jika belum ada."""
+    db = database.SessionLocal()
+    try:
+        if db.query(models.User).filter(models.User.username == username).first():
+            print(f"⚠️ Pengguna '{username}' sudah ada di database.")
+            return
+        db.add(models.User(
+            username=username,
+            hashed_password=security.get_password_hash(password),
+            nama_lengkap=nama_lengkap,
+            is_active=True,
+        ))
+        db.commit()
+        print(f"✅ Pengguna '{username}' berhasil dibuat.")
+    finally:
+        db.close()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Menambahkan satu opsi CLI untuk setiap field SeedConfig."""
+    for field in fields(SeedConfig):
+        option = f"--{field.name.replace('_', '-')}"
+        if field.type in (bool, "bool"):
+            parser.add_argument(option, action=argparse.BooleanOptionalAction, default=field.default)
+        elif field.name == "workers":
+            parser.add_argument(option, type=int, default=None)
+        else:
+            parser.add_argument(option, type=type(field.default), default=field.default)
+
+
+def config_from_args(args) -> SeedConfig:
+    return SeedConfig(**{field.name: getattr(args, field.name) for field in fields(SeedConfig)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pengisian data Sinergi.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    user_parser = sub.add_parser("user", help="Membuat satu pengguna.")
+    user_parser.add_argument("--username", required=True)
+    user_parser.add_argument("--password", required=True)
+    user_parser.add_argument("--nama", default=None)
+
+    bulk_parser = sub.add_parser("bulk", help="Membangkitkan data sintetis skala besar.")
+    add_config_arguments(bulk_parser)
+    bulk_parser.add_argument("--summary", help="Tulis ringkasan JSON ke file ini.")
+
+    args = parser.parse_args()
+    if args.command == "user":
+        seed_user(args.username, args.password, args.nama)
+        return
+
+    models.Base.metadata.create_all(bind=database.engine)
+    try:
+        summary = seed_bulk(config_from_args(args))
+    finally:
+        security.shutdown_hash_pool()
+    if args.summary:
+        with open(args.summary, "w") as handle:
+            json.dump(summary, handle, indent=2, default=str)
+    print(json.dumps(summary["counts"]))
+    if summary["credentials"]:
+        contoh = summary["credentials"][0]
+        print(f"Password pengguna: {summary['password']} (mis. {contoh['username']} / {contoh['password']})")
+
+
+if __name__ == "__main__":
+    main()
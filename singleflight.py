@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import os
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from jose import JWTError, jwt
+
+import security
+
+# ===================================================================
+# SINGLE-FLIGHT UNTUK GET IDENTIK YANG DATANG BERSAMAAN
+# ===================================================================
+# Permintaan GET yang identik (rute + query ternormalisasi + cakupan izin)
+# dan datang saat permintaan pertama masih diproses akan menunggu hasil
+# permintaan pertama tersebut, bukan menghitung ulang hasil yang sama.
+#
+# Cakupan izin per rute:
+#   "public" -> hasil sama untuk semua pemanggil (rute tanpa otentikasi)
+#   "user"   -> hasil hanya dibagi antar permintaan dari user yang sama
+DEFAULT_SINGLEFLIGHT_ROUTES = {
+    "/api/kalender/timeline": "public",
+    "/api/kalender/events": "public",
+    "/api/aktivitas/kepala": "public",
+}
+
+
+def _routes_from_env() -> Dict[str, str]:
+    """Format SINGLEFLIGHT_ROUTES: "/api/a:public,/api/b:user"."""
+    raw = os.getenv("SINGLEFLIGHT_ROUTES")
+    if not raw:
+        return dict(DEFAULT_SINGLEFLIGHT_ROUTES)
+    routes = {}
+    for item in raw.split(","):
+        path, _, scope = item.strip().partition(":")
+        if path:
+            routes[path] = scope or "user"
+    return routes
+
+
+def _permission_scope(scope: dict, mode: str) -> str:
+    if mode == "public":
+        return "public"
+    authorization = ""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+            break
+    token = authorization[7:] if authorization.lower().startswith("bearer ") else authorization
+    if not token:
+        return "anon"
+    try:
+        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+        return f"user:{payload.get('sub')}"
+    except JWTError:
+        # Token tidak valid tidak boleh berbagi hasil dengan token lain
+        return "token:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+def request_key(scope: dict, mode: str) -> str:
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    normalized = "&".join(f"{k}={v.strip()}" for k, v in sorted(query))
+    return f"{scope['path']}?{normalized}#{_permission_scope(scope, mode)}"
+
+
+class SingleFlightMiddleware:
+    """Middleware ASGI yang menggabungkan GET identik yang sedang berjalan bersamaan."""
+
+    def __init__(self, app, routes: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.routes = routes if routes is not None else _routes_from_env()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        mode = self.routes.get(scope["path"])
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = request_key(scope, mode)
+        flight = self._inflight.get(key)
+        if flight is not None:
+            # Tunggu hasil permintaan pertama; shield agar pembatalan satu klien
+            # tidak membatalkan hasil untuk klien lainnya
+            self.stats["coalesced"] += 1
+            try:
+                messages, route = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # Permintaan pertama dibatalkan (mis. klien terputus), proses sendiri
+                await self.app(scope, receive, send)
+                return
+            if route is not None:
+                # Agar middleware luar (metrik) tetap mengenali template rute
+                scope["route"] = route
+            await self._replay(messages, send, coalesced=True)
+            return
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        self.stats["leaders"] += 1
+        messages: List[dict] = []
+
+        async def capture(message):
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as exc:
+            flight.set_exception(exc)
+            # Tandai exception sudah diambil agar tidak muncul peringatan jika tidak ada pengikut
+            flight.exception()
+            raise
+        else:
+            flight.set_result((messages, scope.get("route")))
+        finally:
+            self._inflight.pop(key, None)
+
+        await self._replay(messages, send, coalesced=False)
+
+    @staticmethod
+    async def _replay(messages: List[dict], send, coalesced: bool):
+        for message in messages:
+            if coalesced and message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-coalesced", b"1")]}
+            await send(message)
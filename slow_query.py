@@ -0,0 +1,207 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+import database
+from db_tracking import fingerprint
+
+# ===================================================================
+# LOG QUERY LAMBAT (OPT-IN)
+# ===================================================================
+# Aktifkan dengan SLOW_QUERY_LOG=1. Setiap statement dinormalkan menjadi
+# fingerprint dan latensinya disimpan untuk menghitung persentil bergulir.
+# Query SELECT yang melewati ambang akan di-EXPLAIN (ANALYZE, BUFFERS) di
+# thread latar belakang, lalu disimpan di ring buffer berukuran tetap.
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG", "0") == "1"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "100"))
+# Jumlah sampel latensi terakhir yang disimpan per fingerprint
+SAMPLES_PER_FINGERPRINT = 500
+MAX_FINGERPRINTS = 1000
+# Satu fingerprint tidak di-EXPLAIN ulang sebelum jeda ini lewat
+EXPLAIN_COOLDOWN_SECONDS = 300
+MAX_PENDING_EXPLAINS = 5
+
+logger = logging.getLogger("sinergi.slow_query")
+
+# EXPLAIN ANALYZE benar-benar mengeksekusi statement, jadi hanya SELECT murni
+# yang boleh diulang: tanpa CTE pengubah data, SELECT ... INTO, penguncian baris
+# (FOR UPDATE/SHARE) maupun fungsi yang mengubah state seperti nextval/setval.
+_READ_ONLY_PREFIX = ("SELECT", "WITH")
+_UNSAFE_RE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|NEXTVAL|SETVAL|PG_ADVISORY_\w*)\b|\bFOR\s+(NO\s+KEY\s+)?(SHARE|KEY\s+SHARE)\b",
+    re.I,
+)
+
+_START_KEY = "slow_query_start_time"
+_EXPLAIN_KEY = "slow_query_explain"
+
+
+def _is_read_only(fp: str) -> bool:
+    """True jika fingerprint (komentar dan literal sudah dibuang) aman untuk EXPLAIN ANALYZE."""
+    return fp.upper().startswith(_READ_ONLY_PREFIX) and not _UNSAFE_RE.search(fp)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class SlowQueryRecorder:
+    def __init__(self, engine, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 buffer_size: int = SLOW_QUERY_BUFFER_SIZE, capture_plans: bool = True):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000.0
+        self.capture_plans = capture_plans and engine.dialect.name == "postgresql"
+        self.entries: deque = deque(maxlen=buffer_size)
+        self._samples: "OrderedDict[str, deque]" = OrderedDict()
+        self._last_explain: Dict[str, float] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def install(self):
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        if self.capture_plans:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def uninstall(self):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if conn.info.get(_EXPLAIN_KEY):
+            return
+        fp = fingerprint(statement)
+        with self._lock:
+            samples = self._samples.get(fp)
+            if samples is None:
+                samples = self._samples[fp] = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+                if len(self._samples) > MAX_FINGERPRINTS:
+                    self._samples.popitem(last=False)
+            else:
+                self._samples.move_to_end(fp)
+            samples.append(duration)
+
+        if duration < self.threshold:
+            return
+
+        entry = {
+            "fingerprint": fp,
+            "statement": statement,
+            "durationMs": round(duration * 1000, 2),
+            "capturedAt": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        logger.warning("Query lambat %.1f ms: %s", duration * 1000, fp)
+        with self._lock:
+            self.entries.append(entry)
+            should_explain = (
+                self._executor is not None
+                and not executemany
+                and _is_read_only(fp)
+                and self._pending < MAX_PENDING_EXPLAINS
+                and time.monotonic() - self._last_explain.get(fp, float("-inf")) >= EXPLAIN_COOLDOWN_SECONDS
+            )
+            if should_explain:
+                self._last_explain[fp] = time.monotonic()
+                self._pending += 1
+        if should_explain:
+            self._executor.submit(self._explain, entry, statement, parameters)
+
+    def _explain(self, entry: Dict[str, Any], statement: str, parameters):
+        """Menjalankan EXPLAIN di koneksi terpisah dan selalu di-rollback."""
+        try:
+            with self.engine.connect() as conn:
+                conn.info[_EXPLAIN_KEY] = True
+                try:
+                    # Lapisan pengaman kedua: Postgres menolak penulisan di transaksi read-only
+                    conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                    result = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+                    entry["plan"] = "\n".join(row[0] for row in result)
+                finally:
+                    conn.info.pop(_EXPLAIN_KEY, None)
+                    conn.rollback()
+        except Exception as exc:
+            entry["plan"] = f"EXPLAIN gagal: {exc}"
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def fingerprint_stats(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Persentil latensi bergulir per fingerprint, diurutkan dari p95 terbesar."""
+        with self._lock:
+            items = [(fp, sorted(samples)) for fp, samples in self._samples.items()]
+        stats = [
+            {
+                "fingerprint": fp,
+                "samples": len(values),
+                "p50Ms": round(_percentile(values, 0.50) * 1000, 2),
+                "p95Ms": round(_percentile(values, 0.95) * 1000, 2),
+                "p99Ms": round(_percentile(values, 0.99) * 1000, 2),
+                "maxMs": round(values[-1] * 1000, 2),
+            }
+            for fp, values in items if values
+        ]
+        stats.sort(key=lambda item: item["p95Ms"], reverse=True)
+        return stats[:limit]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self.entries)
+        return {
+            "enabled": True,
+            "thresholdMs": self.threshold * 1000,
+            "entries": list(reversed(entries)),
+            "fingerprints": self.fingerprint_stats(),
+        }
+
+
+recorder: Optional[SlowQueryRecorder] = None
+
+
+def enable(engine=None, **kwargs) -> SlowQueryRecorder:
+    """Memasang perekam query lambat pada engine (default: database.engine)."""
+    global recorder
+    if recorder is None:
+        recorder = SlowQueryRecorder(engine or database.engine, **kwargs)
+        recorder.install()
+    return recorder
+
+
+def disable():
+    global recorder
+    if recorder is not None:
+        recorder.uninstall()
+        recorder = None
+
+
+def snapshot() -> Dict[str, Any]:
+    if recorder is None:
+        return {"enabled": False, "entries": [], "fingerprints": []}
+    return recorder.snapshot()
+
+
+if SLOW_QUERY_LOG_ENABLED:
+    enable()
@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Database uji memakai SQLite, atau database kosong dari TEST_DATABASE_URL
+# (mis. PostgreSQL) untuk menguji jalur khusus dialek; harus diset sebelum
+# modul aplikasi diimpor. Seluruh tabel di database tersebut akan dihapus.
+_DB_DIR = tempfile.mkdtemp(prefix="sinergi-test-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.schema import DefaultClause  # noqa: E402
+
+import database, main, models, security  # noqa: E402
+from cache import cache  # noqa: E402
+
+if database.engine.dialect.name == "sqlite":
+    # server_default 'now()' hanya bermakna di PostgreSQL; di SQLite nilainya jadi teks biasa
+    models.Aktivitas.__table__.c.dibuat_pada.server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+
+ADMIN_PASSWORD = "rahasia123"
+
+
+@pytest.fixture(scope="module")
+def db_kosong():
+    """Skema baru untuk setiap modul uji; cache aplikasi ikut dikosongkan."""
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    cache.clear()
+    yield
+    models.Base.metadata.drop_all(bind=database.engine)
+    cache.clear()
+
+
+@pytest.fixture
+def db(db_kosong):
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="module")
+def admin_client(db_kosong):
+    """TestClient yang sudah login sebagai Superadmin (user id 1, jabatan id 1)."""
+    session = database.SessionLocal()
+    session.add(models.SistemRole(id=1, nama_role="Superadmin"))
+    session.add(models.Jabatan(id=1, nama_jabatan="Staf"))
+    session.add(models.User(
+        id=1, username="admin", hashed_password=security.get_password_hash(ADMIN_PASSWORD),
+        nama_lengkap="Admin", sistem_role_id=1, jabatan_id=1, is_active=True,
+    ))
+    session.commit()
+    session.close()
+    client = TestClient(main.app)
+    token = client.post("/token", data={"username": "admin", "password": ADMIN_PASSWORD}).json()["accessToken"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
@@ -0,0 +1,96 @@
+from datetime import date, datetime, time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import database, free_busy, models  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def pegawai(db_kosong):
+    session = database.SessionLocal()
+    session.add_all([models.User(id=i, username=f"pegawai{i}", hashed_password="x", nama_lengkap=f"Pegawai {i}")
+                     for i in (1, 2)])
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def db(pegawai):
+    session = database.SessionLocal()
+    yield session
+    session.rollback()
+    session.query(models.Aktivitas).delete()
+    session.commit()
+    session.close()
+
+
+def _aktivitas(db, user_ids, mulai, selesai=None, jam_mulai=None, jam_selesai=None):
+    users = db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+    db.add(models.Aktivitas(
+        nama_aktivitas="Uji", tanggal_mulai=mulai, tanggal_selesai=selesai, jam_mulai=jam_mulai,
+        jam_selesai=jam_selesai, creator_user_id=1, dibuat_pada=datetime(2026, 1, 1), users=users,
+    ))
+    db.commit()
+
+
+def _interval(items):
+    return [(item["mulai"], item["selesai"]) for item in items]
+
+
+def _sibuk(hasil):
+    return {pegawai["id"]: _interval(pegawai["sibuk"]) for pegawai in hasil["pegawai"]}
+
+
+def test_aktivitas_beberapa_hari_dengan_jam(db):
+    # Senin-Rabu 09:00-10:30: jam berlaku di setiap hari dalam rentangnya
+    _aktivitas(db, [1], date(2026, 3, 2), date(2026, 3, 4), time(9, 0), time(10, 30))
+    # Jam selesai kosong berarti sampai akhir hari kerja
+    _aktivitas(db, [1], date(2026, 3, 6), None, time(14, 0))
+
+    sibuk = _sibuk(free_busy.compute(db, [1, 2], date(2026, 3, 2), date(2026, 3, 6)))
+    assert sibuk[1] == [
+        (datetime(2026, 3, day, 9, 0), datetime(2026, 3, day, 10, 30)) for day in (2, 3, 4)
+    ] + [(datetime(2026, 3, 6, 14, 0), datetime(2026, 3, 6, 16, 0))]
+    assert sibuk[2] == []
+
+
+def test_aktivitas_seharian_mulai_akhir_pekan(db):
+    # Sabtu-Senin tanpa jam; hanya Senin yang tersisa jika akhir pekan dilewati
+    _aktivitas(db, [2], date(2026, 3, 7), date(2026, 3, 9))
+    # Aktivitas yang seluruhnya di akhir pekan tidak menyentuh hari kerja mana pun
+    _aktivitas(db, [1], date(2026, 3, 7), date(2026, 3, 8))
+
+    sibuk = _sibuk(free_busy.compute(db, [1, 2], date(2026, 3, 6), date(2026, 3, 10)))
+    assert sibuk[1] == []
+    assert sibuk[2] == [(datetime(2026, 3, 9, 8, 0), datetime(2026, 3, 9, 16, 0))]
+
+    sibuk = _sibuk(free_busy.compute(db, [1, 2], date(2026, 3, 6), date(2026, 3, 10), hari_kerja_saja=False))
+    assert sibuk[1] == [(datetime(2026, 3, day, 8, 0), datetime(2026, 3, day, 16, 0)) for day in (7, 8)]
+    assert sibuk[2] == [(datetime(2026, 3, day, 8, 0), datetime(2026, 3, day, 16, 0)) for day in (7, 8, 9)]
+
+
+def test_slot_kosong_dengan_durasi_minimal(db):
+    hari = date(2026, 3, 11)
+    _aktivitas(db, [1], hari, None, time(9, 0), time(10, 0))
+    _aktivitas(db, [2], hari, None, time(10, 30), time(15, 0))
+
+    def slot(**kwargs):
+        return _interval(free_busy.compute(db, [1, 2], hari, hari, **kwargs)["slot_kosong"])
+
+    pagi = (datetime(2026, 3, 11, 8, 0), datetime(2026, 3, 11, 9, 0))
+    sela = (datetime(2026, 3, 11, 10, 0), datetime(2026, 3, 11, 10, 30))
+    sore = (datetime(2026, 3, 11, 15, 0), datetime(2026, 3, 11, 16, 0))
+    assert slot() == [pagi, sela, sore]
+    assert slot(durasi_minimal=60) == [pagi, sore]
+    # 45 menit dibulatkan ke atas menjadi dua slot 30 menit
+    assert slot(durasi_minimal=45) == [pagi, sore]
+    assert slot(durasi_minimal=61) == []
+
+
+def test_parameter_tidak_valid(db):
+    with pytest.raises(ValueError):
+        free_busy.compute(db, [1], date(2026, 3, 5), date(2026, 3, 4))
+    with pytest.raises(ValueError):
+        free_busy.compute(db, [1], date(2026, 3, 4), date(2026, 3, 4), jam_kerja_mulai=time(16), jam_kerja_selesai=time(8))
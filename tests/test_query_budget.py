@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database, db_tracking, main, models
+
+JUMLAH_PROYEK = 4
+AKTIVITAS_PER_PROYEK = 6
+JUMLAH_ANGGOTA = 5
+# Query eager loading tim, ketua, anggota, proyek, aktivitas dan anggota aktivitas.
+# Tidak bergantung pada jumlah proyek/aktivitas/anggota.
+ANGGARAN_TEAM_DETAILS = 9
+
+
+@pytest.fixture(scope="module")
+def client(db_kosong):
+    db = database.SessionLocal()
+    db.add(models.SistemRole(id=1, nama_role="Superadmin"))
+    db.add(models.Jabatan(id=1, nama_jabatan="Staf"))
+    users = [
+        models.User(id=i, username=f"pegawai{i}", hashed_password="x", nama_lengkap=f"Pegawai {i}",
+                    sistem_role_id=1, jabatan_id=1)
+        for i in range(1, JUMLAH_ANGGOTA + 1)
+    ]
+    team = models.Team(id=1, nama_tim="Tim Uji", valid_from=date(2020, 1, 1), valid_until=date(2030, 12, 31),
+                       ketua_tim_id=1, users=users)
+    db.add(team)
+    for p in range(1, JUMLAH_PROYEK + 1):
+        db.add(models.Project(id=p, nama_project=f"Proyek {p}", team_id=1, project_leader_id=p))
+        for a in range(AKTIVITAS_PER_PROYEK):
+            db.add(models.Aktivitas(
+                nama_aktivitas=f"Aktivitas {p}-{a}", tanggal_mulai=date(2025, 1, 1) + timedelta(days=a),
+                creator_user_id=1, team_id=1, project_id=p, dibuat_pada=datetime(2025, 1, 1), users=users[:3],
+            ))
+    db.commit()
+    db.close()
+    return TestClient(main.app)
+
+
+def test_team_details_dalam_anggaran_query(client, monkeypatch):
+    # Batas lebih kecil dari jumlah aktivitas agar jalur cursor ikut teruji
+    monkeypatch.setattr(main, "TEAM_DETAIL_AKTIVITAS_LIMIT", 4)
+    with db_tracking.assert_query_budget(ANGGARAN_TEAM_DETAILS):
+        response = client.get("/api/teams/1/details")
+    assert response.status_code == 200
+    projects = response.json()["projects"]
+    assert len(projects) == JUMLAH_PROYEK
+    assert all(len(project["aktivitas"]) == 4 for project in projects)
+    assert all(project["aktivitasCursor"] for project in projects)
+    assert all(len(aktivitas["users"]) == 3 for project in projects for aktivitas in project["aktivitas"])
+
+
+def test_assert_query_budget_gagal_jika_terlampaui(client):
+    with pytest.raises(db_tracking.QueryBudgetExceeded):
+        with db_tracking.assert_query_budget(1):
+            client.get("/api/teams/1/details")
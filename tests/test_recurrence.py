@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+
+import pytest
+
+import database, models, recurrence
+
+
+# ===================================================================
+# recurrence.expand
+# ===================================================================
+def test_bulanan_tanggal_31_digeser_ke_akhir_bulan():
+    assert recurrence.expand(date(2026, 1, 31), "monthly", jumlah=5) == [
+        date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31),
+    ]
+    # Tahun kabisat
+    assert recurrence.expand(date(2028, 1, 31), "monthly", jumlah=2) == [date(2028, 1, 31), date(2028, 2, 29)]
+
+
+def test_mingguan_beberapa_hari_mulai_di_tengah_pekan():
+    # 2026-03-04 adalah Rabu; Senin di pekan yang sama tidak ikut
+    rabu = date(2026, 3, 4)
+    assert recurrence.expand(rabu, "weekly", hari=[4, 0, 2], jumlah=5) == [
+        date(2026, 3, 4), date(2026, 3, 6), date(2026, 3, 9), date(2026, 3, 11), date(2026, 3, 13),
+    ]
+    assert recurrence.expand(rabu, "weekly", interval=2, hari=[0, 2, 4], sampai=date(2026, 3, 20)) == [
+        date(2026, 3, 4), date(2026, 3, 6), date(2026, 3, 16), date(2026, 3, 18), date(2026, 3, 20),
+    ]
+    # Tanpa `hari` dipakai hari dari tanggal mulai
+    assert recurrence.expand(rabu, "weekly", jumlah=2) == [rabu, date(2026, 3, 11)]
+
+
+def test_jumlah_diterapkan_sebelum_pengecualian():
+    mulai = date(2026, 3, 2)
+    # Seperti EXDATE: kejadian yang dikecualikan tetap terhitung dalam `jumlah`
+    assert recurrence.expand(mulai, "daily", jumlah=3, pengecualian=[date(2026, 3, 3)]) == [
+        date(2026, 3, 2), date(2026, 3, 4),
+    ]
+
+
+def test_batas_jumlah_kejadian():
+    mulai = date(2026, 1, 1)
+    assert len(recurrence.expand(mulai, "daily", jumlah=10, batas=10)) == 10
+    with pytest.raises(ValueError):
+        recurrence.expand(mulai, "daily", jumlah=11, batas=10)
+    with pytest.raises(ValueError):
+        recurrence.expand(mulai, "daily", sampai=mulai + timedelta(days=recurrence.MAX_OCCURRENCES))
+
+
+def test_aturan_tidak_valid():
+    with pytest.raises(ValueError):
+        recurrence.expand(date(2026, 1, 1), "daily")
+    with pytest.raises(ValueError):
+        recurrence.expand(date(2026, 1, 1), "daily", interval=0, jumlah=3)
+    with pytest.raises(ValueError):
+        recurrence.expand(date(2026, 1, 1), "yearly", jumlah=3)
+
+
+# ===================================================================
+# Endpoint seri aktivitas
+# ===================================================================
+def _buat_seri(client, **aturan):
+    return client.post("/api/aktivitas/seri", json={
+        "namaAktivitas": "Rapat Mingguan",
+        "tanggalMulai": "2026-03-04",
+        "anggotaAktivitasIds": [1],
+        "daftarDokumenWajib": ["Notulen"],
+        "aturan": {"frekuensi": "weekly", "hari": [0, 2], "jumlah": 4, **aturan},
+    })
+
+
+def test_buat_seri(admin_client):
+    response = _buat_seri(admin_client)
+    assert response.status_code == 200
+    seri = response.json()
+    assert [a["tanggalMulai"] for a in seri["aktivitas"]] == ["2026-03-04", "2026-03-09", "2026-03-11", "2026-03-16"]
+    assert all(a["namaAktivitas"] == "Rapat Mingguan" for a in seri["aktivitas"])
+    assert all(a["jumlahDokumenWajib"] == 1 for a in seri["aktivitas"])
+
+    db = database.SessionLocal()
+    try:
+        ids = [a["id"] for a in seri["aktivitas"]]
+        anggota = db.query(models.anggota_aktivitas_link).filter(
+            models.anggota_aktivitas_link.c.aktivitas_id.in_(ids)
+        ).count()
+        assert anggota == len(ids)
+    finally:
+        db.close()
+
+
+def test_buat_seri_aturan_tidak_valid(admin_client):
+    # Tidak ada kejadian sebelum `sampai`
+    assert _buat_seri(admin_client, jumlah=None, sampai="2026-03-01").status_code == 400
+    # Melebihi MAX_OCCURRENCES
+    response = admin_client.post("/api/aktivitas/seri", json={
+        "namaAktivitas": "Apel", "tanggalMulai": "2026-01-01",
+        "aturan": {"frekuensi": "daily", "jumlah": recurrence.MAX_OCCURRENCES + 1},
+    })
+    assert response.status_code == 400
+    # Tanpa `sampai` maupun `jumlah` ditolak oleh skema
+    assert _buat_seri(admin_client, jumlah=None).status_code == 422
+
+
+def test_ubah_seluruh_seri(admin_client):
+    seri = _buat_seri(admin_client).json()
+    response = admin_client.put(f"/api/aktivitas/seri/{seri['id']}", json={"namaAktivitas": "Rapat Koordinasi"})
+    assert response.status_code == 200
+    hasil = response.json()
+    assert [a["id"] for a in hasil["aktivitas"]] == [a["id"] for a in seri["aktivitas"]]
+    assert all(a["namaAktivitas"] == "Rapat Koordinasi" for a in hasil["aktivitas"])
+
+
+def test_ubah_aturan_mulai_tanggal_tertentu(admin_client):
+    seri = _buat_seri(admin_client).json()
+    pertama, _, ketiga, _ = seri["aktivitas"]
+    # Kejadian yang sudah memiliki dokumen dipertahankan saat aturan dibangkitkan ulang
+    db = database.SessionLocal()
+    db.add(models.Dokumen(keterangan="Bukti", tipe="LINK", path_atau_url="https://contoh.test", aktivitas_id=ketiga["id"]))
+    db.commit()
+    db.close()
+
+    response = admin_client.put(
+        f"/api/aktivitas/seri/{seri['id']}", params={"mulai_dari": "2026-03-09"},
+        json={"aturan": {"frekuensi": "weekly", "hari": [2], "sampai": "2026-03-25"}},
+    )
+    assert response.status_code == 200
+    hasil = response.json()
+    assert hasil["aturan"]["hari"] == [2]
+    tanggal = [(a["id"], a["tanggalMulai"]) for a in hasil["aktivitas"]]
+    # Kejadian sebelum mulai_dari tidak disentuh, 11 Maret tetap memakai baris lama
+    assert tanggal[0] == (pertama["id"], "2026-03-04")
+    assert tanggal[1] == (ketiga["id"], "2026-03-11")
+    assert [t for _, t in tanggal] == ["2026-03-04", "2026-03-11", "2026-03-18", "2026-03-25"]
+    assert all(a["jumlahDokumenWajib"] == 1 for a in hasil["aktivitas"])
+
+
+def test_ubah_seri_tidak_ada(admin_client):
+    assert admin_client.put("/api/aktivitas/seri/9999", json={"namaAktivitas": "X"}).status_code == 404
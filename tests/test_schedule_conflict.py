@@ -0,0 +1,95 @@
+from datetime import date, datetime, time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import database, models, schedule_conflict
+
+HARI = date(2026, 3, 2)
+
+
+@pytest.fixture(scope="module")
+def jadwal(db_kosong):
+    """ID aktivitas yang sudah terjadwal, per nama."""
+    session = database.SessionLocal()
+    users = {i: models.User(id=i, username=f"pegawai{i}", hashed_password="x", nama_lengkap=f"Pegawai {i}")
+             for i in (1, 2, 3)}
+    session.add_all(users.values())
+
+    def aktivitas(nama, user_ids, mulai, selesai=None, jam_mulai=None, jam_selesai=None):
+        item = models.Aktivitas(
+            nama_aktivitas=nama, tanggal_mulai=mulai, tanggal_selesai=selesai, jam_mulai=jam_mulai,
+            jam_selesai=jam_selesai, creator_user_id=1, dibuat_pada=datetime(2026, 1, 1),
+            users=[users[i] for i in user_ids],
+        )
+        session.add(item)
+        return item
+
+    items = [
+        aktivitas("pagi", [1], HARI, None, time(9, 0), time(10, 0)),
+        # jam_selesai kosong: berlangsung sampai akhir hari
+        aktivitas("siang_terbuka", [1], HARI, None, time(13, 0)),
+        # Tanpa jam, tiga hari penuh
+        aktivitas("seharian", [2], HARI, date(2026, 3, 4)),
+        # Baris lama dengan tanggal terbalik diperlakukan sebagai satu hari
+        aktivitas("terbalik", [3], date(2026, 3, 10), date(2026, 3, 8)),
+    ]
+    session.commit()
+    ids = {item.nama_aktivitas: item.id for item in items}
+    session.close()
+    return ids
+
+
+def _bentrok(jadwal, user_ids, mulai, selesai=None, jam_mulai=None, jam_selesai=None, kecuali=()):
+    db = database.SessionLocal()
+    try:
+        hasil = schedule_conflict.find_conflicts(db, user_ids, mulai, selesai, jam_mulai, jam_selesai, kecuali)
+    finally:
+        db.close()
+    nama = {id_: nama for nama, id_ in jadwal.items()}
+    return {nama[item["aktivitas_id"]] for item in hasil}
+
+
+def test_jam_beririsan(jadwal):
+    assert _bentrok(jadwal, [1], HARI, None, time(9, 30), time(10, 30)) == {"pagi"}
+    # Jam selesai baru kosong: sampai akhir hari, mengenai kedua aktivitas
+    assert _bentrok(jadwal, [1], HARI, None, time(9, 30)) == {"pagi", "siang_terbuka"}
+    # Aktivitas tanpa jam_selesai mencakup sore hari
+    assert _bentrok(jadwal, [1], HARI, None, time(15, 0), time(16, 0)) == {"siang_terbuka"}
+
+
+def test_jam_bersebelahan_tidak_bentrok(jadwal):
+    assert _bentrok(jadwal, [1], HARI, None, time(10, 0), time(11, 0)) == set()
+    assert _bentrok(jadwal, [1], HARI, None, time(8, 0), time(9, 0)) == set()
+    assert _bentrok(jadwal, [1], HARI, None, time(12, 0), time(13, 0)) == set()
+
+
+def test_aktivitas_seharian(jadwal):
+    # Aktivitas yang ada tanpa jam bentrok dengan jam berapa pun di dalam rentangnya
+    assert _bentrok(jadwal, [2], date(2026, 3, 3), None, time(9, 0), time(10, 0)) == {"seharian"}
+    assert _bentrok(jadwal, [2], date(2026, 3, 5), None, time(9, 0), time(10, 0)) == set()
+    # Aktivitas baru tanpa jam bentrok dengan semua aktivitas pada hari itu
+    assert _bentrok(jadwal, [1, 2], HARI) == {"pagi", "siang_terbuka", "seharian"}
+    # Rentang tanggal baru yang hanya menyentuh hari terakhir
+    assert _bentrok(jadwal, [2], date(2026, 3, 4), date(2026, 3, 6)) == {"seharian"}
+
+
+def test_tanggal_selesai_kosong_atau_terbalik(jadwal):
+    # tanggal_selesai kosong berarti satu hari saja
+    assert _bentrok(jadwal, [1], date(2026, 3, 3), None, time(9, 0), time(10, 0)) == set()
+    assert _bentrok(jadwal, [3], date(2026, 3, 10)) == {"terbalik"}
+    assert _bentrok(jadwal, [3], date(2026, 3, 9)) == set()
+
+
+def test_kecualikan_aktivitas_sendiri(jadwal):
+    assert _bentrok(jadwal, [1], HARI, kecuali=[jadwal["pagi"]]) == {"siang_terbuka"}
+
+
+def test_predikat_postgresql_memakai_ekspresi_indeks():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()))
+    predikat = schedule_conflict._tanggal_beririsan(db, HARI, HARI)
+    sql = str(predikat.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    indeks = next(i for i in models.Aktivitas.__table__.indexes if i.name == "ix_aktivitas_rentang_tanggal")
+    ekspresi = str(indeks.expressions[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert sql.startswith(ekspresi + " && ")
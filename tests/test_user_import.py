@@ -0,0 +1,47 @@
+import io
+
+import database, models
+
+
+def _impor(client, isi: str, **data):
+    return client.post(
+        "/api/users/import", files={"file": ("pengguna.csv", io.BytesIO(isi.encode()), "text/csv")}, data=data
+    )
+
+
+def test_referensi_tidak_dikenal_dilaporkan_per_baris(admin_client):
+    isi = (
+        "username,password,nama_lengkap,sistem_role,jabatan_id\n"
+        "valid1,password123,Valid Satu,Superadmin,1\n"
+        "peran_salah,password123,Peran Salah,Direktur,1\n"
+        "jabatan_salah,password123,Jabatan Salah,Superadmin,999\n"
+    )
+    response = _impor(admin_client, isi)
+    assert response.status_code == 200
+    hasil = response.json()
+    assert hasil["total"] == 3
+    assert hasil["dibuat"] == 1
+    assert hasil["gagal"] == 2
+    assert [(e["baris"], e["username"]) for e in hasil["errors"]] == [(3, "peran_salah"), (4, "jabatan_salah")]
+    assert "tidak dikenal" in hasil["errors"][0]["pesan"]
+    assert "tidak dikenal" in hasil["errors"][1]["pesan"]
+
+    db = database.SessionLocal()
+    try:
+        usernames = {username for (username,) in db.query(models.User.username)}
+    finally:
+        db.close()
+    assert "valid1" in usernames
+    assert not usernames & {"peran_salah", "jabatan_salah"}
+
+
+def test_id_peran_tidak_dikenal_tidak_membatalkan_impor(admin_client):
+    isi = (
+        "username,password,nama_lengkap,sistem_role_id,jabatan_id\n"
+        "valid2,password123,Valid Dua,1,1\n"
+        "peran_id_salah,password123,Peran Id Salah,42,1\n"
+        "peran_id_teks,password123,Peran Id Teks,abc,1\n"
+    )
+    hasil = _impor(admin_client, isi).json()
+    assert hasil["dibuat"] == 1
+    assert [e["baris"] for e in hasil["errors"]] == [3, 4]
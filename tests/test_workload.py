@@ -0,0 +1,128 @@
+from datetime import date, datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import database, models, workload  # noqa: E402
+
+AWAL, AKHIR = date(2026, 1, 29), date(2026, 2, 3)
+
+
+@pytest.fixture(scope="module")
+def pegawai(db_kosong):
+    session = database.SessionLocal()
+    session.add(models.Jabatan(id=1, nama_jabatan="Staf"))
+    users = [models.User(id=i, username=f"pegawai{i}", hashed_password="x", nama_lengkap=f"Pegawai {i}", jabatan_id=1)
+             for i in (1, 2, 3)]
+    session.add(models.Team(id=1, nama_tim="Tim Uji", valid_from=date(2026, 1, 1), valid_until=date(2026, 12, 31),
+                            users=users))
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def db(pegawai):
+    session = database.SessionLocal()
+    workload._store.clear()
+    yield session
+    session.rollback()
+    session.query(models.Aktivitas).delete()
+    session.commit()
+    session.close()
+    workload._store.clear()
+
+
+def _aktivitas(db, mulai, selesai, user_ids):
+    users = db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+    aktivitas = models.Aktivitas(nama_aktivitas="Uji", tanggal_mulai=mulai, tanggal_selesai=selesai,
+                                 creator_user_id=1, dibuat_pada=datetime(2026, 1, 1), users=users)
+    db.add(aktivitas)
+    db.commit()
+    return aktivitas
+
+
+def _beban(db):
+    return {pegawai["id"]: pegawai["beban"] for pegawai in workload.heatmap(db, AWAL, AKHIR)["pegawai"]}
+
+
+def _sama_dengan_bangun_ulang(db):
+    return all(
+        np.array_equal(entry.matrix, workload._build(db, *key).matrix) for key, entry in workload._store.items()
+    )
+
+
+def test_aktivitas_melewati_batas_bulan(db):
+    _aktivitas(db, date(2026, 1, 30), date(2026, 2, 2), [1, 2])
+    beban = _beban(db)
+    assert beban[1] == [0, 1, 1, 1, 1, 0]
+    assert beban[2] == [0, 1, 1, 1, 1, 0]
+    assert beban[3] == [0] * 6
+    hasil = workload.heatmap(db, AWAL, AKHIR)
+    assert hasil["per_tim"][0]["beban"] == [0, 2, 2, 2, 2, 0]
+    assert set(workload._store) == {(2026, 1), (2026, 2)}
+
+
+def test_geser_tanggal_disinkronkan_bertahap(db):
+    aktivitas = _aktivitas(db, date(2026, 1, 30), date(2026, 2, 2), [1])
+    _beban(db)
+    januari = workload._store[(2026, 1)]
+
+    aktivitas.tanggal_mulai, aktivitas.tanggal_selesai = date(2026, 2, 1), date(2026, 2, 3)
+    db.commit()
+    assert aktivitas.id in januari.dirty
+
+    assert _beban(db)[1] == [0, 0, 0, 1, 1, 1]
+    # Bulan yang sama diperbarui di tempat, bukan dibangun ulang
+    assert workload._store[(2026, 1)] is januari
+    assert not januari.dirty
+    assert _sama_dengan_bangun_ulang(db)
+
+
+def test_tambah_dan_hapus_anggota(db):
+    aktivitas = _aktivitas(db, date(2026, 1, 31), date(2026, 2, 1), [1, 2])
+    _beban(db)
+
+    aktivitas.users.remove(db.get(models.User, 2))
+    aktivitas.users.append(db.get(models.User, 3))
+    db.commit()
+
+    beban = _beban(db)
+    assert beban[1] == [0, 0, 1, 1, 0, 0]
+    assert beban[2] == [0] * 6
+    assert beban[3] == [0, 0, 1, 1, 0, 0]
+    assert _sama_dengan_bangun_ulang(db)
+
+
+def test_hapus_aktivitas(db):
+    tetap = _aktivitas(db, date(2026, 2, 1), None, [1])
+    dihapus = _aktivitas(db, date(2026, 1, 29), date(2026, 2, 3), [1, 2])
+    assert _beban(db)[1] == [1, 1, 1, 2, 1, 1]
+
+    db.delete(dihapus)
+    db.commit()
+
+    beban = _beban(db)
+    assert beban[1] == [0, 0, 0, 1, 0, 0]
+    assert beban[2] == [0] * 6
+    assert tetap.id in workload._store[(2026, 2)].kontribusi
+    assert _sama_dengan_bangun_ulang(db)
+
+
+def test_sinkronisasi_gagal_tidak_menghilangkan_perubahan(db, monkeypatch):
+    aktivitas = _aktivitas(db, date(2026, 2, 1), None, [1])
+    _beban(db)
+    aktivitas.tanggal_mulai = date(2026, 2, 2)
+    db.commit()
+
+    def gagal(*args, **kwargs):
+        raise RuntimeError("koneksi terputus")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(workload, "_load_kontribusi", gagal)
+        with pytest.raises(RuntimeError):
+            workload.get_month(db, 2026, 2)
+    assert aktivitas.id in workload._store[(2026, 2)].dirty
+
+    assert _beban(db)[1] == [0, 0, 0, 0, 1, 0]
+    assert _sama_dengan_bangun_ulang(db)
@@ -0,0 +1,233 @@
+import csv
+import io
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl bersifat opsional, hanya dibutuhkan untuk file .xlsx
+    openpyxl = None
+
+import models, schemas, security
+
+# ===================================================================
+# IMPOR PENGGUNA MASSAL DARI CSV / XLSX
+# ===================================================================
+# Baris dibaca secara streaming, divalidasi dengan schemas.UserCreate, lalu
+# disimpan per batch. Password di-hash di process pool (bcrypt memakan CPU)
+# dan hanya untuk username yang belum terdaftar.
+IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", "10000"))
+
+# Nama kolom yang diterima (setelah diubah ke huruf kecil dan spasi -> "_")
+_COLUMN_ALIASES = {
+    "username": "username",
+    "password": "password",
+    "nama_lengkap": "nama_lengkap",
+    "nama": "nama_lengkap",
+    "sistem_role": "sistem_role",
+    "role": "sistem_role",
+    "peran": "sistem_role",
+    "sistem_role_id": "sistem_role_id",
+    "jabatan": "jabatan",
+    "jabatan_id": "jabatan_id",
+}
+
+
+def _normalize_header(value) -> str:
+    key = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return _COLUMN_ALIASES.get(key, key)
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def iter_rows(fileobj, filename: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """Menghasilkan (nomor_baris, data) dari file CSV atau XLSX tanpa memuat semuanya sekaligus."""
+    if filename.lower().endswith(".xlsx"):
+        if openpyxl is None:
+            raise ValueError("Paket 'openpyxl' belum terpasang; file .xlsx tidak dapat dibaca.")
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [_normalize_header(h) for h in next(rows, [])]
+            for number, values in enumerate(rows, start=2):
+                if values is None or all(v is None for v in values):
+                    continue
+                yield number, {h: _clean(v) for h, v in zip(headers, values)}
+        finally:
+            workbook.close()
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t") if sample else csv.excel
+        reader = csv.reader(text, dialect)
+        headers = [_normalize_header(h) for h in next(reader, [])]
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            yield reader.line_num, {h: _clean(v) for h, v in zip(headers, values)}
+    finally:
+        # Jangan ikut menutup file unggahan milik pemanggil
+        text.detach()
+
+
+def _reference_map(db: Session, column) -> Dict[str, int]:
+    """Nama (huruf kecil) -> id untuk tabel referensi, dalam satu query."""
+    table = column.class_
+    return {name.lower(): id_ for id_, name in db.query(table.id, column).all()}
+
+
+def _resolve(row: dict, name_key: str, id_key: str, mapping: Dict[str, int], label: str):
+    if row.get(id_key):
+        try:
+            id_ = int(row[id_key])
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} ID '{row[id_key]}' tidak valid")
+        if id_ not in mapping.values():
+            raise ValueError(f"{label} ID '{id_}' tidak dikenal")
+        return id_
+    name = row.get(name_key)
+    if not name:
+        raise ValueError(f"{label} wajib diisi")
+    if name.lower() not in mapping:
+        raise ValueError(f"{label} '{name}' tidak dikenal")
+    return mapping[name.lower()]
+
+
+def _error_messages(exc: ValidationError) -> str:
+    return "; ".join(
+        (f"{'.'.join(str(p) for p in err['loc'])}: " if err["loc"] else "") + err["msg"].removeprefix("Value error, ")
+        for err in exc.errors()
+    )
+
+
+def _insert_new(db: Session, rows: List[dict]) -> set:
+    """INSERT batch; username yang ternyata sudah ada (balapan) dilewati. Mengembalikan username yang dibuat."""
+    dialect = db.get_bind().dialect.name
+    table = models.User.__table__
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        statement = module.insert(table).on_conflict_do_nothing(index_elements=["username"])
+        return set(db.execute(statement.returning(table.c.username), rows).scalars())
+    db.execute(table.insert(), rows)
+    return {row["username"] for row in rows}
+
+
+def _process_batch(db: Session, batch: List[Tuple[int, schemas.UserCreate]], update_existing: bool,
+                   dry_run: bool, report: dict):
+    usernames = [user.username for _, user in batch]
+    # Username dicocokkan persis, sama seperti constraint unik dan login
+    existing = {
+        username: id_
+        for id_, username in db.query(models.User.id, models.User.username)
+        .filter(models.User.username.in_(usernames))
+    }
+
+    new_users = [(line, user) for line, user in batch if user.username not in existing]
+    old_users = [(line, user) for line, user in batch if user.username in existing]
+
+    if not update_existing:
+        for line, user in old_users:
+            report["errors"].append({"baris": line, "username": user.username, "pesan": "Username sudah terdaftar"})
+        old_users = []
+
+    if dry_run:
+        report["dibuat"] += len(new_users)
+        report["diperbarui"] += len(old_users)
+        return
+
+    if new_users:
+        hashes = security.hash_passwords([user.password for _, user in new_users])
+        created = _insert_new(db, [{
+            "username": user.username,
+            "hashed_password": hashed,
+            "nama_lengkap": user.nama_lengkap,
+            "sistem_role_id": user.sistem_role_id,
+            "jabatan_id": user.jabatan_id,
+        } for (_, user), hashed in zip(new_users, hashes)])
+        report["dibuat"] += len(created)
+        for line, user in new_users:
+            if user.username not in created:
+                report["errors"].append({"baris": line, "username": user.username, "pesan": "Username sudah terdaftar"})
+
+    if old_users:
+        # Password pengguna lama tidak diubah oleh impor
+        db.execute(
+            update(models.User.__table__)
+            .where(models.User.__table__.c.id == bindparam("user_id"))
+            .values(
+                nama_lengkap=bindparam("nama_baru"),
+                sistem_role_id=bindparam("role_baru"),
+                jabatan_id=bindparam("jabatan_baru"),
+            ),
+            [{
+                "user_id": existing[user.username],
+                "nama_baru": user.nama_lengkap,
+                "role_baru": user.sistem_role_id,
+                "jabatan_baru": user.jabatan_id,
+            } for _, user in old_users],
+        )
+        report["diperbarui"] += len(old_users)
+
+
+def import_users(db: Session, fileobj, filename: str, update_existing: bool = False, dry_run: bool = False) -> dict:
+    """
+    Mengimpor pengguna dari file. Baris yang gagal validasi tidak menghentikan
+    impor; semuanya dilaporkan di "errors" beserta nomor barisnya.
+    """
+    roles = _reference_map(db, models.SistemRole.nama_role)
+    jabatan = _reference_map(db, models.Jabatan.nama_jabatan)
+    report = {"total": 0, "dibuat": 0, "diperbarui": 0, "errors": []}
+    seen = set()
+    batch: List[Tuple[int, schemas.UserCreate]] = []
+
+    for line, row in iter_rows(fileobj, filename):
+        report["total"] += 1
+        if report["total"] > IMPORT_MAX_ROWS:
+            raise ValueError(f"File berisi lebih dari {IMPORT_MAX_ROWS} baris.")
+        username = row.get("username")
+        try:
+            user = schemas.UserCreate(
+                username=username or "",
+                password=row.get("password") or "",
+                nama_lengkap=row.get("nama_lengkap"),
+                sistem_role_id=_resolve(row, "sistem_role", "sistem_role_id", roles, "Peran"),
+                jabatan_id=_resolve(row, "jabatan", "jabatan_id", jabatan, "Jabatan"),
+            )
+            if not user.username:
+                raise ValueError("Username wajib diisi")
+        except ValidationError as e:
+            report["errors"].append({"baris": line, "username": username, "pesan": _error_messages(e)})
+            continue
+        except ValueError as e:
+            report["errors"].append({"baris": line, "username": username, "pesan": str(e)})
+            continue
+
+        if user.username in seen:
+            report["errors"].append({"baris": line, "username": username, "pesan": "Username duplikat di dalam file"})
+            continue
+        seen.add(user.username)
+
+        batch.append((line, user))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            _process_batch(db, batch, update_existing, dry_run, report)
+            batch = []
+
+    if batch:
+        _process_batch(db, batch, update_existing, dry_run, report)
+    report["gagal"] = len(report["errors"])
+    report["errors"].sort(key=lambda error: error["baris"])
+    return report
@@ -0,0 +1,308 @@
+import calendar
+import os
+import threading
+import time as _time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+try:
+    import numpy as np
+except ImportError:  # numpy bersifat opsional, hanya dibutuhkan untuk matriks beban kerja
+    np = None
+
+import cache_bus, models
+
+# ===================================================================
+# MATRIKS BEBAN KERJA HARIAN (PEGAWAI × HARI)
+# ===================================================================
+# Untuk setiap bulan disimpan matriks jumlah aktivitas per pegawai per hari,
+# beserta kontribusi tiap aktivitas. Saat aktivitas berubah, bus cache
+# (cache_bus.subscribe) hanya menandai ID-nya; pembacaan berikutnya mengurangi
+# kontribusi lama dan menambahkan kontribusi baru dari satu query kecil,
+# tanpa membangun ulang seluruh bulan. Perubahan pengguna membuang semua bulan.
+WORKLOAD_MAX_MONTHS = int(os.getenv("WORKLOAD_MAX_MONTHS", "24"))
+# Batas umur satu bulan sebelum dibangun ulang penuh (jaring pengaman untuk
+# perubahan yang tidak melewati bus cache, mis. seed massal)
+WORKLOAD_TTL = int(os.getenv("WORKLOAD_TTL", "3600"))
+MAX_RENTANG_HARI = 186
+
+
+class _Bulan:
+    """Matriks satu bulan beserta kontribusi per aktivitas dan ID yang perlu disinkronkan."""
+
+    def __init__(self, awal: date, user_ids, jabatan_ids, nama, matrix, kontribusi):
+        self.awal = awal
+        self.user_ids = user_ids
+        self.jabatan_ids = jabatan_ids
+        self.nama = nama
+        self.user_index = {int(user_id): i for i, user_id in enumerate(user_ids)}
+        self.matrix = matrix
+        # aktivitas_id -> (indeks pegawai, hari awal, hari akhir) di dalam bulan ini
+        self.kontribusi: Dict[int, Tuple[List[int], int, int]] = kontribusi
+        self.dirty: Set[int] = set()
+        self.dibuat = _time.monotonic()
+        # `lock` hanya menjaga `dirty` (dipakai subscriber), `matrix_lock` menjaga matriks
+        self.lock = threading.Lock()
+        self.matrix_lock = threading.Lock()
+
+
+class _Pembangunan:
+    """Perubahan yang tiba selama satu bulan sedang dibangun; dijaga oleh `_store_lock`."""
+
+    def __init__(self):
+        self.dirty: Set[int] = set()
+        self.batal = False
+
+
+_store: "OrderedDict[Tuple[int, int], _Bulan]" = OrderedDict()
+_store_lock = threading.Lock()
+_pembangunan: List[_Pembangunan] = []
+
+
+def _on_invalidate(tags: Optional[Set[str]]):
+    if tags is None or "user" in tags:
+        with _store_lock:
+            _store.clear()
+            for pembangunan in _pembangunan:
+                pembangunan.batal = True
+        return
+    ids = {int(tag.split(":", 1)[1]) for tag in tags if tag.startswith("aktivitas:")}
+    if not ids:
+        return
+    with _store_lock:
+        months = list(_store.values())
+        for pembangunan in _pembangunan:
+            pembangunan.dirty.update(ids)
+    for bulan in months:
+        with bulan.lock:
+            bulan.dirty.update(ids)
+
+
+cache_bus.subscribe(_on_invalidate)
+
+
+def _rentang_bulan(tahun: int, bulan: int) -> Tuple[date, date]:
+    return date(tahun, bulan, 1), date(tahun, bulan, calendar.monthrange(tahun, bulan)[1])
+
+
+def _load_kontribusi(db: Session, awal: date, akhir: date, aktivitas_ids: Optional[Iterable[int]] = None):
+    """(aktivitas_id, user_id, hari awal, hari akhir) untuk aktivitas yang beririsan dengan bulan."""
+    aktivitas = models.Aktivitas
+    anggota = models.anggota_aktivitas_link
+    selesai = func.coalesce(aktivitas.tanggal_selesai, aktivitas.tanggal_mulai)
+    query = select(aktivitas.id, anggota.c.user_id, aktivitas.tanggal_mulai, selesai).join(
+        anggota, anggota.c.aktivitas_id == aktivitas.id
+    ).where(
+        aktivitas.tanggal_mulai.isnot(None),
+        aktivitas.tanggal_mulai <= akhir,
+        selesai >= awal,
+    )
+    if aktivitas_ids is not None:
+        query = query.where(aktivitas.id.in_(aktivitas_ids))
+    result = {}
+    for aktivitas_id, user_id, mulai, sampai in db.execute(query):
+        d0 = (max(mulai, awal) - awal).days
+        d1 = (min(sampai, akhir) - awal).days
+        if d0 <= d1:
+            result.setdefault(aktivitas_id, ([], d0, d1))[0].append(user_id)
+    return result
+
+
+def _apply(matrix, kontribusi: Dict[int, Tuple[List[int], int, int]], sign: int):
+    """Menambahkan (sign=1) atau mengurangkan (sign=-1) kontribusi ke matriks dengan difference array."""
+    if not kontribusi:
+        return
+    u, d0, d1 = [], [], []
+    for user_idx, start, end in kontribusi.values():
+        u.extend(user_idx)
+        d0.extend([start] * len(user_idx))
+        d1.extend([end + 1] * len(user_idx))
+    diff = np.zeros((matrix.shape[0], matrix.shape[1] + 1), dtype=np.int32)
+    u = np.asarray(u, dtype=np.int64)
+    np.add.at(diff, (u, np.asarray(d0, dtype=np.int64)), sign)
+    np.add.at(diff, (u, np.asarray(d1, dtype=np.int64)), -sign)
+    matrix += diff.cumsum(axis=1)[:, :-1]
+
+
+def _to_index(bulan: _Bulan, raw: Dict[int, Tuple[List[int], int, int]], strict: bool = True):
+    """
+    Mengganti user_id dengan indeks baris. Pengguna yang belum dikenal membuat
+    hasilnya None (strict) atau dilewati.
+    """
+    result = {}
+    for aktivitas_id, (user_ids, d0, d1) in raw.items():
+        if strict and any(user_id not in bulan.user_index for user_id in user_ids):
+            return None
+        result[aktivitas_id] = ([bulan.user_index[user_id] for user_id in user_ids if user_id in bulan.user_index], d0, d1)
+    return result
+
+
+def _build(db: Session, tahun: int, bulan: int) -> _Bulan:
+    awal, akhir = _rentang_bulan(tahun, bulan)
+    users = db.query(models.User.id, models.User.jabatan_id, models.User.nama_lengkap).order_by(models.User.id).all()
+    entry = _Bulan(
+        awal,
+        np.array([user.id for user in users], dtype=np.int64),
+        [user.jabatan_id for user in users],
+        [user.nama_lengkap for user in users],
+        np.zeros((len(users), (akhir - awal).days + 1), dtype=np.int32),
+        {},
+    )
+    # Pengguna yang dibuat setelah daftar di atas dibaca akan membuang bulan ini lewat tag "user"
+    entry.kontribusi = _to_index(entry, _load_kontribusi(db, awal, akhir), strict=False)
+    _apply(entry.matrix, entry.kontribusi, 1)
+    return entry
+
+
+def _sync(db: Session, entry: _Bulan) -> bool:
+    """Menerapkan perubahan aktivitas yang ditandai. False jika bulan perlu dibangun ulang."""
+    # matrix_lock dipegang sepanjang sinkronisasi agar pembaca lain menunggu
+    # hasilnya, bukan melihat `dirty` kosong pada matriks yang belum diperbarui
+    with entry.matrix_lock:
+        with entry.lock:
+            dirty, entry.dirty = entry.dirty, set()
+        if not dirty:
+            return True
+        awal = entry.awal
+        akhir = awal + timedelta(days=entry.matrix.shape[1] - 1)
+        try:
+            baru = _to_index(entry, _load_kontribusi(db, awal, akhir, dirty))
+        except Exception:
+            # Kembalikan ID agar dicoba lagi pada pembacaan berikutnya
+            with entry.lock:
+                entry.dirty.update(dirty)
+            raise
+        if baru is None:
+            with entry.lock:
+                entry.dirty.update(dirty)
+            return False
+        lama = {aktivitas_id: entry.kontribusi.pop(aktivitas_id) for aktivitas_id in dirty if aktivitas_id in entry.kontribusi}
+        _apply(entry.matrix, lama, -1)
+        _apply(entry.matrix, baru, 1)
+        entry.kontribusi.update(baru)
+    return True
+
+
+def get_month(db: Session, tahun: int, bulan: int) -> _Bulan:
+    """Matriks beban kerja satu bulan dari cache, disinkronkan atau dibangun bila perlu."""
+    if np is None:
+        raise RuntimeError("Paket 'numpy' belum terpasang; fitur beban kerja tidak tersedia.")
+    key = (tahun, bulan)
+    with _store_lock:
+        entry = _store.get(key)
+        if entry is not None:
+            _store.move_to_end(key)
+    if entry is not None and _time.monotonic() - entry.dibuat < WORKLOAD_TTL and _sync(db, entry):
+        return entry
+
+    # Didaftarkan sebelum query agar invalidasi selama pembangunan tidak hilang
+    pembangunan = _Pembangunan()
+    with _store_lock:
+        _pembangunan.append(pembangunan)
+    try:
+        entry = _build(db, tahun, bulan)
+    except Exception:
+        with _store_lock:
+            _pembangunan.remove(pembangunan)
+        raise
+    with _store_lock:
+        _pembangunan.remove(pembangunan)
+        if pembangunan.batal:
+            # Pengguna berubah di tengah pembangunan: hasil dipakai sekali, tidak disimpan
+            return entry
+        # Aktivitas yang berubah selama query disinkronkan pada pembacaan berikutnya
+        entry.dirty.update(pembangunan.dirty)
+        _store[key] = entry
+        _store.move_to_end(key)
+        while len(_store) > WORKLOAD_MAX_MONTHS:
+            _store.popitem(last=False)
+    return entry
+
+
+def _rollup(kelompok: Dict[int, str], anggota: Dict[int, List[int]], matrix) -> List[dict]:
+    result = []
+    for kelompok_id, nama in kelompok.items():
+        rows = anggota.get(kelompok_id, [])
+        if not rows:
+            continue
+        beban = matrix[rows].sum(axis=0)
+        result.append({
+            "id": kelompok_id,
+            "nama": nama,
+            "jumlah_pegawai": len(rows),
+            "beban": beban.tolist(),
+            "rata_rata": np.round(beban / len(rows), 2).tolist(),
+        })
+    return result
+
+
+def heatmap(db: Session, start_date: date, end_date: date, team_ids: Optional[List[int]] = None) -> dict:
+    """
+    Menyusun heatmap beban kerja pegawai untuk rentang tanggal beserta rollup
+    per tim dan per jabatan. ValueError untuk rentang yang tidak valid.
+    """
+    if end_date < start_date:
+        raise ValueError("Tanggal selesai tidak boleh sebelum tanggal mulai.")
+    if (end_date - start_date).days + 1 > MAX_RENTANG_HARI:
+        raise ValueError(f"Rentang tanggal maksimal {MAX_RENTANG_HARI} hari.")
+
+    # Gabungkan potongan setiap bulan yang tercakup menjadi satu matriks
+    potongan = []
+    tahun, bulan = start_date.year, start_date.month
+    while date(tahun, bulan, 1) <= end_date:
+        entry = get_month(db, tahun, bulan)
+        awal = max(start_date, entry.awal)
+        akhir = min(end_date, entry.awal + timedelta(days=entry.matrix.shape[1] - 1))
+        potongan.append((entry, (awal - entry.awal).days, (akhir - entry.awal).days + 1))
+        tahun, bulan = (tahun + 1, 1) if bulan == 12 else (tahun, bulan + 1)
+
+    # Pegawai mengikuti bulan terakhir; baris yang tidak ada di bulan lain diisi nol
+    acuan = potongan[-1][0]
+    matrix = np.zeros((len(acuan.user_ids), (end_date - start_date).days + 1), dtype=np.int32)
+    kolom = 0
+    for entry, d0, d1 in potongan:
+        rows = np.array([entry.user_index.get(int(user_id), -1) for user_id in acuan.user_ids], dtype=np.int64)
+        known = rows >= 0
+        with entry.matrix_lock:
+            matrix[known, kolom:kolom + d1 - d0] = entry.matrix[rows[known], d0:d1]
+        kolom += d1 - d0
+
+    links = db.query(models.user_team_link.c.team_id, models.user_team_link.c.user_id)
+    if team_ids:
+        links = links.filter(models.user_team_link.c.team_id.in_(team_ids))
+    anggota_tim: Dict[int, List[int]] = {}
+    for team_id, user_id in links:
+        if user_id in acuan.user_index:
+            anggota_tim.setdefault(team_id, []).append(acuan.user_index[user_id])
+
+    if team_ids:
+        terpilih = sorted({row for rows in anggota_tim.values() for row in rows})
+    else:
+        terpilih = list(range(len(acuan.user_ids)))
+    anggota_jabatan: Dict[int, List[int]] = {}
+    for row in terpilih:
+        if acuan.jabatan_ids[row] is not None:
+            anggota_jabatan.setdefault(acuan.jabatan_ids[row], []).append(row)
+
+    tim = dict(db.query(models.Team.id, models.Team.nama_tim).filter(models.Team.id.in_(list(anggota_tim))).order_by(models.Team.id))
+    jabatan = dict(db.query(models.Jabatan.id, models.Jabatan.nama_jabatan).order_by(models.Jabatan.id))
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "tanggal": [start_date + timedelta(days=i) for i in range(matrix.shape[1])],
+        "pegawai": [{
+            "id": int(acuan.user_ids[row]),
+            "nama_lengkap": acuan.nama[row],
+            "jabatan_id": acuan.jabatan_ids[row],
+            "beban": matrix[row].tolist(),
+            "total": int(matrix[row].sum()),
+            "puncak": int(matrix[row].max()) if matrix.shape[1] else 0,
+        } for row in terpilih],
+        "per_tim": _rollup(tim, anggota_tim, matrix),
+        "per_jabatan": _rollup(jabatan, anggota_jabatan, matrix),
+    }